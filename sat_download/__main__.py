@@ -0,0 +1,6 @@
+import sys
+
+from sat_download.cli import main
+
+
+sys.exit(main())
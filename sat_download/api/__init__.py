@@ -1,4 +1,17 @@
-from sat_download.api.odata import ODataAPI
-from sat_download.api.usgs import USGSAPI
+from sat_download.api.catalog import CatalogAPI
 
-__all__ = ['ODataAPI', 'USGSAPI']
\ No newline at end of file
+__all__ = ['ODataAPI', 'USGSAPI', 'CatalogAPI']
+
+
+def __getattr__(name : str):
+    """
+    Import the provider clients on first use, so the package can be imported
+    without loading ``requests`` and ``tqdm``.
+    """
+    if name == 'ODataAPI':
+        from sat_download.api.odata import ODataAPI
+        return ODataAPI
+    if name == 'USGSAPI':
+        from sat_download.api.usgs import USGSAPI
+        return USGSAPI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,18 @@
+import os
+import time
+
 from abc import ABC, abstractmethod
-from sat_download.data_types.search import SearchFilters, SearchResults
+from concurrent.futures import ThreadPoolExecutor
+from sat_download.data_types.search import SatelliteImage, SearchFilters, SearchResults
+from sat_download.sinks import FileSink, Sink
 from datetime import datetime
-from copy import deepcopy
+from dataclasses import replace
+from typing import TYPE_CHECKING, Callable, Dict, List
+from sat_download.utils.http import StallError
+from sat_download.utils.profiling import Profiler, profile, profile_iter
+
+if TYPE_CHECKING:
+    import requests
 
 
 class SatelliteAPI(ABC):
@@ -18,6 +29,23 @@ class SatelliteAPI(ABC):
     password : str
         Password or secret for authentication with the satellite data provider
         
+    Attributes
+    ----------
+    STALL_SPEED : int
+        Minimum download throughput, in bytes per second, before a transfer is considered stalled
+    STALL_WINDOW : int
+        Seconds over which the throughput is measured, also used as read timeout
+    STALL_RETRIES : int
+        Number of times a stalled transfer is resumed before giving up
+    SEARCH_PAGE_SIZE : int | None
+        Number of products a single ``search`` requests, when a search returning
+        fewer is known to be complete; None if unknown (e.g. results filtered client-side)
+    profiler : Profiler | None
+        Profiler measuring each search page and download, None (the default) disables profiling
+    quicklooks : bool
+        Whether searches also request the quicklook URL of each product, for
+        providers that only return it on demand (it enlarges the responses)
+        
     Notes
     -----
     Concrete implementations should handle the specific authentication mechanisms
@@ -28,11 +56,18 @@ class SatelliteAPI(ABC):
     sat_download.api.odata.ODataAPI : Implementation for Copernicus Data Space API
     sat_download.api.usgs.USGSAPI : Implementation for USGS Earth Explorer API
     """
+    STALL_SPEED = 100 * 1024
+    STALL_WINDOW = 30
+    STALL_RETRIES = 3
+    SEARCH_PAGE_SIZE : int | None = None
+    profiler : Profiler | None = None
+    quicklooks : bool = False
+
     def __init__(self, username : str, password : str) -> None:
         self.username = username
         self.password = password
 
-    def bulk_search(self, filters : SearchFilters) -> SearchResults:
+    def bulk_search(self, filters : SearchFilters, results : SearchResults | None = None) -> SearchResults:
         """
         Perform an iterative search over a date range by breaking it into smaller queries.
         
@@ -43,6 +78,9 @@ class SatelliteAPI(ABC):
         ----------
         filters : SearchFilters
             The search filters to apply, including date range
+        results : SearchResults | None
+            Mapping the results are written into, e.g. a ``DiskSearchResults`` to keep
+            memory constant. A new dictionary is used if None.
             
         Returns
         -------
@@ -52,28 +90,131 @@ class SatelliteAPI(ABC):
         Notes
         -----
         This implementation progressively narrows the search window by updating
-        the end_date of the filters based on the most recent image found.
+        the end_date of the filters based on the most recent image found. Only
+        one page of products is held in memory besides ``results``.
         """
-        last_filters = None
+        last_end_date = None
         end = datetime.strptime(filters.end_date, '%Y-%m-%d')
 
-        results : SearchResults = {}
+        results = {} if results is None else results
         products : SearchResults = self.search(filters)
 
-        while bool(products) and last_filters != filters:            
-            last_filters = deepcopy(filters)
+        while bool(products) and last_end_date != filters.end_date:            
+            last_end_date = filters.end_date
 
             for product in products.values():
                 date = datetime.strptime(product.date, '%Y%m%d')
                 if date < end:
                     end = date
             
-            results.update(products)
+            with profile(self.profiler, 'merge'):
+                results.update(products)
             filters.end_date = end.strftime('%Y-%m-%d')
             products = self.search(filters)
         
         return results
 
+    def batch_search(self, filters : SearchFilters, tiles : List[str]) -> Dict[str, SearchResults]:
+        """
+        Search the same collection and date window over many tiles.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every tile; its ``tile_id`` is ignored
+        tiles : List[str]
+            The tile identifiers to search
+            
+        Returns
+        -------
+        Dict[str, SearchResults]
+            Dictionary mapping each tile identifier to its search results
+            
+        Notes
+        -----
+        This default implementation issues one ``bulk_search`` per tile. Concrete
+        implementations may override it to coalesce several tiles into a single
+        provider query and demultiplex the results afterwards.
+        """
+        return { tile : self.bulk_search(replace(filters, tile_id = tile)) for tile in tiles }
+
+    def latest(self, filters : SearchFilters) -> SearchResults:
+        """
+        Search the newest product matching the filters.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters to apply
+            
+        Returns
+        -------
+        SearchResults
+            Dictionary holding the newest matching product, empty if none matches
+            
+        Notes
+        -----
+        This default implementation sorts a regular ``search`` client-side.
+        Concrete implementations may override it to request a single sorted result.
+        """
+        products = self.search(filters)
+        if not products:
+            return {}
+
+        download_id = max(products, key = lambda download_id: products[download_id].date)
+        return { download_id : products[download_id] }
+
+    def latest_per_tile(self, filters : SearchFilters, tiles : List[str], newer_than : Dict[str, str] | None = None,
+                        workers : int = 16) -> SearchResults:
+        """
+        Search the newest product of each tile concurrently.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every tile; its ``tile_id`` is ignored
+        tiles : List[str]
+            The tile identifiers to monitor
+        newer_than : Dict[str, str] | None
+            Dictionary mapping tiles to the acquisition date ('YYYYMMDD') of the
+            product already held; only newer products are returned for them
+        workers : int
+            Number of concurrent queries
+            
+        Returns
+        -------
+        SearchResults
+            At most one product per tile, keyed by download ID as usual
+            
+        Notes
+        -----
+        The start of the date window of a tile in ``newer_than`` is moved to its
+        held date, so already known acquisitions are not listed again. A tile
+        whose query fails is printed and skipped, so the other tiles are still
+        returned.
+        """
+        newer_than = newer_than or {}
+
+        def latest(tile : str) -> SearchResults:
+            held = newer_than.get(tile)
+            tile_filters = replace(filters, tile_id = tile)
+            if held is not None:
+                tile_filters.start_date = max(filters.start_date, f"{held[:4]}-{held[4:6]}-{held[6:8]}")
+
+            try:
+                products = self.latest(tile_filters)
+            except Exception as exc:
+                print(f"Search of tile {tile} failed. {exc}")
+                return {}
+            return { download_id : image for download_id, image in products.items() if held is None or image.date > held }
+
+        results : SearchResults = {}
+        with ThreadPoolExecutor(max_workers = max(workers, 1)) as executor:
+            for partial in executor.map(latest, dict.fromkeys(tiles)):
+                results.update(partial)
+
+        return results
+
     @abstractmethod
     def search(self, filters : SearchFilters) -> SearchResults:
         """
@@ -95,8 +236,128 @@ class SatelliteAPI(ABC):
         """
         pass
 
+    def _write_stream(self, response, outname : str, sink : Sink | None = None, verbose : int = 0,
+                      reopen : Callable[[int, int], 'requests.Response'] | None = None) -> str:
+        """
+        Write a streamed HTTP response into a sink, chunk by chunk.
+
+        Parameters
+        ----------
+        response : requests.Response
+            The streamed response holding the product bytes
+        outname : str
+            The output name of the product
+        sink : Sink | None
+            The destination of the bytes. Defaults to a local file.
+        verbose : int
+            Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        reopen : Callable[[int, int], requests.Response] | None
+            Function receiving the current byte offset and the attempt number and
+            returning a new streamed response from that offset (``Range`` header),
+            possibly from an alternate endpoint. If None, stalls are not recovered.
+
+        Returns
+        -------
+        str
+            The location of the product as reported by the sink
+
+        Raises
+        ------
+        Exception
+            If the transfer stalls more than ``STALL_RETRIES`` times or a resumed
+            request fails
+
+        Notes
+        -----
+        A transfer stalls when its throughput over the last ``STALL_WINDOW``
+        seconds stays below ``STALL_SPEED`` bytes per second, or when the
+        connection breaks. It is then resumed from the current offset, so the
+        sink is opened once and never receives a byte twice. Servers ignoring
+        the ``Range`` header are handled by skipping the bytes already written.
+        """
+        import requests
+        from tqdm import tqdm
+
+        MB = (1024 * 1024)
+        sink = sink or FileSink()
+
+        total_size = int(response.headers.get('Content-Length', 0))
+        progress = tqdm(total = total_size, unit = 'B', unit_scale = True, 
+                        desc = f"Downloading image at {os.path.basename(outname)}") if verbose != 0 else None
+
+        offset, attempt = 0, 0
+        with sink.open(outname) as file:
+            while True:
+                try:
+                    skip = offset if response.status_code == 200 else 0
+                    window_start, window_bytes = time.monotonic(), 0
+
+                    for chunk in profile_iter(self.profiler, response.iter_content(chunk_size = MB), 'network'):
+                        if skip:
+                            chunk, skip = chunk[skip:], max(skip - len(chunk), 0)
+                        with profile(self.profiler, 'write'):
+                            file.write(chunk)
+                        offset += len(chunk)
+                        window_bytes += len(chunk)
+                        if progress is not None:
+                            progress.update(len(chunk))
+
+                        elapsed = time.monotonic() - window_start
+                        if reopen is not None and elapsed > self.STALL_WINDOW:
+                            if window_bytes / elapsed < self.STALL_SPEED:
+                                raise StallError(f"{window_bytes / elapsed / 1024:.0f} KB/s")
+                            window_start, window_bytes = time.monotonic(), 0
+                    break
+                except (StallError, requests.exceptions.RequestException) as exc:
+                    response.close()
+                    attempt += 1
+                    if reopen is None or attempt > self.STALL_RETRIES:
+                        raise Exception(f"Error en la descarga: {exc}")
+
+                    response = reopen(offset, attempt)
+                    if response.status_code not in (200, 206):
+                        raise Exception(f"Error en la descarga: {response.status_code}")
+
+        if progress is not None:
+            progress.close()
+        return sink.locate(outname)
+
+    def download_quicklook(self, image : SatelliteImage, outname : str, session : 'requests.Session | None' = None) -> str | None:
+        """
+        Download the quicklook preview of a satellite image.
+
+        Parameters
+        ----------
+        image : SatelliteImage
+            The image whose preview is downloaded
+        outname : str
+            The output filename where the preview will be saved
+        session : requests.Session | None
+            Session reused across previews to keep connections alive
+
+        Returns
+        -------
+        str | None
+            The file path of the preview, or None if the provider offers no preview
+
+        Raises
+        ------
+        Exception
+            If the preview download fails
+        """
+        import requests
+
+        if image.quicklook is None:
+            return None
+
+        response = (session or requests).get(image.quicklook, stream = True, allow_redirects = True)
+        if response.status_code == 200:
+            return self._write_stream(response, outname)
+        else:
+            raise Exception(f"Error en la descarga: {response.status_code}")
+
     @abstractmethod
-    def download(self, image_id: str, outname: str, verbose : int) -> str | None:
+    def download(self, image_id: str, outname: str, verbose : int, sink : Sink | None = None) -> str | None:
         """
         Download a satellite image by its ID.
 
@@ -108,6 +369,8 @@ class SatelliteAPI(ABC):
             The output filename where the image will be saved.
         verbose : int
             Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to a local file at ``outname``.
 
         Returns
         -------
@@ -0,0 +1,306 @@
+import sqlite3
+import json
+import threading
+
+from dataclasses import asdict, replace
+from datetime import date, datetime, timedelta
+from typing import List, Tuple
+from sat_download.api.base import SatelliteAPI
+from sat_download.data_types.search import SatelliteImage, SearchFilters, SearchResults
+from sat_download.geometry import get_bbox, intersects, parse_wkt
+from sat_download.sinks import Sink
+from sat_download.utils.profiling import profile
+
+
+class CatalogAPI(SatelliteAPI):
+    """
+    Implementation of SatelliteAPI answering searches from a local catalog mirror.
+
+    Search results are stored in a SQLite database indexed by collection,
+    tile, date and footprint, together with the date ranges each query shape
+    is known to cover. Searches over covered ranges never reach the network.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database holding the mirror
+    live : SatelliteAPI | None
+        Provider API used to fill the date ranges the mirror does not cover
+        and to download products. If None, the mirror works fully offline.
+    stable_days : int
+        Date ranges ending less than this many days ago are fetched but not
+        marked as covered, since the provider may still publish products in them
+
+    Notes
+    -----
+    Coverage is tracked per query shape (``SearchFilters.get_key``), so a range
+    covered by a tile query is not assumed to be covered for a different tile.
+    Searches over attributes that are not mirrored locally (cloud cover, product
+    type, orbit) only return products ingested under the same query shape.
+    Download identifiers are kept as returned by the provider, so USGS download
+    URLs may expire and require a live search again.
+
+    Examples
+    --------
+    >>> api = CatalogAPI('catalog.sqlite', live = ODataAPI(username, password))
+    >>> results = api.bulk_search(filters)
+
+    See Also
+    --------
+    sat_download.api.base.SatelliteAPI : Base class defining the API interface
+    """
+    ATTRIBUTE_FILTERS = ('cloud_cover', 'product_type', 'orbit_direction', 'relative_orbit')
+
+    def __init__(self, path : str, live : SatelliteAPI | None = None, stable_days : int = 30) -> None:
+        super().__init__(live.username if live else None, live.password if live else None)
+        self.live = live
+        self.stable_days = stable_days
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread = False)
+
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS products (
+                    id TEXT PRIMARY KEY, collection TEXT, tile TEXT, date TEXT, name TEXT, published TEXT,
+                    min_lon REAL, min_lat REAL, max_lon REAL, max_lat REAL, data TEXT
+                );
+                CREATE INDEX IF NOT EXISTS products_tile ON products (collection, tile, date);
+                CREATE INDEX IF NOT EXISTS products_date ON products (collection, date);
+                CREATE INDEX IF NOT EXISTS products_footprint ON products (min_lon, max_lon, min_lat, max_lat);
+                CREATE TABLE IF NOT EXISTS memberships (key TEXT, id TEXT, PRIMARY KEY (key, id));
+                CREATE TABLE IF NOT EXISTS coverage (key TEXT, start_date TEXT, end_date TEXT);
+                CREATE INDEX IF NOT EXISTS coverage_key ON coverage (key);
+            """)
+
+    def ingest(self, filters : SearchFilters, results : SearchResults, cover : bool = True) -> None:
+        """
+        Store search results in the mirror.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters that produced the results
+        results : SearchResults
+            The complete results of the search over the filters' date window
+        cover : bool
+            Whether to mark the date window as covered for this query shape
+
+        Notes
+        -----
+        Only the part of the window older than ``stable_days`` is marked as covered.
+        """
+        key = filters.get_key()
+        rows = []
+        for image_id, image in results.items():
+            bbox = get_bbox([ point for ring in parse_wkt(image.footprint) for point in ring ]) if image.footprint else (None, ) * 4
+            rows.append((image_id, filters.collection, image.tile, image.date, image.filename, image.published,
+                         *bbox, json.dumps(asdict(image))))
+
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.connection.executemany("INSERT OR IGNORE INTO memberships VALUES (?, ?)", [ (key, row[0]) for row in rows ])
+
+            stable_end = min(filters.end_date, (date.today() - timedelta(days = self.stable_days)).isoformat())
+            if cover and stable_end >= filters.start_date:
+                self.connection.execute("INSERT INTO coverage VALUES (?, ?, ?)", (key, filters.start_date, stable_end))
+
+    def get_gaps(self, filters : SearchFilters) -> List[Tuple[str, str]]:
+        """
+        Get the date ranges of a query that the mirror does not cover.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters of the query
+
+        Returns
+        -------
+        List[Tuple[str, str]]
+            Inclusive (start_date, end_date) ranges in format 'YYYY-MM-DD'
+        """
+        with self.lock:
+            intervals = self.connection.execute(
+                "SELECT start_date, end_date FROM coverage WHERE key = ? AND end_date >= ? AND start_date <= ? ORDER BY start_date",
+                (filters.get_key(), filters.start_date, filters.end_date)).fetchall()
+
+        day = timedelta(days = 1)
+        cursor = datetime.strptime(filters.start_date, '%Y-%m-%d')
+        end = datetime.strptime(filters.end_date, '%Y-%m-%d')
+
+        gaps = []
+        for start_date, end_date in intervals:
+            start_date, end_date = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d')
+            if start_date > cursor:
+                gaps.append((cursor.strftime('%Y-%m-%d'), (start_date - day).strftime('%Y-%m-%d')))
+            cursor = max(cursor, end_date + day)
+
+        if cursor <= end:
+            gaps.append((cursor.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+
+        return gaps
+
+    def __get_complete(self, gap : SearchFilters, results : SearchResults) -> List[Tuple[str, str]]:
+        """
+        Get the date ranges of a gap that a live ``bulk_search`` is known to have fetched completely.
+
+        Notes
+        -----
+        ``bulk_search`` pages backwards from the end of the window and stops once
+        a page only holds products of its oldest day, so that day may have been
+        truncated and older products never listed. Days after the oldest one
+        returned are complete. The oldest day is complete if a search of that
+        day alone returns fewer than ``SEARCH_PAGE_SIZE`` products, and then so
+        is the whole gap. Otherwise, the days before it are complete only if a
+        search over them returns nothing.
+        """
+        if not results:
+            return [ (gap.start_date, gap.end_date) ]
+
+        day = timedelta(days = 1)
+        oldest = datetime.strptime(min(image.date for image in results.values()), '%Y%m%d')
+        before, after = (oldest - day).strftime('%Y-%m-%d'), (oldest + day).strftime('%Y-%m-%d')
+
+        size = self.live.SEARCH_PAGE_SIZE
+        if size is not None and len(self.live.search(replace(gap, start_date = oldest.strftime('%Y-%m-%d'),
+                                                             end_date = oldest.strftime('%Y-%m-%d')))) < size:
+            return [ (gap.start_date, gap.end_date) ]
+
+        complete = [ (after, gap.end_date) ] if after <= gap.end_date else []
+        if gap.start_date <= before and not self.live.search(replace(gap, end_date = before)):
+            complete.append((gap.start_date, before))
+        return complete
+
+    def __query(self, filters : SearchFilters) -> SearchResults:
+        """
+        Answer a search from the local tables.
+        """
+        sql = "SELECT id, data FROM products WHERE collection = ? AND date BETWEEN ? AND ?"
+        params = [ filters.collection, filters.start_date.replace('-', ''), filters.end_date.replace('-', '') ]
+
+        if filters.is_set('tile_id'):
+            sql += " AND tile = ?"
+            params.append(filters.tile_id)
+        if filters.is_set('processing_level'):
+            sql += " AND name LIKE ?"
+            params.append(f"%{filters.processing_level}%")
+        if filters.is_set('contains'):
+            for item in filters.contains:
+                sql += " AND name LIKE ?"
+                params.append(f"%{item}%")
+        if filters.is_set('published_after'):
+            sql += " AND published > ?"
+            params.append(filters.published_after)
+        if filters.is_set('geometry'):
+            min_lon, min_lat, max_lon, max_lat = get_bbox([ point for ring in parse_wkt(filters.geometry) for point in ring ])
+            sql += " AND (min_lon IS NULL OR (max_lon >= ? AND min_lon <= ? AND max_lat >= ? AND min_lat <= ?))"
+            params.extend([ min_lon, max_lon, min_lat, max_lat ])
+        if any(filters.is_set(attribute) for attribute in self.ATTRIBUTE_FILTERS):
+            sql += " AND id IN (SELECT id FROM memberships WHERE key = ?)"
+            params.append(filters.get_key())
+
+        with self.lock:
+            rows = self.connection.execute(f"{sql} ORDER BY date DESC", params).fetchall()
+
+        results : SearchResults = {}
+        for image_id, data in rows:
+            image = SatelliteImage(**json.loads(data))
+            if filters.is_set('geometry') and image.footprint:
+                rings = parse_wkt(filters.geometry)
+                if not any(intersects(ring, footprint) for ring in rings for footprint in parse_wkt(image.footprint)):
+                    continue
+            results[image_id] = image
+
+        return results
+
+    def search(self, filters : SearchFilters) -> SearchResults:
+        """
+        Search for satellite imagery using specified filters.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters to apply to the search
+
+        Returns
+        -------
+        SearchResults
+            Dictionary mapping product IDs to SatelliteImage objects
+
+        Notes
+        -----
+        Uncovered date ranges are first fetched from the live API with
+        ``bulk_search`` and ingested, then the whole query is answered locally.
+        Only the parts of a range the live search is known to have fetched
+        completely are marked as covered; the rest is fetched again by later
+        searches. Without a live API, only mirrored products are returned. The
+        live API shares the profiler and quicklook setting of the mirror.
+        """
+        if self.live is not None:
+            self.live.profiler = self.profiler
+            self.live.quicklooks = self.quicklooks
+            for start_date, end_date in self.get_gaps(filters):
+                gap = replace(filters, start_date = start_date, end_date = end_date)
+                results = self.live.bulk_search(replace(gap))
+                self.ingest(gap, results, cover = False)
+                for complete_start, complete_end in self.__get_complete(gap, results):
+                    self.ingest(replace(gap, start_date = complete_start, end_date = complete_end), {})
+
+        with profile(self.profiler, 'search', f"{filters.collection} {filters.start_date}/{filters.end_date} mirror"):
+            return self.__query(filters)
+
+    def bulk_search(self, filters : SearchFilters, results : SearchResults | None = None) -> SearchResults:
+        """
+        Search the whole date range of the filters.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters to apply, including date range
+        results : SearchResults | None
+            Mapping the results are written into. A new dictionary is used if None.
+
+        Returns
+        -------
+        SearchResults
+            Dictionary of every matching product
+
+        Notes
+        -----
+        The mirror returns complete results in a single query, so no iterative
+        narrowing of the date window is needed.
+        """
+        if results is None:
+            return self.search(filters)
+
+        results.update(self.search(filters))
+        return results
+
+    def download(self, image_id : str, outname : str, verbose : int, sink : Sink | None = None) -> str | None:
+        """
+        Download a satellite image through the live API.
+
+        Parameters
+        ----------
+        image_id : str
+            The unique identifier of the image to download.
+        outname : str
+            The output filename where the image will be saved.
+        verbose : int
+            Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to a local file at ``outname``.
+
+        Returns
+        -------
+        str | None
+            The file path of the downloaded image if the download is successful.
+
+        Raises
+        ------
+        Exception
+            If the mirror has no live API to download from
+        """
+        if self.live is None:
+            raise Exception("The catalog mirror has no live API to download from")
+        self.live.profiler = self.profiler
+        return self.live.download(image_id, outname, verbose, sink)
@@ -1,13 +1,20 @@
 import requests
+import fnmatch
 import os
 
 
-from typing import List, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, OrderedDict, Tuple
 from tqdm import tqdm
 from sat_download.api.base import SatelliteAPI
-from sat_download.data_types.search import SearchFilters, SearchResults
+from sat_download.data_types.search import SatelliteImage, SearchFilters, SearchResults
 from sat_download.factories.search import get_satellite_image
 from sat_download.enums import COLLECTIONS
+from sat_download.sinks import Sink
+from sat_download.utils.decoding import iter_items, loads
+from sat_download.utils.http import LatencyTracker, hedged_get
+from sat_download.utils.profiling import profile, profile_iter
 
 
 class ODataAPI(SatelliteAPI):
@@ -23,20 +30,41 @@ class ODataAPI(SatelliteAPI):
         Username for authentication with the Copernicus Data Space API
     password : str
         Password for authentication with the Copernicus Data Space API
+    alternate_search_urls : List[str] | None
+        Equivalent catalogue endpoints that hedged searches may be sent to
+    alternate_download_urls : List[str] | None
+        Equivalent download endpoints that stalled transfers are resumed from
+    hedges : int
+        Maximum number of duplicate requests of a slow catalogue search, 0 disables hedging
         
     Attributes
     ----------
     SEARCH_URL : str
         Endpoint URL for searching satellite products
     DOWNLOAD_URL : str
-        Endpoint URL for downloading satellite products
+        Endpoint URL for downloading satellite products and browsing their Nodes
     TOKEN_URL : str
         Endpoint URL for obtaining authentication tokens
+    MAX_FILTER_LENGTH : int
+        Maximum length of the OR-combined tile clause of a coalesced batch query
+    PAGE_SIZE : int
+        Number of products requested per page when paging batch queries
+    SEARCH_PAGE_SIZE : int
+        Number of products requested by a single ``search``
+    MAX_SKIP : int
+        Largest ``$skip`` sent while paging a batch query; beyond it the date window is narrowed instead
+    SELECT_FIELDS : List[str]
+        Product fields requested through ``$select``, the ones needed to build the results
         
     Notes
     -----
     Authentication is performed using Keycloak OAuth2 tokens which are obtained
     as needed for download operations.
+
+    Catalogue searches are idempotent, so when one takes longer than the 95th
+    percentile of recent latencies a duplicate is sent and the first response
+    wins. Downloads are resumed with a ``Range`` request when they stall,
+    cycling through the download endpoints.
     
     See Also
     --------
@@ -46,10 +74,20 @@ class ODataAPI(SatelliteAPI):
     SEARCH_URL = "https://catalogue.dataspace.copernicus.eu/odata/v1/Products"
     DOWNLOAD_URL = "https://download.dataspace.copernicus.eu/odata/v1/Products"
     TOKEN_URL = "https://identity.dataspace.copernicus.eu/auth/realms/CDSE/protocol/openid-connect/token"
+    MAX_FILTER_LENGTH = 4000
+    PAGE_SIZE = 1000
+    SEARCH_PAGE_SIZE = 20
+    MAX_SKIP = 10000
+    SELECT_FIELDS = ['Id', 'Name', 'PublicationDate', 'Footprint', 'ContentLength', 'Checksum']
 
 
-    def __init__(self, username : str, password : str) -> None:
+    def __init__(self, username : str, password : str, alternate_search_urls : List[str] | None = None,
+                 alternate_download_urls : List[str] | None = None, hedges : int = 1) -> None:
         super().__init__(username, password)
+        self.search_urls = [ self.SEARCH_URL ] + (alternate_search_urls or [])
+        self.download_urls = [ self.DOWNLOAD_URL ] + (alternate_download_urls or [])
+        self.hedges = hedges
+        self.tracker = LatencyTracker()
 
     def __prepare_query(self, filters : SearchFilters) -> str:
         """
@@ -69,6 +107,10 @@ class ODataAPI(SatelliteAPI):
         -----
         Private method that converts SearchFilters into OData-compatible
         filter expressions for querying the Copernicus Data Space API.
+        Tile, cloud cover, product type and orbit filters are expressed as
+        ``Attributes`` filters so the catalogue can use its indexes. The product
+        ``Assets`` are only expanded, to get the quicklook URL of each result,
+        when ``quicklooks`` is enabled.
         """
         params = []
         if filters.is_set('collection'):
@@ -82,12 +124,69 @@ class ODataAPI(SatelliteAPI):
         if filters.is_set('geometry'):
             params.append(f"OData.CSC.Intersects(area=geography'SRID=4326;{filters.geometry}')")
         if filters.is_set('tile_id'):
-            params.append(f"contains(Name,'{filters.tile_id}')")
+            params.append(self.__tile_clause(filters.collection, filters.tile_id))
+        if filters.is_set('cloud_cover'):
+            params.append(self.__attribute_clause('cloudCover', 'DoubleAttribute', 'le', f"{filters.cloud_cover:.2f}"))
+        if filters.is_set('product_type'):
+            params.append(self.__attribute_clause('productType', 'StringAttribute', 'eq', f"'{filters.product_type}'"))
+        if filters.is_set('orbit_direction'):
+            params.append(self.__attribute_clause('orbitDirection', 'StringAttribute', 'eq', f"'{filters.orbit_direction.upper()}'"))
+        if filters.is_set('relative_orbit'):
+            params.append(self.__attribute_clause('relativeOrbitNumber', 'IntegerAttribute', 'eq', f"{int(filters.relative_orbit)}"))
         if filters.is_set('contains'):
             for item in filters.contains:
                 params.append(f"contains(Name,'{item}')")
+        if filters.is_set('published_after'):
+            params.append(f"PublicationDate gt {filters.published_after}")
                 
-        return {"$filter": ' and '.join(params), "$orderby" : f"ContentDate/Start desc"}
+        query = {"$filter": ' and '.join(params), "$orderby" : f"ContentDate/Start desc", 
+                 "$select" : ','.join(self.SELECT_FIELDS), "$top" : self.SEARCH_PAGE_SIZE}
+        if self.quicklooks:
+            query["$expand"] = "Assets"
+        return query
+
+    def __attribute_clause(self, name : str, kind : str, operator : str, value : str) -> str:
+        """
+        Build an OData filter clause over a typed product attribute.
+        
+        Parameters
+        ----------
+        name : str
+            Attribute name (e.g. 'cloudCover', 'tileId')
+        kind : str
+            Attribute type (e.g. 'StringAttribute', 'DoubleAttribute', 'IntegerAttribute')
+        operator : str
+            OData comparison operator (e.g. 'eq', 'le')
+        value : str
+            Already formatted literal, quoted for string attributes
+            
+        Returns
+        -------
+        str
+            The attribute filter clause
+        """
+        return (f"Attributes/OData.CSC.{kind}/any(att:att/Name eq '{name}' "
+                f"and att/OData.CSC.{kind}/Value {operator} {value})")
+
+    def __tile_clause(self, collection : str, tile : str) -> str:
+        """
+        Build the OData filter clause matching a tile.
+        
+        Parameters
+        ----------
+        collection : str
+            The collection identifier
+        tile : str
+            The tile identifier
+            
+        Returns
+        -------
+        str
+            A ``tileId`` attribute clause for Sentinel-2, or a name substring clause otherwise
+        """
+        if collection == COLLECTIONS.SENTINEL_2.value:
+            return self.__attribute_clause('tileId', 'StringAttribute', 'eq', f"'{tile}'")
+        return f"contains(Name,'{tile}')"
     
     def __get_token(self) -> str:
         """
@@ -123,7 +222,7 @@ class ODataAPI(SatelliteAPI):
         
         return query.json()["access_token"]
     
-    def __prepare_search_results(self, collection : str, images : List[OrderedDict]) -> SearchResults:
+    def __prepare_search_results(self, collection : str, images : Iterable[OrderedDict]) -> SearchResults:
         """
         Convert API response data to standardized search results.
         
@@ -131,8 +230,8 @@ class ODataAPI(SatelliteAPI):
         ----------
         collection : str
             The collection identifier for the search results
-        images : List[OrderedDict]
-            List of image metadata from API response
+        images : Iterable[OrderedDict]
+            Image metadata from API response, possibly streamed
             
         Returns
         -------
@@ -144,10 +243,21 @@ class ODataAPI(SatelliteAPI):
         Private method that processes raw API response data into the
         standardized SearchResults format.
         """
-        results : SearchResults = { image['Id'] : get_satellite_image(COLLECTIONS(collection), image) for image in images }
+        results : SearchResults = {}
+        for image in profile_iter(self.profiler, images, 'decode'):
+            with profile(self.profiler, 'parse'):
+                results[image['Id']] = get_satellite_image(COLLECTIONS(collection), image)
 
         return results
 
+    def __search_page(self, collection : str, query : dict, label : str) -> SearchResults:
+        """
+        Request and convert a single page of search results, measured as one
+        search record when profiling.
+        """
+        with profile(self.profiler, 'search', label):
+            return self.__prepare_search_results(collection, self.__request(query))
+
     def search(self, filters : SearchFilters) -> SearchResults:
         """
         Search for satellite imagery using specified filters.
@@ -173,13 +283,209 @@ class ODataAPI(SatelliteAPI):
         """
         query = self.__prepare_query(filters)
 
-        response = requests.get(self.SEARCH_URL, params = query)
+        return self.__search_page(filters.collection, query, f"{filters.collection} {filters.start_date}/{filters.end_date}")
+
+    def latest(self, filters : SearchFilters) -> SearchResults:
+        """
+        Search the newest product matching the filters.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters to apply
+            
+        Returns
+        -------
+        SearchResults
+            Dictionary holding the newest matching product, empty if none matches
+            
+        Raises
+        ------
+        Exception
+            If the API request fails
+            
+        Notes
+        -----
+        The catalogue sorts by ``ContentDate/Start desc`` and only the first
+        product is requested with ``$top=1``.
+        """
+        query = self.__prepare_query(filters)
+        query['$top'] = 1
+
+        return self.__search_page(filters.collection, query, f"{filters.collection} {filters.tile_id} latest")
+
+    def __request(self, query : dict) -> Iterator[OrderedDict]:
+        """
+        Run a catalogue query and return the raw product entities.
+        
+        Parameters
+        ----------
+        query : dict
+            Dictionary containing OData query parameters
+            
+        Returns
+        -------
+        Iterator[OrderedDict]
+            The product entities of the response page, decoded incrementally
+            
+        Raises
+        ------
+        Exception
+            If the API request fails
+        """
+        with profile(self.profiler, 'request'):
+            response = hedged_get(self.search_urls, self.tracker, self.hedges, params = query, stream = True)
         if response.status_code == 200:
-            return self.__prepare_search_results(filters.collection, response.json()['value'])
+            return iter_items(response, 'value')
         else:
             raise Exception(f"Error en la solicitud: {response.status_code}")
+
+    def __chunk_tiles(self, collection : str, tiles : List[str]) -> List[List[str]]:
+        """
+        Split tiles into groups whose OR-combined clause fits the filter length limit.
+        
+        Parameters
+        ----------
+        collection : str
+            The collection identifier
+        tiles : List[str]
+            The tile identifiers to group
+            
+        Returns
+        -------
+        List[List[str]]
+            Groups of tile identifiers, one per coalesced query
+        """
+        chunks, chunk, length = [], [], 0
+        for tile in dict.fromkeys(tiles):
+            clause_length = len(f"{self.__tile_clause(collection, tile)} or ")
+            if chunk and length + clause_length > self.MAX_FILTER_LENGTH:
+                chunks.append(chunk)
+                chunk, length = [], 0
+            chunk.append(tile)
+            length += clause_length
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    def batch_search(self, filters : SearchFilters, tiles : List[str]) -> Dict[str, SearchResults]:
+        """
+        Search the same collection and date window over many tiles with coalesced queries.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every tile; its ``tile_id`` is ignored
+        tiles : List[str]
+            The tile identifiers to search
+            
+        Returns
+        -------
+        Dict[str, SearchResults]
+            Dictionary mapping each tile identifier to its search results
+            
+        Raises
+        ------
+        Exception
+            If any API request fails, or a single day of a coalesced query holds
+            more than ``MAX_SKIP`` products
+            
+        Notes
+        -----
+        Tiles are OR-combined into tile clauses, as many per
+        query as ``MAX_FILTER_LENGTH`` allows. Each coalesced query is paged with
+        ``$top``/``$skip`` until exhausted, and products are demultiplexed back
+        to the tile they were parsed with. As in ``bulk_search``, once ``$skip``
+        reaches ``MAX_SKIP`` the end of the date window is moved to the oldest
+        acquisition seen and paging starts over, so the catalogue never has to
+        skip an unbounded number of products.
+        """
+        results : Dict[str, SearchResults] = { tile : {} for tile in tiles }
+
+        for chunk in self.__chunk_tiles(filters.collection, tiles):
+            clause = ' or '.join(self.__tile_clause(filters.collection, tile) for tile in chunk)
+            window = replace(filters, tile_id = None)
+
+            skip = 0
+            while True:
+                query = self.__prepare_query(window)
+                query['$filter'] = f"{query['$filter']} and ({clause})"
+                query['$top'] = self.PAGE_SIZE
+                query['$skip'] = skip
+                page = self.__search_page(filters.collection, query, 
+                                          f"{filters.collection} {window.start_date}/{window.end_date} {chunk[0]}+{len(chunk) - 1} tiles skip {skip}")
+
+                for image_id, image in page.items():
+                    if image.tile in results:
+                        results[image.tile][image_id] = image
+
+                if len(page) < self.PAGE_SIZE:
+                    break
+                skip += self.PAGE_SIZE
+
+                if skip >= self.MAX_SKIP:
+                    oldest = min(image.date for image in page.values())
+                    oldest = f"{oldest[:4]}-{oldest[4:6]}-{oldest[6:8]}"
+                    if oldest == window.end_date:
+                        raise Exception(f"Error en la solicitud: more than {self.MAX_SKIP} products on {oldest} for {chunk[0]}+{len(chunk) - 1} tiles")
+                    window.end_date, skip = oldest, 0
+
+        return results
     
-    def download(self, image_id: str, outname: str, verbose : int) -> str | None:
+    def download_quicklook(self, image : SatelliteImage, outname : str, session : requests.Session | None = None) -> str | None:
+        """
+        Download the quicklook preview of a satellite image with an authenticated request.
+
+        Parameters
+        ----------
+        image : SatelliteImage
+            The image whose preview is downloaded
+        outname : str
+            The output filename where the preview will be saved
+        session : requests.Session | None
+            Session reused across previews to keep connections alive
+
+        Returns
+        -------
+        str | None
+            The file path of the preview, or None if the product has no preview
+
+        Raises
+        ------
+        Exception
+            If the preview download fails
+
+        Notes
+        -----
+        The bearer token is stored in the session headers, so previews sharing
+        a session authenticate once. A token rejected with a 401 is renewed and
+        the request retried once.
+        """
+        if image.quicklook is None:
+            return None
+
+        own = session is None
+        session = requests.Session() if own else session
+        try:
+            if 'Authorization' not in session.headers:
+                session.headers.update({'Authorization': f'Bearer {self.__get_token()}'})
+            response = session.get(image.quicklook, stream = True, allow_redirects = True)
+
+            if response.status_code == 401:
+                session.headers.update({'Authorization': f'Bearer {self.__get_token()}'})
+                response = session.get(image.quicklook, stream = True, allow_redirects = True)
+
+            if response.status_code == 200:
+                return self._write_stream(response, outname)
+            else:
+                raise Exception(f"Error en la descarga: {response.status_code}")
+        finally:
+            if own:
+                session.close()
+
+    def download(self, image_id: str, outname: str, verbose : int, sink : Sink | None = None) -> str | None:
         """
         Download a satellite image by its ID.
 
@@ -191,6 +497,8 @@ class ODataAPI(SatelliteAPI):
             The output filename where the image will be saved.
         verbose : int
             Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to a local file at ``outname``.
             
         Returns
         -------
@@ -208,29 +516,201 @@ class ODataAPI(SatelliteAPI):
         - This method implements the abstract `download` method for the Copernicus Data Space API.
         - It uses OAuth2 authentication to obtain a token before initiating the download.
         - A progress bar is displayed using `tqdm` to indicate the download progress.
-        - The method writes the downloaded file in chunks to avoid memory issues with large files.
+        - The first request falls over to the next endpoint of ``download_urls``
+          when it fails to connect or gets a 5xx response.
+        - Stalled transfers are resumed from their current offset, with a fresh token,
+          on the next endpoint of ``download_urls``.
+        - The method writes the downloaded bytes into the sink in chunks to avoid memory issues with large files.
         - Exceptions are raised for HTTP errors or other failures during the download process.
         """
-        MB = (1024 * 1024)
+        with profile(self.profiler, 'download', os.path.basename(outname)):
+            with profile(self.profiler, 'request'):
+                keycloak_token = self.__get_token()
+                session = requests.Session()
+                session.headers.update({'Authorization': f'Bearer {keycloak_token}'})
 
-        keycloak_token = self.__get_token()
-        session = requests.Session()
-        session.headers.update({'Authorization': f'Bearer {keycloak_token}'})
+                for first, endpoint in enumerate(self.download_urls):
+                    last = first == len(self.download_urls) - 1
+                    try:
+                        response = session.get(f"{endpoint}({image_id})/$value", stream = True, verify = True,
+                                               allow_redirects = True, timeout = (30, self.STALL_WINDOW))
+                    except requests.exceptions.RequestException as exc:
+                        if last:
+                            raise Exception(f"Error en la descarga: {exc}")
+                        continue
+
+                    if response.status_code < 500 or last:
+                        break
+                    response.close()
 
-        url = f"{self.DOWNLOAD_URL}({image_id})/$value"
-        response = session.get(url, stream = True, verify = True, allow_redirects = True)
+            def reopen(offset : int, attempt : int) -> requests.Response:
+                with profile(self.profiler, 'resume'):
+                    session.headers.update({'Authorization': f'Bearer {self.__get_token()}'})
+                    endpoint = self.download_urls[(first + attempt) % len(self.download_urls)]
+                    return session.get(f"{endpoint}({image_id})/$value", 
+                                       headers = {'Range' : f"bytes={offset}-"}, stream = True, verify = True, 
+                                       allow_redirects = True, timeout = (30, self.STALL_WINDOW))
+        
+            if response.status_code == 200:
+                return self._write_stream(response, outname, sink, verbose, reopen)
+            else:
+                raise Exception(f"Error en la descarga: {response.status_code}")
     
+    def __list_nodes(self, session : requests.Session, url : str) -> List[dict]:
+        """
+        List the children of a product node.
+        
+        Parameters
+        ----------
+        session : requests.Session
+            Authenticated session used for the request
+        url : str
+            URL of the ``Nodes`` collection to list
+            
+        Returns
+        -------
+        List[dict]
+            Node entries with at least ``Name`` and ``ChildrenNumber``
+            
+        Raises
+        ------
+        Exception
+            If the API request fails
+        """
+        response = session.get(url)
         if response.status_code == 200:
-            total_size = int(response.headers.get('Content-Length', 0)) // MB
-            with open(outname, "wb") as file:
-                if verbose == 0:
-                    for chunk in response.iter_content(chunk_size = MB):
-                        file.write(chunk)
-                else:
-                    for chunk in tqdm(response.iter_content(chunk_size = MB), total = total_size,
-                                    unit = 'MB', desc = f"Downloading image at {os.path.basename(outname)}"):
-                        file.write(chunk)
-
-            return outname
+            return loads(response.content)['result']
         else:
-            raise Exception(f"Error en la descarga: {response.status_code}")
\ No newline at end of file
+            raise Exception(f"Error en la solicitud: {response.status_code}")
+
+    def __walk_nodes(self, session : requests.Session, image_id : str, patterns : List[str]) -> List[Tuple[str, str]]:
+        """
+        Walk the Nodes hierarchy of a product and collect the files matching the patterns.
+        
+        Parameters
+        ----------
+        session : requests.Session
+            Authenticated session used for the requests
+        image_id : str
+            The unique identifier of the product
+        patterns : List[str]
+            Shell-style patterns matched against each file's relative path and name
+            
+        Returns
+        -------
+        List[Tuple[str, str]]
+            Pairs of (relative path, node URL) for every matching file
+        """
+        matches = []
+        pending = [('', f"{self.DOWNLOAD_URL}({image_id})/Nodes")]
+
+        while pending:
+            prefix, url = pending.pop()
+            for node in self.__list_nodes(session, url):
+                path = f"{prefix}/{node['Name']}" if prefix else node['Name']
+                node_url = f"{url}({node['Name']})"
+
+                if node.get('ChildrenNumber', 0) > 0:
+                    pending.append((path, f"{node_url}/Nodes"))
+                elif any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(node['Name'], pattern) for pattern in patterns):
+                    matches.append((path, node_url))
+
+        return matches
+
+    def __download_node(self, session : requests.Session, url : str, outname : str, sink : Sink | None = None) -> str:
+        """
+        Download a single file node.
+        
+        Parameters
+        ----------
+        session : requests.Session
+            Authenticated session used for the request
+        url : str
+            URL of the file node
+        outname : str
+            The output filename where the file will be saved
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to a local file at ``outname``.
+            
+        Returns
+        -------
+        str
+            The location of the downloaded file
+            
+        Raises
+        ------
+        Exception
+            If the download fails due to an API error or network issue
+        """
+        response = session.get(f"{url}/$value", stream = True, verify = True, allow_redirects = True)
+
+        if response.status_code != 200:
+            raise Exception(f"Error en la descarga: {response.status_code}")
+
+        return self._write_stream(response, outname, sink)
+
+    def __get_node_outname(self, outdir : str, path : str) -> str:
+        """
+        Get the output name of a file node, rejecting server-supplied paths
+        that resolve outside the output directory.
+        """
+        outname = os.path.join(outdir, *path.split('/'))
+        root = os.path.realpath(outdir)
+        if os.path.isabs(path) or os.path.commonpath([root, os.path.realpath(outname)]) != root:
+            raise Exception(f"Error en la descarga: the node {path} resolves outside {outdir}")
+        return outname
+
+    def download_nodes(self, image_id : str, outdir : str, patterns : List[str], verbose : int = 0, 
+                       workers : int = 4, sink : Sink | None = None) -> List[str]:
+        """
+        Download only the files of a product that match the given patterns.
+
+        Parameters
+        ----------
+        image_id : str
+            The unique identifier of the image to download.
+        outdir : str
+            The output directory where the SAFE-like tree will be created.
+        patterns : List[str]
+            Shell-style patterns (e.g. ``'*_B04_10m.jp2'``, ``'MTD_*.xml'``) matched against
+            both the relative path inside the product and the file name.
+        verbose : int
+            Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        workers : int
+            Number of files downloaded concurrently.
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to local files under ``outdir``.
+
+        Returns
+        -------
+        List[str]
+            The locations of the downloaded files, preserving the product directory layout.
+
+        Raises
+        ------
+        Exception
+            If listing the product nodes or any file download fails.
+
+        Notes
+        -----
+        - The product hierarchy is walked through the OData ``Nodes`` API so only the selected
+          files are transferred instead of the whole ``$value`` archive.
+        - The walk is sequential, while the matching files are fetched concurrently using
+          a shared authenticated session.
+        - Node names come from the server; any file path resolving outside ``outdir``
+          is rejected before downloading.
+        """
+        keycloak_token = self.__get_token()
+        session = requests.Session()
+        session.headers.update({'Authorization': f'Bearer {keycloak_token}'})
+
+        files = [ (self.__get_node_outname(outdir, path), url) for path, url in self.__walk_nodes(session, image_id, patterns) ]
+
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            futures = [ executor.submit(self.__download_node, session, url, outname, sink) for outname, url in files ]
+            
+            if verbose == 0:
+                return [ future.result() for future in futures ]
+            else:
+                return [ future.result() for future in tqdm(futures, total = len(futures), unit = 'file',
+                                                            desc = f"Downloading {len(futures)} files of {image_id}") ]
\ No newline at end of file
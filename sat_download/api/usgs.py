@@ -1,14 +1,36 @@
 import requests
+import atexit
+import weakref
 import json
-import re
+import time
 import os
 
-from tqdm import tqdm
-from typing import List
+from uuid import uuid4
+from dataclasses import replace
+from typing import Dict, List, Tuple
 from sat_download.api.base import SatelliteAPI
-from sat_download.data_types.search import SearchFilters, SearchResults
+from sat_download.data_types.search import SatelliteImage, SearchFilters, SearchResults
 from sat_download.factories.search import get_satellite_image
 from sat_download.enums import COLLECTIONS
+from sat_download.geometry import geojson_to_wkt, get_bbox, parse_wkt
+from sat_download.sinks import Sink
+from sat_download.utils.decoding import loads
+from sat_download.utils.locking import FileLock
+from sat_download.utils.profiling import profile
+
+
+_SESSIONS : 'weakref.WeakSet[USGSAPI]' = weakref.WeakSet()
+
+
+def _close_sessions() -> None:
+    """
+    Log out the private sessions of the clients still alive at exit.
+    """
+    for api in list(_SESSIONS):
+        api.close()
+
+
+atexit.register(_close_sessions)
 
 
 class USGSAPI(SatelliteAPI):
@@ -31,18 +53,46 @@ class USGSAPI(SatelliteAPI):
         Base URL for the USGS M2M API
     LOGIN_ENDPOINT : str
         Endpoint for authentication
+    LOGOUT_ENDPOINT : str
+        Endpoint for invalidating the session token
     SEARCH_ENDPOINT : str
         Endpoint for searching scenes
     DOWNLOAD_REQUEST_ENDPOINT : str
         Endpoint for requesting download URLs
     DOWNLOAD_OPTIONS_ENDPOINT : str
         Endpoint for fetching download options
+    DOWNLOAD_RETRIEVE_ENDPOINT : str
+        Endpoint for polling the download URLs of an order
+    DATASET_FILTERS_ENDPOINT : str
+        Endpoint for listing the metadata filters of a dataset
+    MAX_BATCH_TILES : int
+        Maximum number of path/row pairs OR-combined in a single batch query
+    PAGE_SIZE : int
+        Number of scenes requested per page when paging batch queries
+    LATEST_PAGE_SIZE : int
+        Number of sorted scenes requested per tile when looking for the newest one
+    METADATA_TYPE : str
+        Scene metadata detail requested from scene-search, 'summary' keeps pages lean
+    TOKEN_LIFETIME : int
+        Seconds a cached session token is reused before logging in again
+    AUTH_ERRORS : Tuple[str, ...]
+        M2M error codes signalling an expired or invalid session token
+    quicklooks : bool
+        Always True, scene searches return the browse image of every scene
         
     Notes
     -----
     Authentication is performed using API tokens which must be generated
     through the USGS Earth Explorer portal. The password parameter should
     actually be the API token, not the user's password.
+
+    When ``token_cache`` is given, the session token is shared across processes
+    through that file, so short-lived workers skip the login round-trip. Expired
+    tokens are detected from the M2M error codes and renewed transparently.
+
+    M2M only returns download URLs through a download order. Every search of a
+    client adds its scenes to the same order, labelled ``search_label``, instead
+    of opening a new order per page; ``order`` still opens one order per call.
     
     See Also
     --------
@@ -51,12 +101,22 @@ class USGSAPI(SatelliteAPI):
     """
     API_URL = "https://m2m.cr.usgs.gov/api/api/json/stable/"
     LOGIN_ENDPOINT = "login-token"
+    LOGOUT_ENDPOINT = "logout"
     SEARCH_ENDPOINT = "scene-search"
     DOWNLOAD_REQUEST_ENDPOINT = "download-request"
     DOWNLOAD_OPTIONS_ENDPOINT = 'download-options'
+    DOWNLOAD_RETRIEVE_ENDPOINT = 'download-retrieve'
+    DATASET_FILTERS_ENDPOINT = 'dataset-filters'
+    MAX_BATCH_TILES = 100
+    PAGE_SIZE = 100
+    LATEST_PAGE_SIZE = 10
+    METADATA_TYPE = 'summary'
+    TOKEN_LIFETIME = 6600
+    AUTH_ERRORS = ('AUTH_INVALID', 'AUTH_UNAUTHORIZED', 'AUTH_UNAUTHROIZED', 'AUTH_KEY_INVALID', 'AUTH_EXPIRED')
+    quicklooks = True
 
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, token_cache : str | None = None):
         """
         Initialize USGS API client and authenticate with the service.
         
@@ -66,18 +126,67 @@ class USGSAPI(SatelliteAPI):
             Username for authentication with the USGS Earth Explorer API
         password : str
             API token for authentication (not the user's password)
+        token_cache : str | None
+            JSON file where session tokens are shared across processes. If None,
+            every client logs in on its own and logs out on shutdown.
         
         Notes
         -----
         Automatically calls the __login method to authenticate with USGS.
         """
         super().__init__(username, password)
+        self.token_cache = token_cache
+        self.wrs_filter_ids : Dict[str, Tuple[str, str]] = {}
+        self.search_label = f"sat_download-{uuid4().hex}"
         self.__login()
 
-    def __login(self):
+        if self.token_cache is None:
+            _SESSIONS.add(self)
+
+    def __read_cache(self) -> dict:
+        """
+        Read the shared token cache.
+        """
+        if not os.path.exists(self.token_cache):
+            return {}
+
+        with open(self.token_cache) as file:
+            return json.load(file)
+
+    def __write_cache(self, cache : dict) -> None:
+        """
+        Atomically write the shared token cache, readable by its owner only.
+        """
+        temporal = f"{self.token_cache}.{uuid4().hex}.tmp"
+        with os.fdopen(os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as file:
+            json.dump(cache, file)
+        os.replace(temporal, self.token_cache)
+
+    def __request_token(self) -> str:
+        """
+        Request a new session token from the login endpoint.
+        """
+        payload = {'username' : self.username, 'token' : self.password}
+        payload = json.dumps(payload)
+
+        response = requests.post(f'{self.API_URL}{self.LOGIN_ENDPOINT}', payload)
+        response = loads(response.content)
+
+        if response['errorCode'] is None:
+            return response['data']
+        else:
+            raise Exception(response['errorCode'])
+
+    def __login(self, stale : str | None = None):
         """
         Authenticate with the USGS Earth Explorer API.
         
+        Parameters
+        ----------
+        stale : str | None
+            Session token the server rejected. A cached token equal to it is
+            replaced, while a different one was already renewed by another worker
+        
         Returns
         -------
         None
@@ -91,18 +200,93 @@ class USGSAPI(SatelliteAPI):
         Notes
         -----
         Private method that handles authentication and stores the token
-        for use with subsequent API requests.
+        for use with subsequent API requests. With a token cache, the cache
+        is read and updated under a file lock so concurrent workers log in once,
+        even when they all see the same token rejected.
         """
-        payload = {'username' : self.username, 'token' : self.password}
-        payload = json.dumps(payload)
+        if self.token_cache is None:
+            self.api_key = {'X-Auth-Token': self.__request_token()}
+            return
 
-        response = requests.post(f'{self.API_URL}{self.LOGIN_ENDPOINT}', payload)
-        response = json.loads(response.text)
+        with FileLock(f"{self.token_cache}.lock"):
+            cache = self.__read_cache()
+            entry = cache.get(self.username)
 
-        if response['errorCode'] is None:
-            self.api_key = {'X-Auth-Token': response['data']}
-        else:
-            raise Exception(response['errorCode'])    
+            if entry is None or entry['token'] == stale or entry['expires'] <= time.time():
+                entry = {'token' : self.__request_token(), 'expires' : time.time() + self.TOKEN_LIFETIME}
+                cache[self.username] = entry
+                self.__write_cache(cache)
+
+        self.api_key = {'X-Auth-Token': entry['token']}
+
+    def __post(self, endpoint : str, payload : str) -> dict:
+        """
+        Send an authenticated request, renewing the session token once if it expired.
+        
+        Parameters
+        ----------
+        endpoint : str
+            The M2M endpoint to call
+        payload : str
+            JSON string with the request payload
+            
+        Returns
+        -------
+        dict
+            The decoded M2M response, including its ``errorCode``
+        """
+        with profile(self.profiler, 'request'):
+            response = requests.post(f'{self.API_URL}{endpoint}', payload, headers = self.api_key)
+        with profile(self.profiler, 'decode'):
+            response = loads(response.content)
+
+        if response['errorCode'] in self.AUTH_ERRORS:
+            self.__login(stale = self.api_key['X-Auth-Token'])
+            with profile(self.profiler, 'request'):
+                response = requests.post(f'{self.API_URL}{endpoint}', payload, headers = self.api_key)
+            with profile(self.profiler, 'decode'):
+                response = loads(response.content)
+
+        return response
+
+    def logout(self) -> None:
+        """
+        Invalidate the session token and drop it from the token cache.
+        """
+        if getattr(self, 'api_key', None) is None:
+            return
+
+        try:
+            requests.post(f'{self.API_URL}{self.LOGOUT_ENDPOINT}', headers = self.api_key)
+        finally:
+            if self.token_cache is not None:
+                with FileLock(f"{self.token_cache}.lock"):
+                    cache = self.__read_cache()
+                    if cache.get(self.username, {}).get('token') == self.api_key['X-Auth-Token']:
+                        del cache[self.username]
+                        self.__write_cache(cache)
+            self.api_key = None
+
+    def close(self) -> None:
+        """
+        Release the session on shutdown.
+        
+        Notes
+        -----
+        Tokens shared through a token cache are left alive for the other
+        processes and simply expire; private tokens are logged out.
+        """
+        if self.token_cache is None:
+            try:
+                self.logout()
+            except Exception:
+                pass
+
+    def __enter__(self) -> 'USGSAPI':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     def search(self, filters: SearchFilters) -> SearchResults:
         """
@@ -130,37 +314,328 @@ class USGSAPI(SatelliteAPI):
         """
         query = self.__prepare_query(filters)
         
-        response = requests.post(f"{self.API_URL}{self.SEARCH_ENDPOINT}", query, headers=self.api_key)
-        response = json.loads(response.text)
+        with profile(self.profiler, 'search', f"{filters.collection} {filters.start_date}/{filters.end_date}"):
+            response = self.__post(self.SEARCH_ENDPOINT, query)
+
+            if response["errorCode"] is None and bool(response["data"]["results"]):
+                return self.__prepare_search_results(filters, response["data"])
+            elif response["errorCode"] is None:
+                return {}
+            else:
+                raise Exception(response["errorCode"])
+
+    def __prepare_search_results(self, filters : SearchFilters, scenes : dict) -> SearchResults:
+        """
+        Convert a scene search response page to standardized search results.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters used for the query, applied client-side as well
+        scenes : dict
+            Dictionary containing scene search results
+            
+        Returns
+        -------
+        SearchResults
+            Dictionary mapping download URLs to SatelliteImage objects
+            
+        Notes
+        -----
+        Private method that keeps the scenes matching the client-side filters,
+        requests their download URLs and keeps only those already available.
+        Scenes still being prepared are left out; see ``order`` and ``retrieve``.
+        """
+        matching = [ scene for scene in scenes["results"] if self.__matches(filters, scene) ]
+        if not matching:
+            return {}
 
-        if response["errorCode"] is None and bool(response["data"]["results"]):
-            scenes = response["data"]
-            metadata = self.__request_download_metadata(filters.collection, scenes)
+        metadata = self.__request_download_metadata(filters.collection, {'results' : matching}, self.search_label)
 
-            results = {}
+        results = {}
 
-            for scene in scenes["results"]:
-                if filters.is_set('processing_level') and (not filters.processing_level in scene["displayId"]):
-                    continue
+        for scene in matching:
+            image_id = scene["entityId"]
 
-                if filters.is_set('tile_id') and (not f'_{filters.tile_id}_' in scene['displayId']):
-                    continue
+            url = next(
+                (met["url"] for met in metadata["availableDownloads"] if met["entityId"] == image_id),
+                None
+            )
 
-                image_id = scene["entityId"]
+            if url:
+                results[url] = self.__get_image(filters, scene, metadata["fileSizes"].get(image_id))
 
-                url = next(
-                    (met["url"] for met in metadata["availableDownloads"] if met["entityId"] == image_id),
-                    None
-                )
+        return results
 
-                if url:
-                    results[url] = get_satellite_image(COLLECTIONS(filters.collection), {'Name' : scene["displayId"]})
+    def __matches(self, filters : SearchFilters, scene : dict) -> bool:
+        """
+        Check whether a scene matches the filters applied client-side.
+        """
+        if filters.is_set('processing_level') and (not filters.processing_level in scene["displayId"]):
+            return False
 
-            return results
+        if filters.is_set('tile_id') and (not f'_{filters.tile_id}_' in scene['displayId']):
+            return False
 
-        else:
+        return True
+
+    def __get_image(self, filters : SearchFilters, scene : dict, size : int | None = None) -> SatelliteImage:
+        """
+        Build the SatelliteImage of a scene search result.
+        """
+        with profile(self.profiler, 'parse'):
+            return get_satellite_image(COLLECTIONS(filters.collection), 
+                                       {'Name' : scene["displayId"], 'PublicationDate' : scene.get("publishDate"),
+                                        'Footprint' : geojson_to_wkt(scene["spatialCoverage"]) if scene.get("spatialCoverage") else None,
+                                        'ContentLength' : size,
+                                        'Quicklook' : next((browse.get('browsePath') for browse in scene.get('browse') or []), None)})
+
+    def order(self, filters : SearchFilters) -> Tuple[str | None, Dict[str, SatelliteImage]]:
+        """
+        Submit a download order for every scene matching the filters.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters selecting the scenes to order
+            
+        Returns
+        -------
+        Tuple[str | None, Dict[str, SatelliteImage]]
+            The unique order label (None if nothing matched) and a dictionary
+            mapping the ordered entity IDs to SatelliteImage objects
+            
+        Raises
+        ------
+        Exception
+            If any API request fails
+            
+        Notes
+        -----
+        Unlike ``search``, scenes that M2M is still preparing are kept. Their
+        URLs are obtained later by polling ``retrieve`` with the order label.
+        The scene search is paged through ``startingNumber`` until exhausted,
+        so the order holds every matching scene, not only the first page.
+        """
+        payload = self.__prepare_payload(filters)
+        payload['maxResults'] = self.PAGE_SIZE
+
+        scenes : Dict[str, dict] = {}
+        starting_number = 1
+        while True:
+            payload['startingNumber'] = starting_number
+            response = self.__post(self.SEARCH_ENDPOINT, json.dumps(payload))
+            if response["errorCode"] is not None:
+                raise Exception(response["errorCode"])
+
+            page = response["data"]
+            for scene in page["results"]:
+                if self.__matches(filters, scene):
+                    scenes.setdefault(scene["entityId"], scene)
+
+            if page["recordsReturned"] < self.PAGE_SIZE or not page.get("nextRecord"):
+                break
+            starting_number = page["nextRecord"]
+
+        matching = list(scenes.values())
+        if not matching:
+            return None, {}
+
+        label = f"sat_download-{uuid4().hex}"
+        metadata = self.__request_download_metadata(filters.collection, {'results' : matching}, label)
+
+        return label, { scene["entityId"] : self.__get_image(filters, scene, metadata["fileSizes"].get(scene["entityId"])) 
+                        for scene in matching }
+
+    def retrieve(self, label : str) -> Dict[str, str]:
+        """
+        Poll the download URLs that are ready for an order.
+        
+        Parameters
+        ----------
+        label : str
+            The order label returned by ``order``
+            
+        Returns
+        -------
+        Dict[str, str]
+            Dictionary mapping entity IDs to their download URLs
+            
+        Raises
+        ------
+        Exception
+            If the API request fails
+        """
+        response = self.__post(self.DOWNLOAD_RETRIEVE_ENDPOINT, json.dumps({'label' : label}))
+        if response["errorCode"] is not None:
             raise Exception(response["errorCode"])
 
+        return { item["entityId"] : item["url"] for item in response["data"]["available"] if item.get("url") }
+
+    def __get_wrs_filter_ids(self, dataset : str) -> Tuple[str, str]:
+        """
+        Get the metadata filter identifiers of the WRS path and row fields of a dataset.
+        
+        Parameters
+        ----------
+        dataset : str
+            The collection identifier
+            
+        Returns
+        -------
+        Tuple[str, str]
+            The (path, row) metadata filter identifiers
+            
+        Raises
+        ------
+        Exception
+            If the request fails or the dataset has no WRS fields
+
+        Notes
+        -----
+        The identifiers are cached per dataset, so only the first batch or
+        per-tile query of a dataset pays the dataset-filters round-trip.
+        """
+        if dataset in self.wrs_filter_ids:
+            return self.wrs_filter_ids[dataset]
+
+        payload = json.dumps({'datasetName' : dataset})
+
+        response = self.__post(self.DATASET_FILTERS_ENDPOINT, payload)
+
+        if response['errorCode'] is not None:
+            raise Exception(response['errorCode'])
+
+        fields = { field['fieldLabel'] : field['id'] for field in response['data'] }
+        path_id = next((field_id for label, field_id in fields.items() if 'WRS Path' in label), None)
+        row_id = next((field_id for label, field_id in fields.items() if 'WRS Row' in label), None)
+
+        if path_id is None or row_id is None:
+            raise Exception(f"Dataset {dataset} has no WRS path/row filters")
+
+        self.wrs_filter_ids[dataset] = (path_id, row_id)
+        return path_id, row_id
+
+    def __wrs_clause(self, path_id : str, row_id : str, tile : str) -> dict:
+        """
+        Build the metadata filter matching a single ``PPPRRR`` path/row tile.
+        """
+        return { 'filterType' : 'and', 'childFilters' : [
+            { 'filterType' : 'value', 'filterId' : path_id, 'value' : str(int(tile[:3])), 'operand' : '=' },
+            { 'filterType' : 'value', 'filterId' : row_id, 'value' : str(int(tile[3:])), 'operand' : '=' },
+        ] }
+
+    def latest(self, filters : SearchFilters) -> SearchResults:
+        """
+        Search the newest scene matching the filters.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters to apply
+            
+        Returns
+        -------
+        SearchResults
+            Dictionary holding the newest matching scene, empty if none matches
+            
+        Raises
+        ------
+        Exception
+            If the API request fails
+            
+        Notes
+        -----
+        The tile is matched server-side through the WRS path/row metadata filter
+        and scenes are requested sorted by descending acquisition date, only
+        ``LATEST_PAGE_SIZE`` of them. Download URLs are requested for the newest
+        scene passing the client-side filters only.
+        """
+        payload = self.__prepare_payload(filters)
+        payload['maxResults'] = self.LATEST_PAGE_SIZE
+        payload['sortField'] = 'acquisitionDate'
+        payload['sortDirection'] = 'DESC'
+        if filters.is_set('tile_id'):
+            payload['sceneFilter']['metadataFilter'] = self.__wrs_clause(*self.__get_wrs_filter_ids(filters.collection), filters.tile_id)
+
+        with profile(self.profiler, 'search', f"{filters.collection} {filters.tile_id} latest"):
+            response = self.__post(self.SEARCH_ENDPOINT, json.dumps(payload))
+            if response["errorCode"] is not None:
+                raise Exception(response["errorCode"])
+
+            collection = COLLECTIONS(filters.collection)
+            candidates = [ scene for scene in response["data"]["results"] if self.__matches(filters, scene) ]
+            if not candidates:
+                return {}
+
+            newest = max(candidates, key = lambda scene: get_satellite_image(collection, {'Name' : scene["displayId"]}).date)
+            return self.__prepare_search_results(filters, {'results' : [ newest ]})
+
+    def batch_search(self, filters : SearchFilters, tiles : List[str]) -> Dict[str, SearchResults]:
+        """
+        Search the same collection and date window over many path/row tiles with coalesced queries.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every tile; its ``tile_id`` is ignored
+        tiles : List[str]
+            The WRS-2 tile identifiers to search, formatted as ``PPPRRR``
+            
+        Returns
+        -------
+        Dict[str, SearchResults]
+            Dictionary mapping each tile identifier to its search results
+            
+        Raises
+        ------
+        Exception
+            If any API request fails
+            
+        Notes
+        -----
+        Up to ``MAX_BATCH_TILES`` path/row pairs are OR-combined into a single
+        ``metadataFilter``. Each coalesced query is paged through ``startingNumber``
+        until exhausted, and scenes are demultiplexed back by the path/row parsed
+        from their display ID.
+        """
+        results : Dict[str, SearchResults] = { tile : {} for tile in tiles }
+        path_id, row_id = self.__get_wrs_filter_ids(filters.collection)
+
+        shared = replace(filters, tile_id = None)
+        payload = self.__prepare_payload(shared)
+        payload['maxResults'] = self.PAGE_SIZE
+
+        unique = list(dict.fromkeys(tiles))
+        for start in range(0, len(unique), self.MAX_BATCH_TILES):
+            chunk = unique[start:start + self.MAX_BATCH_TILES]
+            payload['sceneFilter']['metadataFilter'] = {
+                'filterType' : 'or',
+                'childFilters' : [ self.__wrs_clause(path_id, row_id, tile) for tile in chunk ]
+            }
+
+            starting_number = 1
+            while True:
+                payload['startingNumber'] = starting_number
+                with profile(self.profiler, 'search', f"{filters.collection} {filters.start_date}/{filters.end_date} "
+                                                      f"{chunk[0]}+{len(chunk) - 1} tiles from {starting_number}"):
+                    response = self.__post(self.SEARCH_ENDPOINT, json.dumps(payload))
+
+                    if response["errorCode"] is not None:
+                        raise Exception(response["errorCode"])
+
+                    scenes = response["data"]
+                    if bool(scenes["results"]):
+                        for url, image in self.__prepare_search_results(shared, scenes).items():
+                            if image.tile in results:
+                                results[image.tile][url] = image
+
+                if scenes["recordsReturned"] < self.PAGE_SIZE or not scenes.get("nextRecord"):
+                    break
+                starting_number = scenes["nextRecord"]
+
+        return results
+
     def __prepare_query(self, filters : SearchFilters) -> str:
         """
         Prepare a USGS API query from search filters.
@@ -180,8 +655,32 @@ class USGSAPI(SatelliteAPI):
         Private method that converts SearchFilters into the specific
         format required by the USGS Earth Explorer API.
         """
-        payload = {'maxResults' : 20, 'startingNumber' : 1, 'sceneFilter' : {}}
+        return json.dumps(self.__prepare_payload(filters))
+
+    def __prepare_payload(self, filters : SearchFilters) -> dict:
+        """
+        Prepare the USGS API query payload from search filters.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters to convert to USGS API query parameters
+            
+        Returns
+        -------
+        dict
+            Dictionary containing USGS API query parameters
+
+        Notes
+        -----
+        A POLYGON geometry is sent as a GeoJSON spatial filter, holes included.
+        Points and multipolygons are sent as their bounding rectangle, a superset
+        of the multipolygon.
+        """
+        payload = {'maxResults' : 20, 'startingNumber' : 1, 'metadataType' : self.METADATA_TYPE, 'sceneFilter' : {}}
         acquisitionFilter = {}
+        ingestFilter = {}
+        cloudCoverFilter = {}
         spatialFilter = {}
 
         if filters.is_set('collection'):
@@ -190,22 +689,34 @@ class USGSAPI(SatelliteAPI):
             acquisitionFilter['start'] = filters.start_date
         if filters.is_set('end_date'):
             acquisitionFilter['end'] = filters.end_date
+        if filters.is_set('published_after'):
+            ingestFilter['start'] = filters.published_after[:10]
+        if filters.is_set('cloud_cover'):
+            cloudCoverFilter = {'min' : 0, 'max' : filters.cloud_cover, 'includeUnknown' : False}
         if filters.is_set('geometry'):
-            lon, lat = filters.geometry.replace(')', '').split('(')[-1].split(' ')
-            lon, lat = float(lon), float(lat)
-            
-            spatialFilter['filterType'] = 'mbr'
-            spatialFilter['lowerLeft'] = {'latitude': lat, 'longitude': lon}
-            spatialFilter['upperRight'] = {'latitude': lat, 'longitude': lon}
+            rings = parse_wkt(filters.geometry)
+
+            if filters.geometry.strip().upper().startswith('POLYGON'):
+                spatialFilter['filterType'] = 'geojson'
+                spatialFilter['geoJson'] = {'type' : 'Polygon', 'coordinates' : [ [ list(point) for point in ring ] for ring in rings ]}
+            else:
+                min_lon, min_lat, max_lon, max_lat = get_bbox([ point for ring in rings for point in ring ])
+                spatialFilter['filterType'] = 'mbr'
+                spatialFilter['lowerLeft'] = {'latitude': min_lat, 'longitude': min_lon}
+                spatialFilter['upperRight'] = {'latitude': max_lat, 'longitude': max_lon}
 
         if bool(spatialFilter):
             payload['sceneFilter']['spatialFilter'] = spatialFilter
         if bool(acquisitionFilter):
             payload['sceneFilter']['acquisitionFilter'] = acquisitionFilter
+        if bool(ingestFilter):
+            payload['sceneFilter']['ingestFilter'] = ingestFilter
+        if bool(cloudCoverFilter):
+            payload['sceneFilter']['cloudCoverFilter'] = cloudCoverFilter
 
-        return json.dumps(payload)
+        return payload
     
-    def __request_download_metadata(self, dataset, scenes):
+    def __request_download_metadata(self, dataset, scenes, label):
         """
         Request metadata needed for downloading images.
         
@@ -215,11 +726,14 @@ class USGSAPI(SatelliteAPI):
             The collection identifier for the search results
         scenes : dict
             Dictionary containing scene search results
+        label : str
+            Label of the download order the scenes are added to
             
         Returns
         -------
         dict
-            Download metadata including download URLs
+            Download metadata including download URLs, plus a ``fileSizes``
+            dictionary mapping entity IDs to the size in bytes of their bundle
             
         Raises
         ------
@@ -233,14 +747,16 @@ class USGSAPI(SatelliteAPI):
         """
         options = self.__get_downloads_options(dataset, scenes)
         download_ids = self.__get_download_ids(options)
+        requested = { (download['entityId'], download['productId']) for download in download_ids }
+        sizes = { product['entityId'] : product.get('filesize') for product in options 
+                  if (product['entityId'], product['id']) in requested }
 
-        payload = {'downloads' : download_ids, 'label' : 'sample'}
+        payload = {'downloads' : download_ids, 'label' : label}
         payload = json.dumps(payload)
-        response = requests.post(f'{self.API_URL}{self.DOWNLOAD_REQUEST_ENDPOINT}', payload, headers = self.api_key)
-        response = json.loads(response.text)
+        response = self.__post(self.DOWNLOAD_REQUEST_ENDPOINT, payload)
 
         if response['errorCode'] is None:
-            return response['data']
+            return {**response['data'], 'fileSizes' : sizes}
         else:
             raise Exception(response['errorCode'])
         
@@ -274,8 +790,7 @@ class USGSAPI(SatelliteAPI):
         payload = {'datasetName' : dataset, 'entityIds' : scene_ids}
         payload = json.dumps(payload)
 
-        response = requests.post(f'{self.API_URL}{self.DOWNLOAD_OPTIONS_ENDPOINT}', payload, headers = self.api_key)
-        response = json.loads(response.text)
+        response = self.__post(self.DOWNLOAD_OPTIONS_ENDPOINT, payload)
     
         if response['errorCode'] is None:
             return response['data']
@@ -308,7 +823,7 @@ class USGSAPI(SatelliteAPI):
 
         return download_ids 
     
-    def download(self, image_id : str, outname : str, verbose : int) -> str | None:
+    def download(self, image_id : str, outname : str, verbose : int, sink : Sink | None = None) -> str | None:
         """
         Download a satellite image by its ID (URL).
         
@@ -320,40 +835,35 @@ class USGSAPI(SatelliteAPI):
             The output filename where the image will be saved
         verbose : int
             Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to a local file at ``outname``.
 
         Returns
         -------
-        None
-            The file is saved to the specified location on success
+        str | None
+            The location of the downloaded image, as reported by the sink.
+            Returns None if the download fails.
             
         Notes
         -----
         Implementation of the abstract download method for USGS API.
         Uses tqdm to display a progress bar during download.
+        Stalled transfers are resumed from their current offset with a ``Range`` request.
         Unlike other APIs, the image_id parameter is actually the download URL.
         """
-        MB = (1024 * 1024)
-
         try:        
-            response = requests.get(image_id, stream=True)
+            with profile(self.profiler, 'download', os.path.basename(outname)):
+                with profile(self.profiler, 'request'):
+                    response = requests.get(image_id, stream=True, timeout = (30, self.STALL_WINDOW))
 
-            if response.status_code == 200:
-                disposition = response.headers['content-disposition']
+                def reopen(offset : int, attempt : int) -> requests.Response:
+                    with profile(self.profiler, 'resume'):
+                        return requests.get(image_id, headers = {'Range' : f"bytes={offset}-"}, stream = True, 
+                                            timeout = (30, self.STALL_WINDOW))
 
-                total_size = int(response.headers.get('Content-Length', 0)) // MB
-
-                filename = re.findall("filename=(.+)", disposition)[0].strip("\"")
-                with open(outname, 'wb') as new_file:
-                    if verbose == 0:
-                        for chunk in response.iter_content(chunk_size = MB):
-                            new_file.write(chunk)
-                    else:
-                        for chunk in tqdm(response.iter_content(chunk_size = MB), total = total_size,
-                                          unit = 'MB', desc = f"Downloading image at {os.path.basename(outname)}"):
-                            new_file.write(chunk)
-            
-                return outname
-            else:
-                raise Exception(f"Error en la descarga: {response.status_code}")
+                if response.status_code == 200:
+                    return self._write_stream(response, outname, sink, verbose, reopen)
+                else:
+                    raise Exception(f"Error en la descarga: {response.status_code}")
         except Exception as e:
             print(f"Failed to download from {image_id}. {e}.")
\ No newline at end of file
@@ -0,0 +1,343 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+from typing import Iterator, List, Set
+
+
+JOURNAL_NAME = '.sat-download.jsonl'
+API_LOCK = threading.Lock()
+
+
+class Reporter:
+    """
+    Progress output of a run, either human readable lines or one JSON object per event.
+
+    Parameters
+    ----------
+    json_output : bool
+        Whether to emit JSON lines instead of text
+
+    Notes
+    -----
+    Events are written to the standard output current when the reporter is
+    created, so it keeps working while ``run`` redirects library output.
+    """
+    def __init__(self, json_output : bool = False) -> None:
+        self.json_output = json_output
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stream = sys.stdout
+
+    def emit(self, event : str, message : str, **fields) -> None:
+        """
+        Report an event.
+
+        Parameters
+        ----------
+        event : str
+            The event name (``search``, ``plan``, ``download``, ``error``, ``summary`` or ``profile``)
+        message : str
+            The human readable description of the event
+        **fields
+            The machine readable fields of the event
+        """
+        with self.lock:
+            if self.json_output:
+                print(json.dumps({'event' : event, 'elapsed' : round(time.monotonic() - self.started, 3), **fields}),
+                      file = self.stream, flush = True)
+            else:
+                print(message, file = self.stream, flush = True)
+
+
+def load_spec(path : str) -> dict:
+    """
+    Load and validate a job spec.
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON job spec
+
+    Returns
+    -------
+    dict
+        The job spec
+
+    Raises
+    ------
+    Exception
+        If the spec has no ``outdir`` or no ``jobs``
+
+    Examples
+    --------
+    A job spec lists the jobs to run and where to store the products::
+
+        {
+            "outdir": "downloads",
+            "workers": 4,
+            "jobs": [
+                {"collection": "SENTINEL-2", "windows": [["2024-01-01", "2024-03-31"]],
+                 "tiles": ["30TVK", "30TWK"], "filters": {"processing_level": "L2A", "cloud_cover": 20}},
+                {"collection": "landsat_ot_c2_l1", "start_date": "2024-01-01", "end_date": "2024-03-31",
+                 "geometries": ["POINT(-3.7 40.4)"]}
+            ]
+        }
+
+    Credentials are read from the optional ``credentials`` section or from the
+    ``COPERNICUS_USERNAME``/``COPERNICUS_PASSWORD`` and ``USGS_USERNAME``/``USGS_TOKEN``
+    environment variables.
+    """
+    with open(path) as file:
+        spec = json.load(file)
+
+    if 'outdir' not in spec or not spec.get('jobs'):
+        raise Exception(f"The job spec {path} needs an 'outdir' and a non empty 'jobs' list")
+    return spec
+
+
+def expand_job(job : dict) -> Iterator[tuple]:
+    """
+    Expand a job of the spec into its individual searches.
+
+    Parameters
+    ----------
+    job : dict
+        A job of the spec
+
+    Returns
+    -------
+    Iterator[tuple]
+        ``(SearchFilters, tiles)`` pairs, where ``tiles`` is None for plain searches
+    """
+    from sat_download.data_types.search import SearchFilters
+
+    windows = job.get('windows') or [ (job['start_date'], job['end_date']) ]
+    geometries = job.get('geometries') or [ None ]
+
+    for start_date, end_date in windows:
+        for geometry in geometries:
+            filters = SearchFilters(collection = job['collection'], start_date = start_date, end_date = end_date,
+                                    geometry = geometry, **job.get('filters', {}))
+            yield filters, job.get('tiles')
+
+
+def get_api(collection : str, spec : dict, apis : dict):
+    """
+    Get the provider client serving a collection, creating it on first use.
+    """
+    from sat_download.enums import COLLECTIONS
+
+    provider = 'usgs' if COLLECTIONS(collection) == COLLECTIONS.LANDSAT_8 else 'odata'
+    with API_LOCK:
+        if provider not in apis:
+            credentials = spec.get('credentials', {}).get(provider, {})
+            if provider == 'usgs':
+                from sat_download.api.usgs import USGSAPI
+                apis[provider] = USGSAPI(credentials.get('username', os.environ.get('USGS_USERNAME')),
+                                         credentials.get('token', os.environ.get('USGS_TOKEN')),
+                                         credentials.get('token_cache', os.environ.get('USGS_TOKEN_CACHE')))
+            else:
+                from sat_download.api.odata import ODataAPI
+                apis[provider] = ODataAPI(credentials.get('username', os.environ.get('COPERNICUS_USERNAME')),
+                                          credentials.get('password', os.environ.get('COPERNICUS_PASSWORD')))
+        return apis[provider]
+
+
+def load_journal(path : str) -> Set[str]:
+    """
+    Load the file names of the products completed by previous runs.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    with open(path) as file:
+        return { json.loads(line)['filename'] for line in file if line.strip() }
+
+
+def run(spec : dict, workers : int, dry_run : bool = False, resume : bool = False, json_output : bool = False,
+        profile : str | None = None) -> int:
+    """
+    Run every job of a spec through the pipelined search-and-download engine.
+
+    Parameters
+    ----------
+    spec : dict
+        The job spec
+    workers : int
+        Number of concurrent downloads
+    dry_run : bool
+        Whether to only search and report the download plan
+    resume : bool
+        Whether to skip the products completed by previous runs
+    json_output : bool
+        Whether to report progress as JSON lines
+    profile : str | None
+        Path prefix of the profiling outputs: a JSON report (``.json``) and a
+        collapsed stack file (``.folded``). Profiling is disabled if None.
+
+    Returns
+    -------
+    int
+        The process exit code, 1 if any search or download failed
+
+    Notes
+    -----
+    Searches run concurrently and each batch of results is handed to the
+    download pool, largest products first, as soon as it arrives, so
+    transfers overlap with the remaining searches. Each download is reported
+    as soon as it finishes. Completed products are appended to a journal in
+    ``outdir`` that ``resume`` reads back.
+
+    With ``json_output`` the diagnostics printed by the library are sent to
+    the standard error, so the standard output only holds JSON lines.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+    from contextlib import nullcontext, redirect_stdout
+    from dataclasses import replace
+    from sat_download.services.downloader import SatelliteImageDownloader
+    from sat_download.services.planner import plan_downloads
+    from sat_download.utils.profiling import Profiler
+
+    outdir = spec['outdir']
+    os.makedirs(outdir, exist_ok = True)
+    journal = os.path.join(outdir, JOURNAL_NAME)
+    completed = load_journal(journal) if resume else set()
+    reporter = Reporter(json_output)
+    journal_lock = threading.Lock()
+    apis : dict = {}
+    profiler = Profiler().start() if profile else None
+
+    def search(filters, tiles : List[str] | None):
+        downloader = SatelliteImageDownloader(get_api(filters.collection, spec, apis), profiler = profiler)
+        if tiles:
+            results = {}
+            for partial in downloader.api.batch_search(filters, tiles).values():
+                results.update(partial)
+            return downloader, results
+        return downloader, downloader.api.bulk_search(replace(filters))
+
+    def download(downloader, download_id : str, filename : str) -> str | None:
+        path = downloader.download(download_id, outdir, filename)
+        if path is not None:
+            with journal_lock, open(journal, 'a') as file:
+                file.write(json.dumps({'filename' : filename, 'path' : path}) + '\n')
+        return path
+
+    searches = [ search_args for job in spec['jobs'] for search_args in expand_job(job) ]
+    seen : Set[str] = set(completed)
+    failures, planned_size, finished, submitted = 0, 0, 0, 0
+    counter_lock = threading.Lock()
+
+    def report_download(future : Future, image) -> None:
+        nonlocal failures, finished
+        try:
+            path = future.result()
+        except Exception as exc:
+            print(exc)
+            path = None
+
+        with counter_lock:
+            finished += 1
+            if path is None:
+                failures += 1
+            reporter.emit('download', f"[{finished}/{submitted}] {image.filename} {'ok' if path else 'failed'}",
+                          filename = image.filename, path = path, done = finished, total = submitted)
+
+    with (redirect_stdout(sys.stderr) if json_output else nullcontext()), \
+         ThreadPoolExecutor(max_workers = spec.get('search_workers', 4)) as search_pool, \
+         ThreadPoolExecutor(max_workers = workers) as download_pool:
+        futures = { search_pool.submit(search, filters, tiles) : filters for filters, tiles in searches }
+
+        for future in as_completed(futures):
+            filters = futures[future]
+            try:
+                downloader, results = future.result()
+            except Exception as exc:
+                with counter_lock:
+                    failures += 1
+                reporter.emit('error', f"Search of {filters.collection} {filters.start_date}/{filters.end_date} failed. {exc}",
+                              collection = filters.collection, error = str(exc))
+                continue
+
+            fresh = { download_id : image for download_id, image in results.items() if image.filename not in seen }
+            seen.update(image.filename for image in fresh.values())
+            plan = plan_downloads(fresh)
+            planned_size += plan.total_size
+            reporter.emit('search', f"{filters.collection} {filters.start_date}/{filters.end_date}: "
+                          f"{len(results)} products, {len(fresh)} new ({plan.total_size / 1e9:.2f} GB)",
+                          collection = filters.collection, start_date = filters.start_date, end_date = filters.end_date,
+                          products = len(results), new = len(fresh), size = plan.total_size)
+
+            for download_id in plan.order:
+                if dry_run:
+                    reporter.emit('plan', f"  {fresh[download_id].filename}", filename = fresh[download_id].filename,
+                                  size = plan.sizes[download_id])
+                else:
+                    with counter_lock:
+                        submitted += 1
+                    image = fresh[download_id]
+                    download_pool.submit(download, downloader, download_id, image.filename) \
+                        .add_done_callback(lambda future, image = image: report_download(future, image))
+
+    downloaded = finished - failures if not dry_run else 0
+    reporter.emit('summary', f"{len(seen) - len(completed)} products ({planned_size / 1e9:.2f} GB), "
+                  f"{downloaded} downloaded, {failures} failures",
+                  products = len(seen) - len(completed), size = planned_size, downloaded = downloaded, failures = failures,
+                  dry_run = dry_run)
+
+    if profiler is not None:
+        profiler.stop()
+        profiler.write_report(f"{profile}.json")
+        profiler.write_collapsed(f"{profile}.folded")
+        if not json_output:
+            print(profiler.report())
+        reporter.emit('profile', f"Profile written to {profile}.json and {profile}.folded",
+                      report = f"{profile}.json", collapsed = f"{profile}.folded")
+    return 1 if failures else 0
+
+
+def main(argv : List[str] | None = None) -> int:
+    """
+    Entry point of the ``sat-download`` command.
+
+    Parameters
+    ----------
+    argv : List[str] | None
+        The command line arguments, ``sys.argv[1:]`` if None
+
+    Returns
+    -------
+    int
+        The process exit code
+
+    Notes
+    -----
+    Heavy dependencies (``requests``, ``tqdm``, ``fsspec`` and the provider clients) are only
+    imported once a job actually runs, so ``sat-download --help`` and cron
+    invocations start fast.
+    """
+    parser = argparse.ArgumentParser(prog = 'sat-download', description = "Search and download satellite products described by a JSON job spec.")
+    parser.add_argument('spec', help = "Path of the JSON job spec")
+    parser.add_argument('-w', '--workers', type = int, default = None, help = "Number of concurrent downloads (default: spec 'workers' or 4)")
+    parser.add_argument('-n', '--dry-run', action = 'store_true', help = "Only search and print the download plan")
+    parser.add_argument('-r', '--resume', action = 'store_true', help = "Skip the products completed by previous runs")
+    parser.add_argument('--json', action = 'store_true', help = "Report progress as JSON lines")
+    parser.add_argument('--profile', metavar = 'PREFIX', default = None, 
+                        help = "Profile the run and write PREFIX.json and a flame graph compatible PREFIX.folded")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+    except Exception as exc:
+        print(exc, file = sys.stderr)
+        return 2
+
+    return run(spec, args.workers or spec.get('workers', 4), args.dry_run, args.resume, args.json, args.profile)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
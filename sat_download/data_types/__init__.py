@@ -1,3 +1,4 @@
 from sat_download.data_types.search import SatelliteImage, SearchFilters, SearchResults
+from sat_download.data_types.results import DiskSearchResults
 
-__all__ = ['SatelliteImage', 'SearchFilters', 'SearchResults']
\ No newline at end of file
+__all__ = ['SatelliteImage', 'SearchFilters', 'SearchResults', 'DiskSearchResults']
\ No newline at end of file
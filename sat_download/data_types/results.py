@@ -0,0 +1,176 @@
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from dataclasses import asdict
+from typing import Iterable, Iterator, Tuple
+from sat_download.data_types.search import SatelliteImage
+from sat_download.utils.decoding import loads
+
+
+class _ItemsView(ItemsView):
+    """
+    Items view streaming rows instead of looking up every key.
+    """
+    def __iter__(self) -> Iterator[Tuple[str, SatelliteImage]]:
+        return self._mapping.iter_rows()
+
+
+class _ValuesView(ValuesView):
+    """
+    Values view streaming rows instead of looking up every key.
+    """
+    def __iter__(self) -> Iterator[SatelliteImage]:
+        return (image for _, image in self._mapping.iter_rows())
+
+
+class DiskSearchResults(MutableMapping):
+    """
+    Search results stored in a local SQLite file instead of memory.
+
+    It implements the same mapping interface as ``SearchResults`` (product IDs
+    to SatelliteImage objects), so it can be passed to ``bulk_search`` to be
+    filled with constant memory and then to ``bulk_download``.
+
+    Parameters
+    ----------
+    path : str | None
+        Path of the SQLite file. If None, a temporary file is used and removed on ``close``.
+    batch_size : int
+        Number of rows fetched per query while iterating
+
+    Notes
+    -----
+    Iteration order is insertion order, as for a dict, and iteration streams
+    rows in batches so only ``batch_size`` products are held in memory. The
+    store is safe to share between the threads of a download pool.
+
+    Examples
+    --------
+    >>> with DiskSearchResults('inventory.sqlite') as results:
+    ...     api.bulk_search(filters, results)
+    ...     paths = downloader.bulk_download(results, 'downloads')
+    """
+    def __init__(self, path : str | None = None, batch_size : int = 1000) -> None:
+        self.temporal = path is None
+        if self.temporal:
+            handle, path = tempfile.mkstemp(suffix = '.sqlite')
+            os.close(handle)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread = False)
+
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS results (id TEXT PRIMARY KEY, data TEXT)")
+
+    def __encode(self, image : SatelliteImage) -> str:
+        """
+        Serialize a SatelliteImage into a row.
+        """
+        return json.dumps(asdict(image))
+
+    def __decode(self, data : str) -> SatelliteImage:
+        """
+        Deserialize a row into a SatelliteImage.
+        """
+        return SatelliteImage(**loads(data))
+
+    def __getitem__(self, key : str) -> SatelliteImage:
+        with self.lock:
+            row = self.connection.execute("SELECT data FROM results WHERE id = ?", (key, )).fetchone()
+
+        if row is None:
+            raise KeyError(key)
+        return self.__decode(row[0])
+
+    def __setitem__(self, key : str, image : SatelliteImage) -> None:
+        self.update([ (key, image) ])
+
+    def __delitem__(self, key : str) -> None:
+        with self.lock, self.connection:
+            deleted = self.connection.execute("DELETE FROM results WHERE id = ?", (key, )).rowcount
+
+        if not deleted:
+            raise KeyError(key)
+
+    def __contains__(self, key : object) -> bool:
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM results WHERE id = ?", (key, )).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self.iter_rows(decode = False))
+
+    def iter_rows(self, decode : bool = True) -> Iterator[Tuple[str, SatelliteImage]]:
+        """
+        Stream the stored products in insertion order.
+
+        Parameters
+        ----------
+        decode : bool
+            Whether to build the SatelliteImage objects or only read the keys
+
+        Returns
+        -------
+        Iterator[Tuple[str, SatelliteImage]]
+            Pairs of (product ID, SatelliteImage), or (product ID, None) when not decoding
+        """
+        column = "data" if decode else "NULL"
+        position = 0
+        while True:
+            with self.lock:
+                rows = self.connection.execute(f"SELECT rowid, id, {column} FROM results WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                               (position, self.batch_size)).fetchall()
+            if not rows:
+                return
+
+            for position, key, data in rows:
+                yield key, self.__decode(data) if decode else None
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _ValuesView(self)
+
+    def update(self, other : Iterable = (), **kwargs) -> None:
+        """
+        Store many products in a single transaction.
+
+        Parameters
+        ----------
+        other : SearchResults | Iterable[Tuple[str, SatelliteImage]]
+            The products to store; existing product IDs keep their position
+        """
+        pairs = other.items() if hasattr(other, 'items') else other
+        rows = [ (key, self.__encode(image)) for key, image in pairs ]
+        rows.extend((key, self.__encode(image)) for key, image in kwargs.items())
+
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT INTO results VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET data = excluded.data", rows)
+
+    def clear(self) -> None:
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        """
+        Close the store, removing its file if it is temporal.
+        """
+        self.connection.close()
+        if self.temporal and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> 'DiskSearchResults':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
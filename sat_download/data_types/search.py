@@ -1,4 +1,7 @@
-from typing import Dict, List
+import hashlib
+import json
+
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 
 
@@ -26,6 +29,18 @@ class SatelliteImage:
         Output filename for downloaded image
     tile : str
         Tile or path/row identifier for the image
+    published : str, optional
+        Publication timestamp of the product in the provider catalogue
+    footprint : str, optional
+        WKT footprint of the product
+    collection : str, optional
+        Collection the product was found in, used to trace results back to their provider
+    size : int, optional
+        Size of the product in bytes, when reported by the provider
+    quicklook : str, optional
+        URL of a low resolution preview of the product, when the provider offers one
+    checksum : str, optional
+        Provider checksum of the product as ``algorithm:value`` (e.g. ``md5:...``), when reported
     
     Notes
     -----
@@ -40,6 +55,12 @@ class SatelliteImage:
     identifier : str
     filename : str
     tile : str
+    published : str | None = None
+    footprint : str | None = None
+    collection : str | None = None
+    size : int | None = None
+    quicklook : str | None = None
+    checksum : str | None = None
 
 
 @dataclass
@@ -64,6 +85,18 @@ class SearchFilters:
         WKT geometry string for spatial filtering (e.g., 'POINT(lon lat)')
     tile_id : str, optional
         Specific tile identifier to filter by
+    contains : List[str], optional
+        Substrings that the product name must contain
+    published_after : str, optional
+        Only return products published after this ISO timestamp (e.g. '2024-10-01T12:00:00.000Z')
+    cloud_cover : float, optional
+        Maximum cloud cover percentage
+    product_type : str, optional
+        Provider product type (e.g. 'S2MSI2A', 'OL_1_EFR___')
+    orbit_direction : str, optional
+        Orbit direction, 'ASCENDING' or 'DESCENDING'
+    relative_orbit : int, optional
+        Relative orbit number
         
     Examples
     --------
@@ -73,6 +106,7 @@ class SearchFilters:
     ...     start_date="2024-10-01",
     ...     end_date="2024-10-31",
     ...     tile_id="30TWM",
+    ...     cloud_cover=20,
     ... )
     >>> filters.is_set('geometry')
     False
@@ -84,6 +118,11 @@ class SearchFilters:
     geometry : str | None = None
     tile_id : str | None = None
     contains : List[str] | None = None
+    published_after : str | None = None
+    cloud_cover : float | None = None
+    product_type : str | None = None
+    orbit_direction : str | None = None
+    relative_orbit : int | None = None
 
     def is_set(self, value : str) -> bool:
         """
@@ -100,6 +139,24 @@ class SearchFilters:
             True if the attribute exists and is not None, False otherwise
         """
         return self.__dict__.get(value, None) is not None
+
+    def get_key(self, exclude : Tuple[str, ...] = ('start_date', 'end_date', 'published_after')) -> str:
+        """
+        Get a stable hash identifying the query shape of the filters.
+        
+        Parameters
+        ----------
+        exclude : Tuple[str, ...]
+            Names of the attributes left out of the key, by default the date window
+            and the publication checkpoint
+            
+        Returns
+        -------
+        str
+            Hexadecimal digest of the remaining attributes
+        """
+        fields = { name : value for name, value in self.__dict__.items() if name not in exclude }
+        return hashlib.sha1(json.dumps(fields, sort_keys = True).encode()).hexdigest()
     
 
 # Type alias for search results
@@ -32,4 +32,33 @@ class COLLECTIONS(Enum):
     
     SENTINEL_2 : str = 'SENTINEL-2'
     SENTINEL_3 : str = 'SENTINEL-3'
-    LANDSAT_8 : str = 'landsat_ot_c2_l1'
\ No newline at end of file
+    LANDSAT_8 : str = 'landsat_ot_c2_l1'
+
+
+class DEDUP_POLICIES(Enum):
+    """
+    Enumeration of the policies used to choose between reprocessed variants of an acquisition.
+    
+    Providers may serve the same acquisition under several processing baselines
+    (e.g. Sentinel-2 N0400 and N0500). These policies decide which variant is kept.
+    
+    Attributes
+    ----------
+    NEWEST : str
+        Keep the most recently generated variant (value: 'newest')
+    HIGHEST_BASELINE : str
+        Keep the variant with the highest processing baseline (value: 'highest_baseline')
+    PREFERRED_BASELINE : str
+        Keep the variant with a given baseline, falling back to the newest one (value: 'preferred_baseline')
+    
+    Examples
+    --------
+    >>> from sat_download.enums import DEDUP_POLICIES
+    >>> policy = DEDUP_POLICIES.NEWEST
+    >>> print(policy.value)
+    'newest'
+    """
+    
+    NEWEST : str = 'newest'
+    HIGHEST_BASELINE : str = 'highest_baseline'
+    PREFERRED_BASELINE : str = 'preferred_baseline'
\ No newline at end of file
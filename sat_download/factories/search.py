@@ -1,3 +1,6 @@
+import hashlib
+
+from typing import Tuple
 from sat_download.data_types.search import SatelliteImage
 from sat_download.enums import COLLECTIONS
 
@@ -21,7 +24,13 @@ def get_satellite_image(collection: COLLECTIONS, data: dict) -> SatelliteImage:
     Notes
     -----
     This function delegates to specialized parsers for each collection type.
-    The 'Name' field in the data dictionary is required for all collection types.
+    The 'Name' field in the data dictionary is required for all collection types,
+    while the optional 'PublicationDate' and 'ContentLength' fields are copied as is and the optional
+    'Footprint' field is stripped of its OData ``geography'SRID=4326;...'`` wrapper.
+    The quicklook URL is taken from the optional 'Quicklook' field or, for OData
+    results, from the ``DownloadLink`` of the expanded QUICKLOOK asset.
+    The checksum is the first entry of the optional OData 'Checksum' list whose
+    algorithm ``hashlib`` supports, formatted as ``algorithm:value``.
     """
     if collection == COLLECTIONS.SENTINEL_2:
         result = get_sentinel2(collection.value.lower().capitalize(), data['Name'])
@@ -30,6 +39,15 @@ def get_satellite_image(collection: COLLECTIONS, data: dict) -> SatelliteImage:
     elif collection == COLLECTIONS.LANDSAT_8:
         result = get_landsat_8('Landsat-8', data['Name'])
 
+    result.collection = collection.value
+    result.published = data.get('PublicationDate')
+    result.size = data.get('ContentLength')
+    if data.get('Footprint') is not None:
+        result.footprint = data['Footprint'].split(';')[-1].rstrip("'")
+    result.quicklook = data.get('Quicklook') or next((asset.get('DownloadLink') for asset in data.get('Assets') or []
+                                                      if asset.get('Type') == 'QUICKLOOK'), None)
+    result.checksum = next((f"{checksum['Algorithm'].lower()}:{checksum['Value'].lower()}" for checksum in data.get('Checksum') or []
+                            if checksum.get('Algorithm', '').lower() in hashlib.algorithms_guaranteed and checksum.get('Value')), None)
     return result
 
 
@@ -135,4 +153,69 @@ def get_landsat_8(satellite: str, name: str) -> SatelliteImage:
                                             brother=brother, identifier=f'{satellite[:-1] + brother}', 
                                             filename=f"{name.split('.')[0]}.tar", tile=tile)
 
-    return result
\ No newline at end of file
+    return result
+
+
+def get_product_version(image: SatelliteImage) -> Tuple[str, str, str]:
+    """
+    Parse the product type and processing version of an image from its filename.
+    
+    Parameters
+    ----------
+    image : SatelliteImage
+        The satellite image whose filename follows the provider naming convention
+        
+    Returns
+    -------
+    Tuple[str, str, str]
+        The product type (e.g. 'MSIL2A'), processing baseline (e.g. 'N0511') and
+        product generation time (e.g. '20241001T151217')
+        
+    Notes
+    -----
+    Variants of the same acquisition share uuid, tile, product type and
+    acquisition (see ``get_acquisition``), and only differ in baseline and
+    generation time. Unknown sensors yield empty strings.
+    """
+    components = image.filename.split('.')[0].split('_')
+
+    if image.sensor == 'Sentinel-2':
+        return components[1], components[3], components[-1]
+    elif image.sensor == 'Sentinel-3':
+        return components[3], components[-1], components[9]
+    elif image.sensor == 'Landsat-8':
+        return components[1], components[5], components[4]
+    
+    return '', '', ''
+
+
+def get_acquisition(image: SatelliteImage) -> Tuple[str, str]:
+    """
+    Parse the sensing time and orbit of an image from its filename.
+    
+    Parameters
+    ----------
+    image : SatelliteImage
+        The satellite image whose filename follows the provider naming convention
+        
+    Returns
+    -------
+    Tuple[str, str]
+        The sensing start (e.g. '20240101T103421') and the relative orbit
+        (e.g. 'R108'), together identifying a single acquisition
+        
+    Notes
+    -----
+    Sentinel-3 orbits include the frame along the orbit, and Landsat orbits
+    are the WRS-2 path/row. Unknown sensors yield empty strings.
+    """
+    components = image.filename.split('.')[0].split('_')
+
+    if image.sensor == 'Sentinel-2':
+        return components[2], components[4]
+    elif image.sensor == 'Sentinel-3':
+        return components[7], f"{components[12]}_{components[13]}"
+    elif image.sensor == 'Landsat-8':
+        return components[3], components[2]
+    
+    return '', ''
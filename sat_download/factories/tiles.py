@@ -0,0 +1,38 @@
+from sat_download.enums import COLLECTIONS
+from sat_download.services.tiles import FootprintIndex, MGRSIndex, TileIndex
+
+
+def get_tile_index(collection: COLLECTIONS, footprints: str | None = None) -> TileIndex:
+    """
+    Factory function to create the tile index matching a collection's tiling system.
+    
+    Parameters
+    ----------
+    collection : COLLECTIONS
+        The satellite collection enum indicating the source platform
+    footprints : str | None
+        Path to a GeoJSON/CSV footprint file (``tile_id`` identifiers), required 
+        for tiling systems that cannot be computed offline
+        
+    Returns
+    -------
+    TileIndex
+        A tile index resolving geometries to the collection's tile identifiers
+        
+    Raises
+    ------
+    Exception
+        If the collection's tiling system needs a footprint file and none was given
+        
+    Notes
+    -----
+    Sentinel-2 uses the computed MGRS grid unless a footprint file is given.
+    Landsat-8 WRS-2 path/row footprints must be provided as a file (e.g. the
+    USGS WRS-2 descending grid converted to GeoJSON with ``PPPRRR`` identifiers).
+    """
+    if footprints is not None:
+        return FootprintIndex.from_file(footprints)
+    elif collection == COLLECTIONS.SENTINEL_2:
+        return MGRSIndex()
+    else:
+        raise Exception(f"A footprint file is required to resolve {collection.value} tiles")
@@ -0,0 +1,362 @@
+import math
+import re
+
+from typing import List, Tuple
+
+
+Point = Tuple[float, float]
+"""
+Type alias for a (longitude, latitude) pair in degrees.
+"""
+
+Polygon = List[Point]
+"""
+Type alias for a polygon ring given as a list of (longitude, latitude) vertices.
+"""
+
+BBox = Tuple[float, float, float, float]
+"""
+Type alias for a bounding box given as (min_lon, min_lat, max_lon, max_lat).
+"""
+
+# WGS84 ellipsoid and UTM constants
+_A = 6378137.0
+_F = 1 / 298.257223563
+_E2 = _F * (2 - _F)
+_EP2 = _E2 / (1 - _E2)
+_K0 = 0.9996
+
+# MGRS lettering (I and O are never used)
+_BANDS = 'CDEFGHJKLMNPQRSTUVWX'
+_COLUMNS = 'ABCDEFGHJKLMNPQRSTUVWXYZ'
+_ROWS = 'ABCDEFGHJKLMNPQRSTUV'
+
+# Sentinel-2 tiles are 109.8 km wide and anchored on the MGRS 100 km squares
+_SQUARE = 100000
+_TILE = 109800
+
+
+def parse_wkt(wkt : str) -> List[Polygon]:
+    """
+    Parse a WKT geometry into a list of polygon rings.
+
+    Parameters
+    ----------
+    wkt : str
+        WKT string such as ``'POINT(lon lat)'``, ``'POLYGON((...))'`` or ``'MULTIPOLYGON(((...)))'``
+
+    Returns
+    -------
+    List[Polygon]
+        One ring per innermost parenthesised coordinate list
+
+    Notes
+    -----
+    Interior rings (holes) are returned as independent rings, so the parsed
+    geometry is a superset of the original one. This is enough for tile
+    resolution, where a false positive only costs an extra query.
+    """
+    rings = []
+    for ring in re.findall(r'\(([^()]+)\)', wkt):
+        points = []
+        for pair in ring.split(','):
+            lon, lat = pair.split()[:2]
+            points.append((float(lon), float(lat)))
+        rings.append(points)
+
+    return rings
+
+
+def geojson_to_wkt(geometry : dict) -> str:
+    """
+    Convert a GeoJSON Polygon or MultiPolygon into WKT.
+
+    Parameters
+    ----------
+    geometry : dict
+        GeoJSON geometry object
+
+    Returns
+    -------
+    str
+        The equivalent WKT string
+    """
+    def ring_to_wkt(ring : List[List[float]]) -> str:
+        return f"({', '.join(f'{point[0]} {point[1]}' for point in ring)})"
+
+    def polygon_to_wkt(polygon : List[List[List[float]]]) -> str:
+        return f"({', '.join(ring_to_wkt(ring) for ring in polygon)})"
+
+    if geometry['type'] == 'MultiPolygon':
+        return f"MULTIPOLYGON({', '.join(polygon_to_wkt(polygon) for polygon in geometry['coordinates'])})"
+    return f"POLYGON{polygon_to_wkt(geometry['coordinates'])}"
+
+
+def get_bbox(polygon : Polygon) -> BBox:
+    """
+    Compute the bounding box of a polygon ring.
+
+    Parameters
+    ----------
+    polygon : Polygon
+        The polygon ring
+
+    Returns
+    -------
+    BBox
+        The (min_lon, min_lat, max_lon, max_lat) bounding box
+    """
+    lons = [ lon for lon, _ in polygon ]
+    lats = [ lat for _, lat in polygon ]
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def contains(polygon : Polygon, point : Point) -> bool:
+    """
+    Check whether a point lies inside a polygon ring (ray casting).
+
+    Parameters
+    ----------
+    polygon : Polygon
+        The polygon ring
+    point : Point
+        The (longitude, latitude) point to test
+
+    Returns
+    -------
+    bool
+        True if the point is inside the ring, False otherwise
+    """
+    x, y = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _segments_cross(p1 : Point, p2 : Point, q1 : Point, q2 : Point) -> bool:
+    """
+    Check whether two segments intersect.
+    """
+    def orientation(a : Point, b : Point, c : Point) -> float:
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    d1, d2 = orientation(q1, q2, p1), orientation(q1, q2, p2)
+    d3, d4 = orientation(p1, p2, q1), orientation(p1, p2, q2)
+    return ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0))
+
+
+def intersects(first : Polygon, second : Polygon) -> bool:
+    """
+    Check whether two polygon rings intersect.
+
+    Parameters
+    ----------
+    first : Polygon
+        The first polygon ring (may be a single point)
+    second : Polygon
+        The second polygon ring (may be a single point)
+
+    Returns
+    -------
+    bool
+        True if the rings overlap, touch through an edge crossing, or one contains the other
+    """
+    a, b = get_bbox(first), get_bbox(second)
+    if a[0] > b[2] or b[0] > a[2] or a[1] > b[3] or b[1] > a[3]:
+        return False
+
+    if any(contains(second, point) for point in first) or any(contains(first, point) for point in second):
+        return True
+
+    edges = list(zip(second, second[1:] + second[:1]))
+    for p1, p2 in zip(first, first[1:] + first[:1]):
+        if any(_segments_cross(p1, p2, q1, q2) for q1, q2 in edges):
+            return True
+
+    return False
+
+
+def get_utm_zone(lon : float) -> int:
+    """
+    Get the UTM zone number of a longitude.
+
+    Parameters
+    ----------
+    lon : float
+        Longitude in degrees
+
+    Returns
+    -------
+    int
+        UTM zone number between 1 and 60
+
+    Notes
+    -----
+    The Norway and Svalbard exceptions are not applied, matching the Sentinel-2 tiling grid.
+    """
+    return min(int((lon + 180) // 6) + 1, 60)
+
+
+def to_utm(lon : float, lat : float, zone : int) -> Tuple[float, float]:
+    """
+    Project a geographic point into a given UTM zone.
+
+    Parameters
+    ----------
+    lon : float
+        Longitude in degrees
+    lat : float
+        Latitude in degrees
+    zone : int
+        UTM zone number to project into
+
+    Returns
+    -------
+    Tuple[float, float]
+        (easting, northing) in meters, northing including the southern false northing
+    """
+    phi = math.radians(lat)
+    lam = math.radians(lon - ((zone - 1) * 6 - 180 + 3))
+
+    n = _A / math.sqrt(1 - _E2 * math.sin(phi) ** 2)
+    t = math.tan(phi) ** 2
+    c = _EP2 * math.cos(phi) ** 2
+    a = math.cos(phi) * lam
+    m = _A * ((1 - _E2 / 4 - 3 * _E2 ** 2 / 64 - 5 * _E2 ** 3 / 256) * phi
+              - (3 * _E2 / 8 + 3 * _E2 ** 2 / 32 + 45 * _E2 ** 3 / 1024) * math.sin(2 * phi)
+              + (15 * _E2 ** 2 / 256 + 45 * _E2 ** 3 / 1024) * math.sin(4 * phi)
+              - (35 * _E2 ** 3 / 3072) * math.sin(6 * phi))
+
+    easting = _K0 * n * (a + (1 - t + c) * a ** 3 / 6 + (5 - 18 * t + t ** 2 + 72 * c - 58 * _EP2) * a ** 5 / 120) + 500000
+    northing = _K0 * (m + n * math.tan(phi) * (a ** 2 / 2 + (5 - t + 9 * c + 4 * c ** 2) * a ** 4 / 24
+                                                + (61 - 58 * t + t ** 2 + 600 * c - 330 * _EP2) * a ** 6 / 720))
+    if lat < 0:
+        northing += 10000000
+
+    return easting, northing
+
+
+def from_utm(easting : float, northing : float, zone : int, south : bool) -> Point:
+    """
+    Unproject a UTM coordinate into geographic coordinates.
+
+    Parameters
+    ----------
+    easting : float
+        Easting in meters
+    northing : float
+        Northing in meters, including the southern false northing
+    zone : int
+        UTM zone number
+    south : bool
+        Whether the coordinate belongs to the southern hemisphere
+
+    Returns
+    -------
+    Point
+        The (longitude, latitude) point in degrees
+    """
+    x = easting - 500000
+    y = northing - 10000000 if south else northing
+
+    mu = y / _K0 / (_A * (1 - _E2 / 4 - 3 * _E2 ** 2 / 64 - 5 * _E2 ** 3 / 256))
+    e1 = (1 - math.sqrt(1 - _E2)) / (1 + math.sqrt(1 - _E2))
+    phi1 = (mu + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * math.sin(2 * mu)
+            + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * math.sin(4 * mu)
+            + (151 * e1 ** 3 / 96) * math.sin(6 * mu)
+            + (1097 * e1 ** 4 / 512) * math.sin(8 * mu))
+
+    n1 = _A / math.sqrt(1 - _E2 * math.sin(phi1) ** 2)
+    t1 = math.tan(phi1) ** 2
+    c1 = _EP2 * math.cos(phi1) ** 2
+    r1 = _A * (1 - _E2) / (1 - _E2 * math.sin(phi1) ** 2) ** 1.5
+    d = x / (n1 * _K0)
+
+    phi = phi1 - (n1 * math.tan(phi1) / r1) * (d ** 2 / 2 - (5 + 3 * t1 + 10 * c1 - 4 * c1 ** 2 - 9 * _EP2) * d ** 4 / 24
+                                               + (61 + 90 * t1 + 298 * c1 + 45 * t1 ** 2 - 252 * _EP2 - 3 * c1 ** 2) * d ** 6 / 720)
+    lam = (d - (1 + 2 * t1 + c1) * d ** 3 / 6 + (5 - 2 * c1 + 28 * t1 - 3 * c1 ** 2 + 8 * _EP2 + 24 * t1 ** 2) * d ** 5 / 120) / math.cos(phi1)
+
+    return (zone - 1) * 6 - 180 + 3 + math.degrees(lam), math.degrees(phi)
+
+
+def get_latitude_band(lat : float) -> str:
+    """
+    Get the MGRS latitude band letter of a latitude.
+
+    Parameters
+    ----------
+    lat : float
+        Latitude in degrees, between -80 and 84
+
+    Returns
+    -------
+    str
+        The latitude band letter
+    """
+    return _BANDS[min(max(int((lat + 80) // 8), 0), len(_BANDS) - 1)]
+
+
+def get_mgrs_square(zone : int, column : int, row : int) -> str | None:
+    """
+    Get the MGRS 100 km square letters of a UTM grid cell.
+
+    Parameters
+    ----------
+    zone : int
+        UTM zone number
+    column : int
+        Easting of the cell divided by 100 km
+    row : int
+        Northing of the cell divided by 100 km (including the southern false northing)
+
+    Returns
+    -------
+    str | None
+        The two square letters, or None if the column falls outside the zone
+    """
+    if not 1 <= column <= 8:
+        return None
+
+    column_letter = _COLUMNS[((zone - 1) % 3) * 8 + column - 1]
+    row_letter = _ROWS[(row + (5 if zone % 2 == 0 else 0)) % len(_ROWS)]
+    return f"{column_letter}{row_letter}"
+
+
+def get_sentinel2_footprint(zone : int, column : int, row : int, south : bool) -> Polygon:
+    """
+    Get the geographic footprint of the Sentinel-2 tile anchored on a 100 km square.
+
+    Parameters
+    ----------
+    zone : int
+        UTM zone number
+    column : int
+        Easting of the square divided by 100 km
+    row : int
+        Northing of the square divided by 100 km (including the southern false northing)
+    south : bool
+        Whether the square belongs to the southern hemisphere
+
+    Returns
+    -------
+    Polygon
+        The tile footprint, densified along its edges to follow the projection
+
+    Notes
+    -----
+    Sentinel-2 tiles share the upper-left corner of their MGRS square and
+    extend 109.8 km east and south, overlapping their neighbours by 9.8 km.
+    """
+    left, top = column * _SQUARE, (row + 1) * _SQUARE
+    right, bottom = left + _TILE, top - _TILE
+
+    steps = 4
+    corners = [ (left, top), (right, top), (right, bottom), (left, bottom) ]
+    ring = []
+    for (x1, y1), (x2, y2) in zip(corners, corners[1:] + corners[:1]):
+        for step in range(steps):
+            ring.append(from_utm(x1 + (x2 - x1) * step / steps, y1 + (y2 - y1) * step / steps, zone, south))
+
+    return ring
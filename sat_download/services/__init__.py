@@ -1,3 +1,13 @@
 from sat_download.services.downloader import SatelliteImageDownloader
+from sat_download.services.tiles import FootprintIndex, MGRSIndex, TileIndex
+from sat_download.services.sync import DeltaSync
+from sat_download.services.dedup import deduplicate
+from sat_download.services.orders import OrderPipeline
+from sat_download.services.federated import FederatedSearcher
+from sat_download.services.planner import DownloadPlan, plan_downloads
+from sat_download.services.quicklook import QuicklookScreener
+from sat_download.services.validation import validate_archive
+from sat_download.services.ledger import CooperativeDownloader, WorkLedger
+from sat_download.services.store import ProductStore
 
-__all__ = ['SatelliteImageDownloader']
\ No newline at end of file
+__all__ = ['SatelliteImageDownloader', 'TileIndex', 'MGRSIndex', 'FootprintIndex', 'DeltaSync', 'deduplicate', 'OrderPipeline', 'FederatedSearcher', 'DownloadPlan', 'plan_downloads', 'QuicklookScreener', 'validate_archive', 'WorkLedger', 'CooperativeDownloader', 'ProductStore']
\ No newline at end of file
@@ -0,0 +1,64 @@
+from typing import Dict, List, Tuple
+from sat_download.data_types.search import SatelliteImage, SearchResults
+from sat_download.enums import DEDUP_POLICIES
+from sat_download.factories.search import get_acquisition, get_product_version
+
+
+def deduplicate(images : SearchResults, policy : DEDUP_POLICIES = DEDUP_POLICIES.NEWEST,
+                baseline : str | None = None) -> SearchResults:
+    """
+    Keep a single processing variant of every acquisition.
+
+    Parameters
+    ----------
+    images : SearchResults
+        The search results to de-duplicate
+    policy : DEDUP_POLICIES
+        The policy used to choose between the variants of an acquisition
+    baseline : str | None
+        The preferred processing baseline (e.g. 'N0500'), required by
+        ``DEDUP_POLICIES.PREFERRED_BASELINE``
+
+    Returns
+    -------
+    SearchResults
+        The search results with one product per acquisition, in their original order
+
+    Raises
+    ------
+    Exception
+        If the preferred baseline policy is requested without a baseline
+
+    Notes
+    -----
+    Products are grouped by uuid, tile, product type, sensing time and relative
+    orbit, so only reprocessings of the same acquisition (a new baseline or
+    generation time) collapse together. Different processing levels (e.g. L1C
+    and L2A) and different passes over a tile on the same day are all kept.
+    Ties are broken by the generation time and then by the publication date.
+
+    Examples
+    --------
+    >>> images = downloader.bulk_search(filters)
+    >>> images = deduplicate(images, DEDUP_POLICIES.PREFERRED_BASELINE, baseline = 'N0500')
+    """
+    if policy == DEDUP_POLICIES.PREFERRED_BASELINE and baseline is None:
+        raise Exception("A baseline is required by the preferred baseline policy")
+
+    groups : Dict[Tuple[str, ...], List[Tuple[str, SatelliteImage]]] = {}
+    for image_id, image in images.items():
+        product_type, _, _ = get_product_version(image)
+        groups.setdefault((image.uuid, image.tile, product_type, *get_acquisition(image)), []).append((image_id, image))
+
+    def rank(item : Tuple[str, SatelliteImage]) -> tuple:
+        _, product_baseline, generated = get_product_version(item[1])
+        newest = (generated, item[1].published or '')
+
+        if policy == DEDUP_POLICIES.HIGHEST_BASELINE:
+            return (product_baseline, *newest)
+        elif policy == DEDUP_POLICIES.PREFERRED_BASELINE:
+            return (product_baseline == baseline, *newest)
+        return newest
+
+    kept = { max(variants, key = rank)[0] for variants in groups.values() }
+    return { image_id : image for image_id, image in images.items() if image_id in kept }
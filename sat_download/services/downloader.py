@@ -1,8 +1,18 @@
 import os
+import time
+import multiprocessing
 
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from sat_download.api.base import SatelliteAPI
-from sat_download.data_types.search import SearchFilters, SearchResults
-from typing import List
+from sat_download.data_types.search import SatelliteImage, SearchFilters, SearchResults
+from sat_download.services.planner import plan_downloads
+from sat_download.services.store import ProductStore
+from sat_download.services.tiles import TileIndex
+from sat_download.services.validation import validate_archive
+from sat_download.sinks import FileSink, Sink
+from sat_download.utils.profiling import Profiler
+from typing import Dict, List
 
 class SatelliteImageDownloader:
     """
@@ -15,6 +25,14 @@ class SatelliteImageDownloader:
     ----------
     api : SatelliteAPI
         The satellite API client to use for API operations
+    verbose : int
+        Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+    store : ProductStore | None
+        Shared product store checked before downloading to local files, so
+        products already fetched for another output directory are only linked
+    profiler : Profiler | None
+        Profiler attached to the API to measure every search page and download.
+        Profiling is disabled if None.
         
     See Also
     --------
@@ -22,11 +40,24 @@ class SatelliteImageDownloader:
     sat_download.api.odata.ODataAPI : Implementation for Copernicus Data Space API
     sat_download.api.usgs.USGSAPI : Implementation for USGS Earth Explorer API
     """
-    def __init__(self, api : SatelliteAPI, verbose = 0) -> None:
+    def __init__(self, api : SatelliteAPI, verbose = 0, store : ProductStore | None = None, 
+                 profiler : Profiler | None = None) -> None:
         self.api = api
         self.verbose = verbose
+        self.store = store
+        self.profiler = profiler
+        if profiler is not None:
+            self.api.profiler = profiler
 
-    def bulk_search(self, filters: SearchFilters) -> SearchResults:
+    def __fetch(self, image_id: str, outname: str, sink: Sink | None, checksum: str | None = None) -> str | None:
+        """
+        Download an image through the product store when it applies.
+        """
+        if self.store is not None and (sink is None or isinstance(sink, FileSink)):
+            return self.store.fetch(self.api, image_id, outname, self.verbose, checksum)
+        return self.api.download(image_id, outname, self.verbose, sink)
+
+    def bulk_search(self, filters: SearchFilters, results: SearchResults | None = None) -> SearchResults:
         """
         Perform a bulk search operation using specified filters.
         
@@ -34,6 +65,8 @@ class SatelliteImageDownloader:
         ----------
         filters : SearchFilters
             The search filters to apply to the bulk search
+        results : SearchResults | None
+            Mapping the results are written into, e.g. a ``DiskSearchResults``
             
         Returns
         -------
@@ -45,11 +78,115 @@ class SatelliteImageDownloader:
         Exceptions are caught and printed to console.
         """
         try:
-            return self.api.bulk_search(filters)        
+            return self.api.bulk_search(filters, results)
+        except Exception as exc:
+            print(exc)
+
+    def batch_search(self, filters: SearchFilters, tiles: List[str]) -> Dict[str, SearchResults]:
+        """
+        Search many tiles for the same collection and date window.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every tile
+        tiles : List[str]
+            The tile identifiers to search
+            
+        Returns
+        -------
+        Dict[str, SearchResults]
+            Dictionary mapping each tile identifier to its search results
+            
+        Notes
+        -----
+        Tiles are coalesced into as few provider queries as the API allows.
+        Exceptions are caught and printed to console.
+        """
+        try:
+            return self.api.batch_search(filters, tiles)
+        except Exception as exc:
+            print(exc)
+
+    def batch_search_geometries(self, filters: SearchFilters, geometries: List[str], 
+                                index: TileIndex) -> List[SearchResults]:
+        """
+        Search many AOIs for the same collection and date window.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every AOI
+        geometries : List[str]
+            WKT geometries of the areas of interest
+        index : TileIndex
+            Tile index used to resolve each AOI into the tiles it intersects
+            
+        Returns
+        -------
+        List[SearchResults]
+            The search results of each AOI, in the same order as ``geometries``
+            
+        Notes
+        -----
+        AOIs are resolved offline and tiles shared by several AOIs are searched
+        only once, so results are matched at tile granularity.
+        Exceptions are caught and printed to console.
+        """
+        try:
+            tiles = index.resolve_many(geometries)
+            results = self.api.batch_search(filters, list(tiles))
+
+            per_geometry : List[SearchResults] = [ {} for _ in geometries ]
+            for tile, positions in tiles.items():
+                for position in positions:
+                    per_geometry[position].update(results[tile])
+
+            return per_geometry
         except Exception as exc:
             print(exc)
 
-    def bulk_download(self, images: SearchResults, outdir: str) -> List[str | None]:
+    def latest_per_tile(self, filters: SearchFilters, tiles: List[str], 
+                        newer_than: Dict[str, str] | None = None) -> SearchResults:
+        """
+        Get the newest product of each tile, for operational monitoring.
+        
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters shared by every tile
+        tiles : List[str]
+            The tile identifiers to monitor
+        newer_than : Dict[str, str] | None
+            Dictionary mapping tiles to the acquisition date ('YYYYMMDD') of the
+            product already held; only newer products are returned for them
+            
+        Returns
+        -------
+        SearchResults
+            At most one product per tile
+            
+        Notes
+        -----
+        Tiles are queried concurrently, each for a single sorted result.
+        Exceptions are caught and printed to console.
+        """
+        try:
+            return self.api.latest_per_tile(filters, tiles, newer_than)
+        except Exception as exc:
+            print(exc)
+
+    def __download_image(self, download_id: str, image: SatelliteImage, outdir: str, sink: Sink | None) -> str | None:
+        """
+        Download one image of a bulk download, logging its failure.
+        """
+        try:
+            return self.__fetch(download_id, os.path.join(outdir, image.filename), sink, image.checksum)
+        except Exception as exc:
+            print(exc)
+
+    def bulk_download(self, images: SearchResults, outdir: str, workers: int = 1, 
+                      sink: Sink | None = None, validate: bool = False, retries: int = 1) -> List[str | None]:
         """
         Download multiple satellite images in bulk.
 
@@ -59,26 +196,104 @@ class SatelliteImageDownloader:
             The search results containing image IDs and metadata for the images to download.
         outdir : str
             The output directory where the images will be saved.
+        workers : int
+            Number of images downloaded concurrently.
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to local files under ``outdir``;
+            with other sinks ``outdir`` is only used as a prefix of the output names.
+        validate : bool
+            Whether to check the integrity of every downloaded archive with ``validate_archive``.
+            Only local files are validated.
+        retries : int
+            Number of times a product failing validation is downloaded again.
 
         Returns
         -------
         List[str | None]
-            A list of file paths for successfully downloaded images. If a download fails, 
-            the corresponding entry in the list will be None.
+            A list of locations for successfully downloaded images, in the same order as ``images``. 
+            If a download fails, the corresponding entry in the list will be None.
 
         Notes
         -----
-        - This method ensures that the output directory exists before starting the downloads.
+        - Downloads are planned with ``plan_downloads``: the largest products are submitted first
+          and, for local files, the free disk space of ``outdir`` is checked before any transfer starts.
         - Each download is attempted individually, and exceptions are logged without halting the process.
-        - Logs provide detailed information about successful downloads, warnings for failed downloads, 
-          and errors encountered during the process.
+        - With ``verbose``, the plan and an ETA based on the observed throughput are printed.
+        - At most twice ``workers`` downloads are queued at a time and each product is read from
+          ``images`` only when its download is submitted, so a ``DiskSearchResults`` is never loaded
+          whole into memory. The plan still holds every download ID and size, and so does the
+          returned list its paths: the footprint is O(n) in small entries, not in products.
+        - Validation runs in a process pool using every core, as soon as each download finishes,
+          so it overlaps with the transfers still in progress. Corrupt products are removed and
+          re-queued; those still corrupt after ``retries`` attempts are reported as None.
+        - The validation processes are spawned rather than forked, since forking while download
+          threads hold locks (connection pools, progress bars, SQLite) can deadlock the children.
+          As with any spawned pool, scripts must guard their entry point with
+          ``if __name__ == '__main__'``.
         """
         try:
-            os.makedirs(outdir, exist_ok=True)
-            return [ self.api.download(download_id, os.path.join(outdir, image.filename), self.verbose) for download_id, image in images.items() ]
+            plan = plan_downloads(images, outdir if sink is None or isinstance(sink, FileSink) else None)
         except Exception as exc:
             print(exc)
+            return
+
+        if self.verbose:
+            print(f"Downloading {len(images)} images ({plan.total_size / 1e9:.2f} GB, "
+                  f"{plan.unknown} of unknown size) with {workers} workers")
+
+        validate = validate and (sink is None or isinstance(sink, FileSink))
+        workers = max(workers, 1)
+        started = time.monotonic()
+        total_size, downloaded = plan.total_size, 0
+        paths : Dict[str, str | None] = {}
+        order = iter(plan.order)
+
+        with ThreadPoolExecutor(max_workers = workers) as executor, \
+             (ProcessPoolExecutor(mp_context = multiprocessing.get_context('spawn')) if validate else nullcontext()) as validator:
+            pending = {}
+            queued = 0
+
+            def submit(download_id : str, image : SatelliteImage, attempt : int) -> None:
+                nonlocal queued
+                pending[executor.submit(self.__download_image, download_id, image, outdir, sink)] = \
+                    ('download', download_id, image, attempt)
+                queued += 1
+
+            while True:
+                while queued < 2 * workers and (download_id := next(order, None)) is not None:
+                    submit(download_id, images[download_id], 0)
+                if not pending:
+                    break
 
+                done, _ = wait(pending, return_when = FIRST_COMPLETED)
+                for future in done:
+                    stage, download_id, image, attempt = pending.pop(future)
+                    result = future.result()
+
+                    if stage == 'download':
+                        queued -= 1
+                        downloaded += plan.sizes[download_id] or 0
+                        if self.verbose and downloaded:
+                            throughput = downloaded / (time.monotonic() - started)
+                            print(f"{downloaded / 1e9:.2f}/{total_size / 1e9:.2f} GB, "
+                                  f"ETA {(total_size - downloaded) / throughput:.0f} s")
+
+                        paths[download_id] = result
+                        if validate and result is not None:
+                            pending[validator.submit(validate_archive, result)] = ('validate', download_id, image, attempt)
+                    elif result is not None:
+                        print(f"{image.filename} is corrupt: {result}")
+                        if os.path.exists(paths[download_id]):
+                            os.remove(paths[download_id])
+                        if self.store is not None:
+                            self.store.discard(image.filename, image.checksum)
+                        paths[download_id] = None
+
+                        if attempt < retries:
+                            total_size += plan.sizes[download_id] or 0
+                            submit(download_id, image, attempt + 1)
+
+        return [ paths[download_id] for download_id in images ]
 
     def search(self, filters : SearchFilters) -> SearchResults:
         """
@@ -103,7 +318,8 @@ class SatelliteImageDownloader:
         except Exception as exc:
             print(exc)
 
-    def download(self, image_id: str, out_dir: str, outname: str) -> str | None:
+    def download(self, image_id: str, out_dir: str, outname: str, sink: Sink | None = None,
+                 checksum: str | None = None) -> str | None:
         """
         Download a single satellite image by its ID.
 
@@ -115,21 +331,63 @@ class SatelliteImageDownloader:
             The output directory where the image will be saved.
         outname : str
             The output filename for the downloaded image.
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to a local file.
+        checksum : str | None
+            Provider checksum of the image (``SatelliteImage.checksum``), used by the product store.
 
         Returns
         -------
         str | None
-            The file path of the downloaded image if the download is successful. 
+            The location of the downloaded image if the download is successful. 
             Returns None if the download fails.
 
         Notes
         -----
-        - This method ensures that the output directory exists before attempting the download.
+        - The default file sink ensures that the output directory exists before writing.
         - Logs provide detailed information about the success or failure of the download.
         - Exceptions are caught and logged to prevent application crashes.
         """
         try:
-            os.makedirs(out_dir, exist_ok=True)
-            return self.api.download(image_id, os.path.join(out_dir, outname), self.verbose)
+            return self.__fetch(image_id, os.path.join(out_dir, outname), sink, checksum)
         except Exception as exc:
-            print(exc)
\ No newline at end of file
+            print(exc)
+
+    def bulk_download_nodes(self, images: SearchResults, outdir: str, patterns: List[str], 
+                            workers: int = 4) -> List[List[str] | None]:
+        """
+        Download only selected files of multiple satellite products.
+
+        Parameters
+        ----------
+        images : SearchResults
+            The search results containing image IDs and metadata for the products to download.
+        outdir : str
+            The output directory where the SAFE-like trees will be created.
+        patterns : List[str]
+            Shell-style patterns of the files to keep (e.g. ``['*_B04_10m.jp2', '*_SCL_20m.jp2']``).
+        workers : int
+            Number of files downloaded concurrently for each product.
+
+        Returns
+        -------
+        List[List[str] | None]
+            For each product, the list of downloaded file paths. If a product fails, 
+            the corresponding entry in the list will be None.
+
+        Notes
+        -----
+        - Only APIs exposing a ``download_nodes`` method (e.g. ODataAPI) support file selection.
+        - Each product is attempted individually, and exceptions are logged without halting the process.
+        """
+        os.makedirs(outdir, exist_ok=True)
+
+        paths = []
+        for download_id in images:
+            try:
+                paths.append(self.api.download_nodes(download_id, outdir, patterns, self.verbose, workers))
+            except Exception as exc:
+                print(exc)
+                paths.append(None)
+
+        return paths
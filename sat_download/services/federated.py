@@ -0,0 +1,170 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, List
+from sat_download.api.base import SatelliteAPI
+from sat_download.data_types.search import SearchFilters, SearchResults
+from sat_download.enums import COLLECTIONS
+from sat_download.sinks import Sink
+
+
+class FederatedSearcher:
+    """
+    Fan-out search over several collections served by different provider APIs.
+
+    Parameters
+    ----------
+    apis : Dict[COLLECTIONS, SatelliteAPI]
+        Dictionary routing each collection to the API client serving it
+
+    Attributes
+    ----------
+    search_failures : Dict[COLLECTIONS, Exception]
+        The collections whose search failed in the last ``search``, with their error
+    download_failures : Dict[COLLECTIONS, Dict[str, Exception]]
+        The downloads that raised in the last ``bulk_download``, per collection and download ID
+
+    Notes
+    -----
+    Every returned SatelliteImage is tagged with its ``collection``, which is
+    used to route its download back to the API that found it.
+
+    Examples
+    --------
+    >>> odata = ODataAPI(username, password)
+    >>> searcher = FederatedSearcher({COLLECTIONS.SENTINEL_2 : odata, COLLECTIONS.SENTINEL_3 : odata,
+    ...                               COLLECTIONS.LANDSAT_8 : USGSAPI(username, token)})
+    >>> results = searcher.search(list(COLLECTIONS), filters, {COLLECTIONS.SENTINEL_2 : {'processing_level' : 'L2A'}})
+    """
+    def __init__(self, apis : Dict[COLLECTIONS, SatelliteAPI]) -> None:
+        self.apis = apis
+        self.search_failures : Dict[COLLECTIONS, Exception] = {}
+        self.download_failures : Dict[COLLECTIONS, Dict[str, Exception]] = {}
+
+    def __search_collection(self, collection : COLLECTIONS, filters : SearchFilters) -> SearchResults:
+        """
+        Run the bulk search of a single collection, tagging its results.
+        """
+        try:
+            results = self.apis[collection].bulk_search(filters)
+        except Exception as exc:
+            print(f"{collection.value} search failed. {exc}")
+            self.search_failures[collection] = exc
+            return {}
+
+        for image in results.values():
+            image.collection = collection.value
+        return results
+
+    def search(self, collections : List[COLLECTIONS], template : SearchFilters,
+               overrides : Dict[COLLECTIONS, dict] | None = None) -> SearchResults:
+        """
+        Search several collections concurrently and merge their results.
+
+        Parameters
+        ----------
+        collections : List[COLLECTIONS]
+            The collections to search
+        template : SearchFilters
+            The filters shared by every collection; its ``collection`` is replaced
+        overrides : Dict[COLLECTIONS, dict] | None
+            Per-collection filter values (e.g. a different ``processing_level``)
+
+        Returns
+        -------
+        SearchResults
+            The merged results of every collection, tagged with their collection
+
+        Raises
+        ------
+        Exception
+            If a collection has no API configured
+
+        Notes
+        -----
+        Latency is that of the slowest provider. A failing collection is
+        reported, recorded in ``search_failures`` and contributes no results
+        instead of aborting the search.
+        """
+        overrides = overrides or {}
+        missing = [ collection.value for collection in collections if collection not in self.apis ]
+        if missing:
+            raise Exception(f"No API configured for {', '.join(missing)}")
+
+        self.search_failures = {}
+        filters = [ replace(template, collection = collection.value, **overrides.get(collection, {})) for collection in collections ]
+
+        results : SearchResults = {}
+        with ThreadPoolExecutor(max_workers = max(len(collections), 1)) as executor:
+            for partial in executor.map(self.__search_collection, collections, filters):
+                results.update(partial)
+
+        return results
+
+    def bulk_download(self, images : SearchResults, outdir : str, verbose : int = 0, 
+                      sink : Sink | None = None) -> List[str | None]:
+        """
+        Download federated results, routing each image to the API that found it.
+
+        Parameters
+        ----------
+        images : SearchResults
+            Results returned by ``search``
+        outdir : str
+            The output directory where the images will be saved
+        verbose : int
+            Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        sink : Sink | None
+            The destination of the downloaded bytes. Defaults to local files under ``outdir``.
+
+        Returns
+        -------
+        List[str | None]
+            The locations of the downloaded images; failed downloads are None
+
+        Raises
+        ------
+        Exception
+            If an image belongs to a collection with no API configured
+
+        Notes
+        -----
+        Each provider API downloads its images sequentially, while the providers
+        run concurrently, so the total time is that of the slowest provider. A
+        download that raises is reported and recorded in ``download_failures``.
+        """
+        routes = { collection.value : collection for collection in self.apis }
+        missing = sorted({ image.collection for image in images.values() if image.collection not in routes })
+        if missing:
+            raise Exception(f"No API configured for {', '.join(map(str, missing))}")
+
+        providers : Dict[int, SearchResults] = {}
+        for download_id, image in images.items():
+            providers.setdefault(id(self.apis[routes[image.collection]]), {})[download_id] = image
+
+        self.download_failures = {}
+        located : Dict[str, str | None] = {}
+        with ThreadPoolExecutor(max_workers = max(len(providers), 1)) as executor:
+            futures = [ executor.submit(self.__download_provider, batch, outdir, verbose, sink) for batch in providers.values() ]
+            for future in futures:
+                located.update(future.result())
+
+        return [ located[download_id] for download_id in images ]
+
+    def __download_provider(self, images : SearchResults, outdir : str, verbose : int,
+                            sink : Sink | None) -> Dict[str, str | None]:
+        """
+        Download the images served by a single provider API, one after another.
+        """
+        paths = {}
+        for download_id, image in images.items():
+            collection = COLLECTIONS(image.collection)
+            try:
+                paths[download_id] = self.apis[collection].download(download_id, os.path.join(outdir, image.filename), verbose, sink)
+            except Exception as exc:
+                print(f"{collection.value} download of {image.filename} failed. {exc}")
+                self.download_failures.setdefault(collection, {})[download_id] = exc
+                paths[download_id] = None
+
+        return paths
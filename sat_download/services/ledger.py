@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import asdict
+from typing import Callable, Dict, Tuple
+from uuid import uuid4
+from sat_download.data_types.search import SatelliteImage, SearchResults
+from sat_download.services.downloader import SatelliteImageDownloader
+
+
+class WorkLedger:
+    """
+    Shared ledger of download jobs claimed through expiring leases.
+
+    The ledger is a SQLite file on a filesystem shared by every node. Each
+    transaction takes SQLite's write lock up front (``BEGIN IMMEDIATE``), so
+    concurrent claims are serialized by SQLite itself; the filesystem must
+    support the POSIX locks SQLite relies on.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite file holding the ledger
+    lease : float
+        Seconds a claim stays valid without being renewed
+    max_attempts : int
+        Number of attempts, including those of workers that died, after which
+        a job is given up
+
+    Notes
+    -----
+    Jobs move from ``pending`` to ``leased`` when claimed and to ``done`` or
+    back to ``pending`` (``failed`` after ``max_attempts``) when released.
+    Every claim and renewal bumps the lease generation of the job. A worker
+    looking for work reclaims a leased job once it has seen the same
+    generation for ``lease`` seconds of its own monotonic clock, so leases
+    of dead workers expire without comparing the clocks of different hosts.
+    As a consequence a job abandoned by a dead worker is only reclaimed after
+    a surviving worker has watched it for a whole lease.
+
+    Examples
+    --------
+    >>> ledger = WorkLedger('/shared/backfill.sqlite')
+    >>> ledger.add(downloader.bulk_search(filters))
+    >>> ledger.get_status()
+    {'pending': 1200}
+    """
+    def __init__(self, path : str, lease : float = 600, max_attempts : int = 3) -> None:
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.observed : Dict[str, Tuple[int, float]] = {}
+
+        self.__execute(lambda connection: connection.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, data TEXT, state TEXT DEFAULT 'pending', owner TEXT,
+                generation INTEGER DEFAULT 0, attempts INTEGER DEFAULT 0, path TEXT
+            )"""))
+
+    def __execute(self, transaction : Callable[[sqlite3.Connection], object]) -> object:
+        """
+        Run a transaction on the ledger while holding the SQLite write lock.
+        """
+        with closing(sqlite3.connect(self.path, timeout = 60, isolation_level = None)) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = transaction(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+    def add(self, images : SearchResults) -> int:
+        """
+        Add products to the ledger as pending jobs.
+
+        Parameters
+        ----------
+        images : SearchResults
+            The products to download
+
+        Returns
+        -------
+        int
+            Number of new jobs; products already in the ledger are ignored
+        """
+        rows = [ (download_id, json.dumps(asdict(image))) for download_id, image in images.items() ]
+        return self.__execute(lambda connection:
+                              connection.executemany("INSERT OR IGNORE INTO jobs (id, data) VALUES (?, ?)", rows).rowcount)
+
+    def __find_expired(self, connection : sqlite3.Connection) -> str | None:
+        """
+        Find a leased job whose generation has not changed for a whole lease,
+        giving up those that already used every attempt.
+        """
+        now = time.monotonic()
+        leased = connection.execute("SELECT id, generation, attempts FROM jobs WHERE state = 'leased'").fetchall()
+        self.observed = { download_id : observed for download_id, observed in self.observed.items()
+                          if download_id in { row[0] for row in leased } }
+
+        for download_id, generation, attempts in leased:
+            seen_generation, seen_at = self.observed.get(download_id, (None, now))
+            if seen_generation != generation:
+                self.observed[download_id] = (generation, now)
+            elif now - seen_at >= self.lease:
+                del self.observed[download_id]
+                if attempts < self.max_attempts:
+                    return download_id
+                connection.execute("UPDATE jobs SET state = 'failed' WHERE id = ? AND generation = ?", (download_id, generation))
+
+        return None
+
+    def claim(self, owner : str) -> Tuple[str, SatelliteImage] | None:
+        """
+        Claim the next pending job or a job whose lease expired.
+
+        Parameters
+        ----------
+        owner : str
+            Unique name of the claiming worker
+
+        Returns
+        -------
+        Tuple[str, SatelliteImage] | None
+            The download ID and product of the claimed job, or None if no job is claimable now
+        """
+        def transaction(connection : sqlite3.Connection) -> Tuple[str, SatelliteImage] | None:
+            row = connection.execute("SELECT id FROM jobs WHERE state = 'pending' ORDER BY rowid LIMIT 1").fetchone()
+            download_id = row[0] if row is not None else self.__find_expired(connection)
+            if download_id is None:
+                return None
+
+            connection.execute("""UPDATE jobs SET state = 'leased', owner = ?, generation = generation + 1,
+                                  attempts = attempts + 1 WHERE id = ?""", (owner, download_id))
+            data = connection.execute("SELECT data FROM jobs WHERE id = ?", (download_id, )).fetchone()[0]
+            return download_id, SatelliteImage(**json.loads(data))
+
+        return self.__execute(transaction)
+
+    def has_leases(self) -> bool:
+        """
+        Check whether any job is still leased, i.e. may become claimable again.
+
+        Returns
+        -------
+        bool
+            True if at least one job is leased
+        """
+        return self.__execute(lambda connection:
+                              connection.execute("SELECT 1 FROM jobs WHERE state = 'leased' LIMIT 1").fetchone() is not None)
+
+    def renew(self, owner : str) -> int:
+        """
+        Extend every lease held by a worker.
+
+        Parameters
+        ----------
+        owner : str
+            Unique name of the worker
+
+        Returns
+        -------
+        int
+            Number of renewed leases
+        """
+        return self.__execute(lambda connection:
+                              connection.execute("UPDATE jobs SET generation = generation + 1 WHERE owner = ? AND state = 'leased'",
+                                                 (owner, )).rowcount)
+
+    def release(self, download_id : str, owner : str, path : str | None) -> None:
+        """
+        Release a claimed job with its outcome.
+
+        Parameters
+        ----------
+        download_id : str
+            The download ID of the job
+        owner : str
+            Unique name of the worker that held the lease
+        path : str | None
+            The location of the downloaded product, or None if the download failed
+
+        Notes
+        -----
+        Releases from a worker that no longer holds the lease, because it was
+        reclaimed by another worker, are ignored.
+        """
+        def transaction(connection : sqlite3.Connection) -> None:
+            if path is not None:
+                connection.execute("UPDATE jobs SET state = 'done', path = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                                   (path, download_id, owner))
+            else:
+                connection.execute("""UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END
+                                      WHERE id = ? AND owner = ? AND state = 'leased'""", (self.max_attempts, download_id, owner))
+
+        self.__execute(transaction)
+
+    def get_status(self) -> Dict[str, int]:
+        """
+        Count the jobs in each state.
+
+        Returns
+        -------
+        Dict[str, int]
+            Dictionary mapping states to their number of jobs
+        """
+        return dict(self.__execute(lambda connection:
+                                   connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()))
+
+
+class CooperativeDownloader:
+    """
+    Worker pulling products from a shared WorkLedger until no job is left.
+
+    Any number of instances, on any number of nodes, can run against the same
+    ledger: each job is downloaded by a single worker at a time, and jobs of
+    workers that die are reclaimed once their lease expires.
+
+    Parameters
+    ----------
+    downloader : SatelliteImageDownloader
+        The downloader used for the transfers
+    ledger : WorkLedger
+        The shared ledger of jobs
+    workers : int
+        Number of concurrent downloads of this instance
+    owner : str | None
+        Unique name of this instance. Defaults to the host name, the process ID and a random suffix.
+
+    Notes
+    -----
+    A background thread renews the leases of this instance every third of the
+    lease duration, so long transfers are not reclaimed while still running.
+    Workers keep polling the ledger while other workers hold leases, so the
+    jobs of workers that die are picked up once their lease expires.
+
+    Examples
+    --------
+    >>> ledger = WorkLedger('/shared/backfill.sqlite')
+    >>> paths = CooperativeDownloader(SatelliteImageDownloader(api), ledger, workers = 4).run('/shared/products')
+    """
+    def __init__(self, downloader : SatelliteImageDownloader, ledger : WorkLedger, workers : int = 1,
+                 owner : str | None = None) -> None:
+        self.downloader = downloader
+        self.ledger = ledger
+        self.workers = workers
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+
+    def __heartbeat(self, stop : threading.Event) -> None:
+        """
+        Renew the leases of this instance until stopped.
+        """
+        while not stop.wait(self.ledger.lease / 3):
+            try:
+                self.ledger.renew(self.owner)
+            except Exception as exc:
+                print(f"Failed to renew the leases of {self.owner}. {exc}")
+
+    def __work(self, outdir : str) -> Dict[str, str | None]:
+        """
+        Claim and download jobs until the ledger is exhausted.
+        """
+        paths : Dict[str, str | None] = {}
+        while True:
+            if (job := self.ledger.claim(self.owner)) is None:
+                if not self.ledger.has_leases():
+                    break
+                time.sleep(self.ledger.lease / 10)
+                continue
+
+            download_id, image = job
+            paths[download_id] = self.downloader.download(download_id, outdir, image.filename, checksum = image.checksum)
+            self.ledger.release(download_id, self.owner, paths[download_id])
+        return paths
+
+    def run(self, outdir : str) -> Dict[str, str | None]:
+        """
+        Download jobs from the ledger until none is left.
+
+        Parameters
+        ----------
+        outdir : str
+            The output directory where the images will be saved
+
+        Returns
+        -------
+        Dict[str, str | None]
+            Dictionary mapping the download IDs handled by this instance to their
+            locations; failed downloads are None
+        """
+        stop = threading.Event()
+        heartbeat = threading.Thread(target = self.__heartbeat, args = (stop, ), daemon = True)
+        heartbeat.start()
+
+        paths : Dict[str, str | None] = {}
+        try:
+            with ThreadPoolExecutor(max_workers = self.workers) as executor:
+                for partial in executor.map(self.__work, [ outdir ] * self.workers):
+                    paths.update(partial)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        return paths
@@ -0,0 +1,147 @@
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from sat_download.data_types.search import SatelliteImage, SearchFilters
+from sat_download.services.downloader import SatelliteImageDownloader
+
+if TYPE_CHECKING:
+    from sat_download.api.usgs import USGSAPI
+
+
+class OrderPipeline:
+    """
+    Asynchronous USGS order pipeline overlapping product preparation and transfers.
+
+    Orders are submitted for every matching scene, including those M2M is
+    still preparing, and their labels are polled concurrently. Each URL is
+    handed to the download pool as soon as it becomes ready.
+
+    Parameters
+    ----------
+    downloader : SatelliteImageDownloader
+        Downloader wrapping a USGSAPI client
+    poll_interval : float
+        Seconds between two polling rounds
+    timeout : float
+        Seconds after which scenes that are still being prepared are given up
+    workers : int
+        Number of concurrent downloads (and concurrent polls)
+
+    Attributes
+    ----------
+    failed : List[Tuple[SearchFilters, Exception]]
+        The filters whose order could not be submitted in the last run, with their error
+
+    Examples
+    --------
+    >>> pipeline = OrderPipeline(SatelliteImageDownloader(USGSAPI(username, token)))
+    >>> paths = pipeline.run([filters_2023, filters_2024], 'downloads')
+    """
+    def __init__(self, downloader : SatelliteImageDownloader, poll_interval : float = 30,
+                 timeout : float = 3600, workers : int = 4) -> None:
+        from sat_download.api.usgs import USGSAPI
+
+        if not isinstance(downloader.api, USGSAPI):
+            raise Exception("The order pipeline requires a USGSAPI client")
+
+        self.downloader = downloader
+        self.api : 'USGSAPI' = downloader.api
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.workers = workers
+        self.failed : List[Tuple[SearchFilters, Exception]] = []
+
+    def submit(self, filters : List[SearchFilters]) -> Dict[Tuple[str, str], SatelliteImage]:
+        """
+        Submit one order per set of filters.
+
+        Parameters
+        ----------
+        filters : List[SearchFilters]
+            The search filters of each order
+
+        Returns
+        -------
+        Dict[Tuple[str, str], SatelliteImage]
+            Dictionary mapping (order label, entity ID) pairs to the ordered images
+
+        Notes
+        -----
+        A failed order is reported and recorded in ``failed`` together with its
+        filters; it does not affect the other orders.
+        """
+        pending : Dict[Tuple[str, str], SatelliteImage] = {}
+        self.failed = []
+
+        with ThreadPoolExecutor(max_workers = self.workers) as executor:
+            orders = [ (order, executor.submit(self.api.order, order)) for order in filters ]
+            for order, future in orders:
+                try:
+                    label, images = future.result()
+                except Exception as exc:
+                    print(f"Failed to order {order.collection} {order.start_date}/{order.end_date}. {exc}")
+                    self.failed.append((order, exc))
+                    continue
+
+                for entity_id, image in images.items():
+                    pending[(label, entity_id)] = image
+
+        return pending
+
+    def run(self, filters : SearchFilters | List[SearchFilters], outdir : str) -> Dict[Tuple[str, str], str | None]:
+        """
+        Order, poll and download every scene matching the filters.
+
+        Parameters
+        ----------
+        filters : SearchFilters | List[SearchFilters]
+            The search filters of each order
+        outdir : str
+            The output directory where the images will be saved
+
+        Returns
+        -------
+        Dict[Tuple[str, str], str | None]
+            Dictionary mapping (order label, entity ID) pairs to the downloaded
+            file paths. Scenes that failed or were not ready before the timeout map to None.
+
+        Notes
+        -----
+        Polling stops as soon as every ordered scene has been handed to the
+        download pool, and the method returns once those downloads finish.
+        A failed poll is reported and retried in the next round; it does not
+        affect the other orders. Orders that could not be submitted are listed in ``failed``.
+        """
+        filters = filters if isinstance(filters, list) else [ filters ]
+        pending = self.submit(filters)
+        deadline = time.monotonic() + self.timeout
+
+        futures : Dict[Tuple[str, str], Future] = {}
+        with ThreadPoolExecutor(max_workers = self.workers) as downloads, \
+             ThreadPoolExecutor(max_workers = self.workers) as polls:
+            while pending:
+                labels = list({ label for label, _ in pending })
+                for label, poll in zip(labels, [ polls.submit(self.api.retrieve, label) for label in labels ]):
+                    try:
+                        urls = poll.result()
+                    except Exception as exc:
+                        print(f"Failed to poll order {label}. {exc}")
+                        continue
+
+                    for entity_id, url in urls.items():
+                        image = pending.pop((label, entity_id), None)
+                        if image is not None:
+                            futures[(label, entity_id)] = downloads.submit(self.downloader.download, url, outdir, image.filename)
+
+                if not pending or time.monotonic() > deadline:
+                    break
+                time.sleep(self.poll_interval)
+
+            paths = { key : future.result() for key, future in futures.items() }
+
+        for label, entity_id in pending:
+            print(f"Scene {entity_id} of order {label} was not ready after {self.timeout} seconds")
+            paths[(label, entity_id)] = None
+
+        return paths
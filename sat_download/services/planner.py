@@ -0,0 +1,74 @@
+import os
+import shutil
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+from sat_download.data_types.search import SearchResults
+
+
+@dataclass
+class DownloadPlan:
+    """
+    Submission order of a batch of downloads.
+
+    Parameters
+    ----------
+    order : List[str]
+        Download IDs in submission order, largest products first
+    sizes : Dict[str, int | None]
+        Size in bytes of each download, None when unknown
+    total_size : int
+        Total bytes of the products with a known size
+    unknown : int
+        Number of products whose size is not reported by the provider
+    """
+    order : List[str] = field(default_factory = list)
+    sizes : Dict[str, int | None] = field(default_factory = dict)
+    total_size : int = 0
+    unknown : int = 0
+
+
+def plan_downloads(images : SearchResults, outdir : str | None = None) -> DownloadPlan:
+    """
+    Plan a batch of downloads for a pool of workers.
+
+    Parameters
+    ----------
+    images : SearchResults
+        The search results to download
+    outdir : str | None
+        Output directory whose free disk space is checked, if given
+
+    Returns
+    -------
+    DownloadPlan
+        The submission order and the sizes of the downloads
+
+    Raises
+    ------
+    Exception
+        If the output directory has not enough free space for the known sizes
+
+    Notes
+    -----
+    Jobs are sorted by decreasing size. Submitted in that order to a shared
+    pool, every worker that becomes free takes the largest remaining product,
+    which is longest-processing-time-first scheduling driven by the actual
+    transfer times, so a large product never ends up alone at the tail of
+    the queue. Products of unknown size are scheduled last and ignored by the
+    disk space check. The results are read in a single pass, so disk-backed
+    results are streamed.
+    """
+    sizes = { download_id : image.size for download_id, image in images.items() }
+    order = sorted(sizes, key = lambda download_id: sizes[download_id] or 0, reverse = True)
+    plan = DownloadPlan(order = order, sizes = sizes)
+    plan.total_size = sum(size for size in sizes.values() if size is not None)
+    plan.unknown = sum(1 for size in sizes.values() if size is None)
+
+    if outdir is not None:
+        os.makedirs(outdir, exist_ok = True)
+        free = shutil.disk_usage(outdir).free
+        if plan.total_size > free:
+            raise Exception(f"Not enough disk space in {outdir}: {plan.total_size / 1e9:.2f} GB required, {free / 1e9:.2f} GB free")
+
+    return plan
@@ -0,0 +1,161 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict
+from uuid import uuid4
+from sat_download.data_types.search import SatelliteImage, SearchResults
+from sat_download.services.downloader import SatelliteImageDownloader
+
+if TYPE_CHECKING:
+    import requests
+
+
+class QuicklookScreener:
+    """
+    Pre-screening of search results on their quicklook previews.
+
+    Previews of a batch are fetched concurrently into a local cache and a user
+    predicate decides which products are worth downloading, so kilobyte-sized
+    previews gate gigabyte-sized transfers.
+
+    Parameters
+    ----------
+    downloader : SatelliteImageDownloader
+        The downloader whose API found the results
+    cache_dir : str
+        Directory where the previews are cached, named after the products
+    workers : int
+        Number of previews fetched concurrently
+    keep_missing : bool
+        Whether products without a preview pass the screening
+
+    Raises
+    ------
+    Exception
+        If the API of the downloader does not search with ``quicklooks`` enabled
+
+    Notes
+    -----
+    Previews come from the expanded ``Assets`` (QUICKLOOK) of OData results
+    and from the browse images of USGS results. The screener does not change
+    the API it is given: ``quicklooks`` must be enabled on it before searching,
+    so the results carry their preview URLs. Previews are written to a temporary file and renamed
+    once complete, and cached previews are never fetched again, so
+    re-screening a batch with another predicate is free.
+
+    Examples
+    --------
+    >>> downloader.api.quicklooks = True
+    >>> results = downloader.api.bulk_search(filters)
+    >>> screener = QuicklookScreener(downloader, 'quicklooks')
+    >>> clear = screener.screen(results, lambda image, path: cloudiness(path) < 0.3)
+    >>> downloader.bulk_download(clear, 'downloads')
+    """
+    def __init__(self, downloader : SatelliteImageDownloader, cache_dir : str, workers : int = 8,
+                 keep_missing : bool = True) -> None:
+        if not downloader.api.quicklooks:
+            raise Exception("Quicklook screening requires searching with quicklooks enabled: set api.quicklooks = True")
+
+        self.downloader = downloader
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.keep_missing = keep_missing
+
+    def get_path(self, image : SatelliteImage) -> str:
+        """
+        Get the cache path of the preview of a product.
+
+        Parameters
+        ----------
+        image : SatelliteImage
+            The product
+
+        Returns
+        -------
+        str
+            Path of the cached preview, keeping the extension of its URL when it has one
+        """
+        extension = os.path.splitext((image.quicklook or '').split('?')[0])[-1]
+        extension = extension if extension in ('.jpg', '.jpeg', '.png', '.tif', '.tiff') else '.jpg'
+        return os.path.join(self.cache_dir, f"{os.path.splitext(image.filename)[0]}{extension}")
+
+    def __fetch(self, session : 'requests.Session', image : SatelliteImage) -> str | None:
+        """
+        Fetch a single preview unless it is already cached.
+        """
+        path = self.get_path(image)
+        if os.path.exists(path):
+            return path
+
+        temporal = f"{path}.{uuid4().hex}.part"
+        try:
+            if self.downloader.api.download_quicklook(image, temporal, session) is None:
+                return None
+            os.replace(temporal, path)
+            return path
+        except Exception as exc:
+            print(f"Failed to download the quicklook of {image.filename}. {exc}")
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+    def fetch(self, images : SearchResults) -> Dict[str, str | None]:
+        """
+        Fetch the previews of a batch of products.
+
+        Parameters
+        ----------
+        images : SearchResults
+            The search results whose previews are fetched
+
+        Returns
+        -------
+        Dict[str, str | None]
+            Dictionary mapping download IDs to the cached preview paths; products
+            without a preview or whose preview failed map to None
+        """
+        import requests
+
+        os.makedirs(self.cache_dir, exist_ok = True)
+        with requests.Session() as session, ThreadPoolExecutor(max_workers = self.workers) as executor:
+            paths = executor.map(lambda image: self.__fetch(session, image), images.values())
+            return dict(zip(images, paths))
+
+    def screen(self, images : SearchResults, predicate : Callable[[SatelliteImage, str], bool]) -> SearchResults:
+        """
+        Prune a batch of products by looking at their previews.
+
+        Parameters
+        ----------
+        images : SearchResults
+            The search results to screen
+        predicate : Callable[[SatelliteImage, str], bool]
+            Function receiving a product and the path of its preview, returning
+            whether the product should be downloaded
+
+        Returns
+        -------
+        SearchResults
+            The products that passed the screening, ready for ``bulk_download``
+
+        Notes
+        -----
+        Predicate errors are printed and the product is kept, so a broken
+        preview never silently discards a product.
+        """
+        selected : SearchResults = {}
+        for download_id, path in self.fetch(images).items():
+            image = images[download_id]
+            if path is None:
+                keep = self.keep_missing
+            else:
+                try:
+                    keep = predicate(image, path)
+                except Exception as exc:
+                    print(f"Failed to screen {image.filename}. {exc}")
+                    keep = True
+
+            if keep:
+                selected[download_id] = image
+
+        return selected
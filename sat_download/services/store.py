@@ -0,0 +1,343 @@
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+
+from contextlib import closing
+from typing import Callable, Tuple
+from uuid import uuid4
+from sat_download.api.base import SatelliteAPI
+from sat_download.utils.locking import FileLock
+from sat_download.utils.profiling import profile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class ProductStore:
+    """
+    Content-addressed store of downloaded products shared by every output directory.
+
+    Products are stored once under the SHA-256 digest of their content and
+    materialized into each requested output path through a hard link, a
+    reflink or, as a last resort, a copy.
+
+    Parameters
+    ----------
+    root : str
+        Directory of the store; it should be on the same filesystem as the
+        output directories for hard links to be possible
+    max_size : int | None
+        Maximum bytes kept in the store. Least recently used products are
+        evicted beyond it. If None, nothing is evicted.
+    lock_timeout : float
+        Seconds to wait for a concurrent transfer of the same product
+
+    Notes
+    -----
+    Products are keyed by their file name, which the factories derive from the
+    provider product name, so the same scene found through different searches
+    or different download URLs maps to the same entry. When the catalogue
+    reports a checksum, the product is looked up by that checksum instead and
+    its download is verified against it, so a reprocessed product published
+    under the same name is never served from a stale entry. A request for a product
+    being transferred by another thread or process waits on its lock instead of
+    starting another transfer. Hard-linked outputs share their content with the
+    store, so they must not be modified in place.
+
+    Examples
+    --------
+    >>> store = ProductStore('/data/store', max_size = 500 * 10**9)
+    >>> downloader = SatelliteImageDownloader(api, store = store)
+    >>> downloader.bulk_download(results, 'team_a')
+    >>> downloader.bulk_download(results, 'team_b')  # no transfer, only links
+    """
+    FICLONE = 0x40049409
+
+    def __init__(self, root : str, max_size : int | None = None, lock_timeout : float = 6 * 3600) -> None:
+        self.root = root
+        self.max_size = max_size
+        self.lock_timeout = lock_timeout
+
+        for directory in ('objects', 'locks', 'tmp'):
+            os.makedirs(os.path.join(root, directory), exist_ok = True)
+
+        def transaction(connection : sqlite3.Connection) -> None:
+            connection.execute("""CREATE TABLE IF NOT EXISTS products (
+                key TEXT PRIMARY KEY, digest TEXT, size INTEGER, last_used REAL, checksum TEXT)""")
+            if 'checksum' not in [ row[1] for row in connection.execute("PRAGMA table_info(products)") ]:
+                connection.execute("ALTER TABLE products ADD COLUMN checksum TEXT")
+            connection.execute("CREATE INDEX IF NOT EXISTS products_checksum ON products (checksum)")
+
+        self.__execute(transaction)
+
+    def __execute(self, transaction : Callable[[sqlite3.Connection], object]) -> object:
+        """
+        Run a transaction on the store index.
+        """
+        with closing(sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout = 60)) as connection:
+            with connection:
+                return transaction(connection)
+
+    def __get_blob(self, digest : str) -> str:
+        """
+        Get the path of the content with the given digest.
+        """
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def __find(self, key : str, checksum : str | None) -> Tuple[str, str] | None:
+        """
+        Find the key and digest of a stored product, by checksum when one is given.
+        """
+        if checksum is not None:
+            query, parameters = "SELECT key, digest FROM products WHERE checksum = ? LIMIT 1", (checksum, )
+        else:
+            query, parameters = "SELECT key, digest FROM products WHERE key = ?", (key, )
+        return self.__execute(lambda connection: connection.execute(query, parameters).fetchone())
+
+    def __hold(self, key : str) -> FileLock:
+        """
+        Get the transfer lock of a product; it is released by the operating
+        system if its holder dies.
+        """
+        return FileLock(os.path.join(self.root, 'locks', f"{hashlib.sha1(key.encode()).hexdigest()}.lock"),
+                        timeout = self.lock_timeout)
+
+    def materialize(self, source : str, outname : str) -> str:
+        """
+        Make a stored content available at an output path.
+
+        Parameters
+        ----------
+        source : str
+            Path of the stored content
+        outname : str
+            The output path
+
+        Returns
+        -------
+        str
+            The output path
+
+        Notes
+        -----
+        A hard link is tried first, then a reflink (copy-on-write clone, Linux
+        only) and finally a regular copy.
+        """
+        directory = os.path.dirname(outname)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        if os.path.lexists(outname):
+            os.remove(outname)
+
+        try:
+            os.link(source, outname)
+            return outname
+        except OSError:
+            pass
+
+        if fcntl is not None:
+            try:
+                with open(source, 'rb') as origin, open(outname, 'wb') as target:
+                    fcntl.ioctl(target.fileno(), self.FICLONE, origin.fileno())
+                return outname
+            except OSError:
+                pass
+
+        shutil.copyfile(source, outname)
+        return outname
+
+    def get(self, key : str, outname : str, checksum : str | None = None) -> str | None:
+        """
+        Materialize a stored product.
+
+        Parameters
+        ----------
+        key : str
+            The product key (its file name)
+        outname : str
+            The output path
+        checksum : str | None
+            Provider checksum of the product as ``algorithm:value``. If given,
+            the product is looked up by checksum instead of by key.
+
+        Returns
+        -------
+        str | None
+            The output path, or None if the product is not stored
+
+        Notes
+        -----
+        A content evicted or discarded by another process while being
+        materialized is reported as not stored.
+        """
+        row = self.__find(key, checksum)
+        if row is None:
+            return None
+
+        self.__execute(lambda connection: connection.execute("UPDATE products SET last_used = ? WHERE key = ?", (time.time(), row[0])))
+        try:
+            return self.materialize(self.__get_blob(row[1]), outname)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key : str, path : str, checksum : str | None = None) -> str:
+        """
+        Move a downloaded product into the store.
+
+        Parameters
+        ----------
+        key : str
+            The product key (its file name)
+        path : str
+            Path of the downloaded product; it is moved, not copied
+        checksum : str | None
+            Provider checksum of the product as ``algorithm:value``, verified
+            while the content is hashed
+
+        Returns
+        -------
+        str
+            Path of the stored content
+
+        Raises
+        ------
+        Exception
+            If the content does not match ``checksum``; the download is removed
+        """
+        MB = (1024 * 1024)
+
+        digest = hashlib.sha256()
+        expected = checksum.split(':', 1) if checksum is not None else None
+        verification = hashlib.new(expected[0]) if expected is not None else None
+        with open(path, 'rb') as file:
+            while chunk := file.read(MB):
+                digest.update(chunk)
+                if verification is not None:
+                    verification.update(chunk)
+        digest = digest.hexdigest()
+
+        if verification is not None and verification.hexdigest() != expected[1]:
+            os.remove(path)
+            raise Exception(f"Error en la descarga: {key} does not match its checksum {checksum}")
+
+        blob = self.__get_blob(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok = True)
+        if os.path.exists(blob):
+            os.remove(path)
+        else:
+            os.replace(path, blob)
+
+        size = os.path.getsize(blob)
+        self.__execute(lambda connection: connection.execute("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)",
+                                                             (key, digest, size, time.time(), checksum)))
+        self.evict()
+        return blob
+
+    def discard(self, key : str, checksum : str | None = None) -> None:
+        """
+        Forget a stored product, e.g. after it failed validation.
+
+        Parameters
+        ----------
+        key : str
+            The product key (its file name)
+        checksum : str | None
+            Provider checksum of the product; entries stored under it are forgotten too
+
+        Notes
+        -----
+        The content is removed once no other key refers to it.
+        """
+        def transaction(connection : sqlite3.Connection) -> None:
+            rows = connection.execute("SELECT DISTINCT digest FROM products WHERE key = ? OR checksum = ?", (key, checksum)).fetchall()
+            connection.execute("DELETE FROM products WHERE key = ? OR checksum = ?", (key, checksum))
+
+            for digest, in rows:
+                if connection.execute("SELECT 1 FROM products WHERE digest = ?", (digest, )).fetchone() is None:
+                    try:
+                        os.remove(self.__get_blob(digest))
+                    except FileNotFoundError:
+                        pass
+
+        self.__execute(transaction)
+
+    def evict(self) -> None:
+        """
+        Remove least recently used products until the store fits ``max_size``.
+
+        Notes
+        -----
+        Contents shared by several keys are counted and removed once. Products
+        already materialized through hard links stay available at their
+        output paths.
+        """
+        if self.max_size is None:
+            return
+
+        def transaction(connection : sqlite3.Connection) -> None:
+            rows = connection.execute("""SELECT digest, MAX(size), MAX(last_used) FROM products
+                                         GROUP BY digest ORDER BY MAX(last_used)""").fetchall()
+            total = sum(size for _, size, _ in rows)
+
+            for digest, size, _ in rows[:-1]:
+                if total <= self.max_size:
+                    break
+                connection.execute("DELETE FROM products WHERE digest = ?", (digest, ))
+                try:
+                    os.remove(self.__get_blob(digest))
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+        self.__execute(transaction)
+
+    def fetch(self, api : SatelliteAPI, download_id : str, outname : str, verbose : int = 0,
+              checksum : str | None = None) -> str | None:
+        """
+        Materialize a product, downloading it into the store only if needed.
+
+        Parameters
+        ----------
+        api : SatelliteAPI
+            The API used to download the product
+        download_id : str
+            The download ID of the product
+        outname : str
+            The output path; its file name is the product key
+        verbose : int
+            Verbosity level for logging the download process. 0 = silent, >0 = progress bar,
+        checksum : str | None
+            Provider checksum of the product as ``algorithm:value``, used as its
+            key and to verify its download
+
+        Returns
+        -------
+        str | None
+            The output path, or None if the download failed
+
+        Notes
+        -----
+        The unlocked lookup is only a fast path: a product evicted meanwhile
+        is looked up again and, if needed, downloaded under the transfer lock.
+        """
+        key = os.path.basename(outname)
+        if self.get(key, outname, checksum) is not None:
+            return outname
+
+        with self.__hold(checksum or key):
+            if self.get(key, outname, checksum) is not None:
+                return outname
+
+            temporal = os.path.join(self.root, 'tmp', f"{uuid4().hex}_{key}")
+            try:
+                if api.download(download_id, temporal, verbose) is None:
+                    return None
+                with profile(api.profiler, 'store', key):
+                    return self.materialize(self.put(key, temporal, checksum), outname)
+            finally:
+                if os.path.exists(temporal):
+                    os.remove(temporal)
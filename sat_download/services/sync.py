@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import tempfile
+
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Dict, List
+from sat_download.data_types.search import SearchFilters, SearchResults
+from sat_download.services.downloader import SatelliteImageDownloader
+from sat_download.utils.locking import FileLock
+
+
+def _parse_timestamp(value : str) -> datetime:
+    """
+    Parse an ISO publication timestamp of any fractional precision, assuming UTC when no offset is given.
+    """
+    value = value.strip().replace(' ', 'T').replace('Z', '+00:00')
+    value = re.sub(r'\.(\d+)', lambda match: '.' + match.group(1)[:6].ljust(6, '0'), value)
+    timestamp = datetime.fromisoformat(value)
+    return timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo = timezone.utc)
+
+
+class DeltaSync:
+    """
+    Incremental search-and-download driven by publication-time checkpoints.
+
+    Each query keeps a checkpoint with the latest publication timestamp it has
+    already delivered, so later polls only list the products published since
+    then instead of re-listing the whole date window.
+
+    Parameters
+    ----------
+    downloader : SatelliteImageDownloader
+        The downloader whose API is polled and which receives the new products
+    checkpoint_path : str
+        JSON file where the per-query checkpoints are stored
+
+    Notes
+    -----
+    The checkpoint key ignores the date window, so polls with a sliding
+    ``end_date`` share the same checkpoint. Checkpoints are only advanced
+    past products that were downloaded successfully, so a failed product is
+    retried on the next poll. Timestamps are compared as datetimes, since
+    catalogues mix fractional-second precisions, and syncs sharing a
+    checkpoint file update it under a file lock.
+
+    Examples
+    --------
+    >>> sync = DeltaSync(SatelliteImageDownloader(ODataAPI(user, password)), 'checkpoints.json')
+    >>> paths = sync.run(filters, 'downloads')
+    """
+    def __init__(self, downloader : SatelliteImageDownloader, checkpoint_path : str) -> None:
+        self.downloader = downloader
+        self.checkpoint_path = checkpoint_path
+
+    def __load(self) -> Dict[str, str]:
+        """
+        Load the stored checkpoints.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+
+        with open(self.checkpoint_path) as file:
+            return json.load(file)
+
+    def __save(self, checkpoints : Dict[str, str]) -> None:
+        """
+        Atomically store the checkpoints.
+        """
+        descriptor, temporal = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(self.checkpoint_path)),
+                                                prefix = f"{os.path.basename(self.checkpoint_path)}.", suffix = '.tmp')
+        try:
+            with os.fdopen(descriptor, 'w') as file:
+                json.dump(checkpoints, file, indent = 2)
+            os.replace(temporal, self.checkpoint_path)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+    def get_key(self, filters : SearchFilters) -> str:
+        """
+        Get the checkpoint key of a query.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters of the query
+
+        Returns
+        -------
+        str
+            Hash of every filter except the date window and the checkpoint itself
+        """
+        return filters.get_key()
+
+    def get_checkpoint(self, filters : SearchFilters) -> str | None:
+        """
+        Get the stored checkpoint of a query.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters of the query
+
+        Returns
+        -------
+        str | None
+            The latest delivered publication timestamp, or None if the query was never synced
+        """
+        return self.__load().get(self.get_key(filters))
+
+    def poll(self, filters : SearchFilters) -> SearchResults:
+        """
+        List the products published since the query checkpoint.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters of the query
+
+        Returns
+        -------
+        SearchResults
+            The products published after the checkpoint (every product on the first poll)
+        """
+        checkpoint = self.get_checkpoint(filters)
+        results = self.downloader.bulk_search(replace(filters, published_after = checkpoint)) or {}
+
+        if checkpoint is None:
+            return results
+
+        return { image_id : image for image_id, image in results.items()
+                 if image.published is None or _parse_timestamp(image.published) > _parse_timestamp(checkpoint) }
+
+    def commit(self, filters : SearchFilters, results : SearchResults, paths : List[str | None]) -> str | None:
+        """
+        Advance the query checkpoint past the products that were delivered.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters of the query
+        results : SearchResults
+            The products returned by ``poll``
+        paths : List[str | None]
+            The download outcome of each product, in the same order as ``results``
+
+        Returns
+        -------
+        str | None
+            The new checkpoint of the query
+
+        Notes
+        -----
+        The checkpoint advances in publication order and stops right before
+        the first failed download.
+        """
+        key = self.get_key(filters)
+        outcomes = sorted((_parse_timestamp(image.published), image.published, path is not None)
+                          for image, path in zip(results.values(), paths) if image.published is not None)
+
+        with FileLock(f"{self.checkpoint_path}.lock"):
+            checkpoints = self.__load()
+            for timestamp, published, downloaded in outcomes:
+                if not downloaded:
+                    break
+                if key not in checkpoints or timestamp > _parse_timestamp(checkpoints[key]):
+                    checkpoints[key] = published
+
+            self.__save(checkpoints)
+        return checkpoints.get(key)
+
+    def run(self, filters : SearchFilters, outdir : str) -> List[str | None]:
+        """
+        Poll a query and download its new products.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            The search filters of the query
+        outdir : str
+            The output directory where the images will be saved
+
+        Returns
+        -------
+        List[str | None]
+            The file paths of the new products; failed downloads are None
+        """
+        results = self.poll(filters)
+        if not results:
+            return []
+
+        paths = self.downloader.bulk_download(results, outdir) or [ None ] * len(results)
+        self.commit(filters, results, paths)
+        return paths
@@ -0,0 +1,261 @@
+import csv
+import json
+
+from abc import ABC, abstractmethod
+from dataclasses import replace
+from typing import Dict, List, Tuple
+from sat_download.data_types.search import SearchFilters
+from sat_download.geometry import (Polygon, contains, get_bbox, get_latitude_band, get_mgrs_square,
+                                   get_sentinel2_footprint, get_utm_zone, intersects, parse_wkt, to_utm)
+
+
+class TileIndex(ABC):
+    """
+    Abstract base class for offline geometry-to-tile resolution.
+
+    A tile index turns arbitrary AOI geometries into the tile identifiers used
+    by ``SearchFilters.tile_id``, so searches can be issued as tile-keyed queries
+    instead of server-side geometry intersections.
+
+    See Also
+    --------
+    sat_download.services.tiles.MGRSIndex : Computed Sentinel-2 MGRS tiling grid
+    sat_download.services.tiles.FootprintIndex : Grid index over tile footprints loaded from a file
+    """
+
+    @abstractmethod
+    def resolve(self, geometry : str) -> List[str]:
+        """
+        Resolve a WKT geometry into the identifiers of the tiles it intersects.
+
+        Parameters
+        ----------
+        geometry : str
+            WKT geometry of the area of interest
+
+        Returns
+        -------
+        List[str]
+            Sorted identifiers of the intersecting tiles
+
+        Notes
+        -----
+        This is an abstract method that concrete implementations must override.
+        """
+        pass
+
+    def resolve_many(self, geometries : List[str]) -> Dict[str, List[int]]:
+        """
+        Resolve several AOIs at once, de-duplicating the tiles they share.
+
+        Parameters
+        ----------
+        geometries : List[str]
+            WKT geometries of the areas of interest
+
+        Returns
+        -------
+        Dict[str, List[int]]
+            Dictionary mapping each tile identifier to the positions of the AOIs it covers
+        """
+        tiles : Dict[str, List[int]] = {}
+        for position, geometry in enumerate(geometries):
+            for tile in self.resolve(geometry):
+                tiles.setdefault(tile, []).append(position)
+
+        return tiles
+
+    def split(self, filters : SearchFilters) -> List[SearchFilters]:
+        """
+        Replace the geometry of some filters by one tile-keyed filter per intersecting tile.
+
+        Parameters
+        ----------
+        filters : SearchFilters
+            Search filters with the ``geometry`` attribute set
+
+        Returns
+        -------
+        List[SearchFilters]
+            Copies of the filters with ``geometry`` cleared and ``tile_id`` set
+        """
+        return [ replace(filters, geometry = None, tile_id = tile) for tile in self.resolve(filters.geometry) ]
+
+
+class MGRSIndex(TileIndex):
+    """
+    Sentinel-2 tile index computed from the MGRS grid definition.
+
+    The Sentinel-2 tiling grid is derived from UTM/MGRS, so footprints are
+    computed on the fly instead of being shipped as data.
+
+    Parameters
+    ----------
+    step : float
+        Sampling step in degrees used to find candidate tiles inside the AOI
+
+    Notes
+    -----
+    Candidate tiles are found by sampling the AOI boundary and interior, and
+    every candidate (plus its neighbours) is then checked against the AOI with
+    an exact footprint intersection. Since the sampling step is well below the
+    100 km square size, no intersecting tile is missed. Tiles of the adjacent
+    UTM zone that extend over the zone boundary are included as well, while
+    squares lying entirely outside their own zone are discarded.
+
+    Examples
+    --------
+    >>> index = MGRSIndex()
+    >>> index.resolve('POINT(-3.7 40.4)')
+    ['30TVK']
+    """
+    def __init__(self, step : float = 0.5) -> None:
+        self.step = step
+
+    def __sample(self, ring : Polygon) -> List[Tuple[float, float]]:
+        """
+        Sample points along the boundary and inside a polygon ring.
+        """
+        points = list(ring)
+        if len(ring) < 3:
+            return points
+
+        for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+            steps = int(max(abs(x2 - x1), abs(y2 - y1)) // self.step) + 1
+            points.extend((x1 + (x2 - x1) * i / steps, y1 + (y2 - y1) * i / steps) for i in range(1, steps))
+
+        min_lon, min_lat, max_lon, max_lat = get_bbox(ring)
+        lon = min_lon
+        while lon <= max_lon:
+            lat = min_lat
+            while lat <= max_lat:
+                if contains(ring, (lon, lat)):
+                    points.append((lon, lat))
+                lat += self.step
+            lon += self.step
+
+        return points
+
+    def resolve(self, geometry : str) -> List[str]:
+        tiles = set()
+
+        for ring in parse_wkt(geometry):
+            candidates = set()
+            for lon, lat in self.__sample(ring):
+                zone = get_utm_zone(lon)
+                zones = { zone, zone % 60 + 1, (zone - 2) % 60 + 1 }
+                for candidate_zone in zones:
+                    easting, northing = to_utm(lon, lat, candidate_zone)
+                    column, row = int(easting // 100000), int(northing // 100000)
+                    for delta_column in (-1, 0, 1):
+                        for delta_row in (-1, 0, 1):
+                            candidates.add((candidate_zone, column + delta_column, row + delta_row, lat < 0))
+
+            _, min_lat, _, max_lat = get_bbox(ring)
+            for zone, column, row, south in candidates:
+                square = get_mgrs_square(zone, column, row)
+                if square is None:
+                    continue
+
+                footprint = get_sentinel2_footprint(zone, column, row, south)
+                footprint_min_lon, footprint_min_lat, footprint_max_lon, footprint_max_lat = get_bbox(footprint)
+                west = (zone - 1) * 6 - 180
+                if footprint_max_lon <= west or footprint_min_lon >= west + 6 or not intersects(ring, footprint):
+                    continue
+
+                low, high = max(min_lat, footprint_min_lat, -80), min(max_lat, footprint_max_lat, 84)
+                for band in { get_latitude_band(low), get_latitude_band(high) }:
+                    tiles.add(f"{zone:02d}{band}{square}")
+
+        return sorted(tiles)
+
+
+class FootprintIndex(TileIndex):
+    """
+    Grid-bucketed spatial index over explicit tile footprints.
+
+    Used for tiling systems that cannot be computed, such as the Landsat
+    WRS-2 path/row grid, whose footprints are distributed by USGS.
+
+    Parameters
+    ----------
+    footprints : Dict[str, List[Polygon]]
+        Dictionary mapping each tile identifier to its footprint rings
+    cell_size : float
+        Size in degrees of the grid cells used to bucket the footprints
+
+    Notes
+    -----
+    Each footprint is registered in every grid cell its bounding box touches,
+    so a query only runs exact intersections against the footprints sharing
+    a cell with the AOI.
+
+    Examples
+    --------
+    >>> index = FootprintIndex.from_file('wrs2_descending.geojson', id_property = 'WRSPR', id_width = 6)
+    >>> index.resolve('POINT(-3.7 40.4)')
+    ['201032', '201033']
+    """
+    def __init__(self, footprints : Dict[str, List[Polygon]], cell_size : float = 1.0) -> None:
+        self.footprints = footprints
+        self.cell_size = cell_size
+        self.cells : Dict[Tuple[int, int], List[str]] = {}
+
+        for tile, rings in footprints.items():
+            for ring in rings:
+                for cell in self.__get_cells(ring):
+                    self.cells.setdefault(cell, []).append(tile)
+
+    def __get_cells(self, ring : Polygon) -> List[Tuple[int, int]]:
+        """
+        Get the grid cells touched by the bounding box of a ring.
+        """
+        min_lon, min_lat, max_lon, max_lat = get_bbox(ring)
+        return [ (x, y) for x in range(int(min_lon // self.cell_size), int(max_lon // self.cell_size) + 1)
+                        for y in range(int(min_lat // self.cell_size), int(max_lat // self.cell_size) + 1) ]
+
+    @classmethod
+    def from_file(cls, path : str, id_property : str = 'tile_id', id_width : int = 0,
+                  cell_size : float = 1.0) -> 'FootprintIndex':
+        """
+        Load tile footprints from a GeoJSON or CSV file.
+
+        Parameters
+        ----------
+        path : str
+            GeoJSON FeatureCollection, or CSV file with the identifier column and a ``wkt`` column
+        id_property : str
+            Feature property (or CSV column) holding the tile identifier
+        id_width : int
+            Zero-padding applied to the identifiers (e.g. 6 for WRS-2 ``PPPRRR`` ids)
+        cell_size : float
+            Size in degrees of the grid cells used to bucket the footprints
+
+        Returns
+        -------
+        FootprintIndex
+            The populated index
+        """
+        footprints : Dict[str, List[Polygon]] = {}
+
+        with open(path, newline = '') as file:
+            if path.lower().endswith('.csv'):
+                for row in csv.DictReader(file):
+                    footprints.setdefault(str(row[id_property]).zfill(id_width), []).extend(parse_wkt(row['wkt']))
+            else:
+                for feature in json.load(file)['features']:
+                    geometry = feature['geometry']
+                    polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [ geometry['coordinates'] ]
+                    rings = [ [ (point[0], point[1]) for point in polygon[0] ] for polygon in polygons ]
+                    footprints.setdefault(str(feature['properties'][id_property]).zfill(id_width), []).extend(rings)
+
+        return cls(footprints, cell_size)
+
+    def resolve(self, geometry : str) -> List[str]:
+        tiles = set()
+
+        for ring in parse_wkt(geometry):
+            candidates = { tile for cell in self.__get_cells(ring) for tile in self.cells.get(cell, []) }
+            tiles.update(tile for tile in candidates if any(intersects(ring, footprint) for footprint in self.footprints[tile]))
+
+        return sorted(tiles)
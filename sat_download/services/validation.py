@@ -0,0 +1,80 @@
+import os
+import tarfile
+import zipfile
+
+from fnmatch import fnmatch
+from typing import List
+
+
+def _check_structure(path : str, members : List[str]) -> str | None:
+    """
+    Check that an archive holds the metadata file expected for its product type.
+    """
+    name = os.path.basename(path).upper()
+    if not members:
+        return "the archive is empty"
+    if '.SAFE' in name or any('.SAFE/' in member for member in members):
+        if not any(member.endswith('manifest.safe') for member in members):
+            return "the SAFE product has no manifest.safe"
+    if '.SEN3' in name or any('.SEN3/' in member for member in members):
+        if not any(member.endswith('xfdumanifest.xml') for member in members):
+            return "the SEN3 product has no xfdumanifest.xml"
+    if name.startswith(('LC08', 'LC09', 'LO08', 'LT08')):
+        if not any(fnmatch(member, '*_MTL.txt') or fnmatch(member, '*_MTL.xml') for member in members):
+            return "the Landsat product has no MTL metadata file"
+    return None
+
+
+def validate_archive(path : str) -> str | None:
+    """
+    Check the integrity of a downloaded product archive.
+
+    Parameters
+    ----------
+    path : str
+        Path of the downloaded product
+
+    Returns
+    -------
+    str | None
+        Description of the first problem found, or None if the product is valid
+
+    Notes
+    -----
+    Zip archives are fully decompressed to check the CRC of every member and tar
+    archives are read to the end to detect truncation. Both must hold the
+    metadata file of their product type (``manifest.safe`` for Sentinel-2 SAFE
+    products, ``xfdumanifest.xml`` for Sentinel-3 SEN3 products and the MTL
+    file for Landsat products). Other files only need to be non empty.
+    The function is CPU-bound and picklable, meant to run in a process pool.
+    """
+    MB = (1024 * 1024)
+
+    try:
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return "the file is missing or empty"
+
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                corrupt = archive.testzip()
+                if corrupt is not None:
+                    return f"bad CRC in {corrupt}"
+                return _check_structure(path, archive.namelist())
+
+        if tarfile.is_tarfile(path):
+            members = []
+            with tarfile.open(path) as archive:
+                for member in archive:
+                    members.append(member.name)
+                    if member.isfile():
+                        stream = archive.extractfile(member)
+                        while stream.read(MB):
+                            pass
+            return _check_structure(path, members)
+
+        if path.lower().endswith(('.zip', '.tar', '.tar.gz', '.tgz')):
+            return "the file is not a readable archive"
+
+        return None
+    except Exception as exc:
+        return f"the archive is corrupt: {exc}"
@@ -0,0 +1,321 @@
+import io
+import os
+
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable, Dict
+
+
+class Sink(ABC):
+    """
+    Abstract destination of the bytes of a download.
+
+    A download opens the sink once per product with its output name, writes
+    the response chunks as they arrive and closes it, so products flow from
+    the network to their destination without a local staging copy.
+
+    Streams are used as context managers: a clean exit (or ``close``) commits
+    the product, while an exception raised inside the ``with`` block aborts it,
+    so sinks that can undo a write never expose a truncated product.
+
+    See Also
+    --------
+    sat_download.api.base.SatelliteAPI.download : Method writing into a sink
+    """
+    @abstractmethod
+    def open(self, outname : str) -> BinaryIO:
+        """
+        Open a writable binary stream for a product.
+
+        Parameters
+        ----------
+        outname : str
+            The output name of the product
+
+        Returns
+        -------
+        BinaryIO
+            Stream receiving the product bytes; it is closed by the caller,
+            or aborted if it was used as a context manager that raised
+        """
+        pass
+
+    def locate(self, outname : str) -> str:
+        """
+        Get the location reported for a written product.
+
+        Parameters
+        ----------
+        outname : str
+            The output name of the product
+
+        Returns
+        -------
+        str
+            The location returned by ``download``
+        """
+        return outname
+
+
+class _Transactional:
+    """
+    Mixin for streams committed by ``close`` and discarded by ``abort``, which
+    is called instead when the ``with`` block using the stream raises. A stream
+    garbage collected without being closed is discarded as well.
+    """
+    def abort(self) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if not self.closed:
+            self.abort()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _PartialFile(_Transactional, io.FileIO):
+    """
+    Local file written to ``<outname>.part`` and renamed to ``outname`` once committed.
+    """
+    def __init__(self, outname : str) -> None:
+        super().__init__(f"{outname}.part", 'wb')
+        self.outname = outname
+
+    def close(self) -> None:
+        if not self.closed:
+            super().close()
+            os.replace(self.name, self.outname)
+
+    def abort(self) -> None:
+        if not self.closed:
+            io.FileIO.close(self)
+            os.remove(self.name)
+
+
+class FileSink(Sink):
+    """
+    Sink writing each product to a local file, creating its directory if needed.
+
+    Notes
+    -----
+    Products are written to ``<outname>.part`` and renamed once complete, so a
+    failed transfer never leaves a truncated file at ``outname``.
+    """
+    def open(self, outname : str) -> BinaryIO:
+        directory = os.path.dirname(outname)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        return _PartialFile(outname)
+
+
+class _MemoryFile(_Transactional, io.BytesIO):
+    """
+    In-memory buffer handing its content to a MemorySink when committed.
+    """
+    def __init__(self, sink : 'MemorySink', outname : str) -> None:
+        super().__init__()
+        self.sink = sink
+        self.outname = outname
+
+    def close(self) -> None:
+        if not self.closed:
+            self.sink.buffers[self.outname] = self.getvalue()
+        super().close()
+
+    def abort(self) -> None:
+        io.BytesIO.close(self)
+
+
+class MemorySink(Sink):
+    """
+    Sink keeping each product in memory.
+
+    Attributes
+    ----------
+    buffers : Dict[str, bytes]
+        Dictionary mapping output names to the bytes of the downloaded products
+
+    Examples
+    --------
+    >>> sink = MemorySink()
+    >>> api.download(image_id, 'product.zip', 0, sink)
+    >>> content = sink.buffers['product.zip']
+    """
+    def __init__(self) -> None:
+        self.buffers : Dict[str, bytes] = {}
+
+    def open(self, outname : str) -> BinaryIO:
+        return _MemoryFile(self, outname)
+
+
+class _CallbackFile(io.RawIOBase):
+    """
+    Write-only stream forwarding every chunk to a callback; chunks already
+    forwarded cannot be taken back, so an aborted product is simply cut short.
+    """
+    def __init__(self, callback : Callable[[str, bytes], None], outname : str) -> None:
+        super().__init__()
+        self.callback = callback
+        self.outname = outname
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, chunk : bytes) -> int:
+        self.callback(self.outname, bytes(chunk))
+        return len(chunk)
+
+
+class CallbackSink(Sink):
+    """
+    Sink streaming every chunk of a product to a callback.
+
+    Parameters
+    ----------
+    callback : Callable[[str, bytes], None]
+        Function called with the output name and each chunk, in order
+
+    Examples
+    --------
+    >>> digests = {}
+    >>> sink = CallbackSink(lambda name, chunk: digests.setdefault(name, hashlib.sha256()).update(chunk))
+    """
+    def __init__(self, callback : Callable[[str, bytes], None]) -> None:
+        self.callback = callback
+
+    def open(self, outname : str) -> BinaryIO:
+        return _CallbackFile(self.callback, outname)
+
+
+class _PipeFile(io.RawIOBase):
+    """
+    Write-only stream forwarding chunks to a shared stream without closing it;
+    like callbacks, a pipe cannot take back the bytes of an aborted product.
+    """
+    def __init__(self, stream : BinaryIO) -> None:
+        super().__init__()
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, chunk : bytes) -> int:
+        self.stream.write(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.stream.flush()
+        super().close()
+
+
+class PipeSink(Sink):
+    """
+    Sink streaming products into an already open binary stream, such as the
+    standard input of a processing subprocess.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        The destination stream; it is flushed after every product but never closed
+
+    Notes
+    -----
+    Products are written back to back, so concurrent downloads into the same
+    pipe would interleave their bytes; use a single worker.
+
+    Examples
+    --------
+    >>> process = subprocess.Popen(['unzip', '-'], stdin = subprocess.PIPE)
+    >>> api.download(image_id, 'product.zip', 0, PipeSink(process.stdin))
+    """
+    def __init__(self, stream : BinaryIO) -> None:
+        self.stream = stream
+
+    def open(self, outname : str) -> BinaryIO:
+        return _PipeFile(self.stream)
+
+
+class _FSSpecFile(_Transactional, io.RawIOBase):
+    """
+    Write-only stream uploading to a staging path of an fsspec filesystem,
+    moved to its final path once committed and removed when aborted.
+    """
+    def __init__(self, filesystem, path : str) -> None:
+        super().__init__()
+        self.filesystem = filesystem
+        self.path = path
+        self.staging = f"{path}.part"
+        self.file = filesystem.open(self.staging, 'wb')
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, chunk : bytes) -> int:
+        return self.file.write(chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.file.close()
+            self.filesystem.mv(self.staging, self.path)
+        super().close()
+
+    def abort(self) -> None:
+        if not self.closed:
+            self.file.close()
+            self.filesystem.rm(self.staging)
+        io.RawIOBase.close(self)
+
+
+class FSSpecSink(Sink):
+    """
+    Sink writing products to an fsspec filesystem (S3, GCS, Azure, memory...).
+
+    Parameters
+    ----------
+    filesystem : fsspec.AbstractFileSystem | str
+        A filesystem instance or a protocol name (e.g. ``'s3'``, ``'memory'``)
+    root : str
+        Prefix prepended to every output name
+    **options
+        Options used to create the filesystem when a protocol name is given
+
+    Raises
+    ------
+    Exception
+        If a protocol name is given and ``fsspec`` is not installed
+
+    Notes
+    -----
+    Products are uploaded to ``<path>.part`` and moved to their path once
+    complete, so readers never see a partial object. On object stores the move
+    is a server-side copy.
+
+    Examples
+    --------
+    >>> sink = FSSpecSink('s3', root = 'bucket/sentinel-2', anon = False)
+    >>> downloader.bulk_download(results, '', sink = sink)
+    """
+    def __init__(self, filesystem, root : str = '', **options) -> None:
+        if isinstance(filesystem, str):
+            try:
+                import fsspec
+            except ImportError:
+                raise Exception("fsspec is required to write to remote filesystems: pip install fsspec")
+            filesystem = fsspec.filesystem(filesystem, **options)
+
+        self.filesystem = filesystem
+        self.root = root.rstrip('/')
+
+    def locate(self, outname : str) -> str:
+        outname = outname.replace(os.sep, '/').lstrip('/')
+        return f"{self.root}/{outname}" if self.root else outname
+
+    def open(self, outname : str) -> BinaryIO:
+        path = self.locate(outname)
+        if '/' in path:
+            self.filesystem.makedirs(path.rsplit('/', 1)[0], exist_ok = True)
+        return _FSSpecFile(self.filesystem, path)
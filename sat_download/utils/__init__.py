@@ -0,0 +1,6 @@
+from sat_download.utils.decoding import iter_items, loads
+from sat_download.utils.locking import FileLock
+from sat_download.utils.http import LatencyTracker, StallError, hedged_get
+from sat_download.utils.profiling import Profiler, profile, profile_iter
+
+__all__ = ['loads', 'iter_items', 'FileLock', 'LatencyTracker', 'StallError', 'hedged_get', 'Profiler', 'profile', 'profile_iter']
\ No newline at end of file
@@ -0,0 +1,68 @@
+import json
+
+from typing import Any, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def loads(content : bytes | str) -> Any:
+    """
+    Decode a JSON document straight from the response bytes.
+
+    Parameters
+    ----------
+    content : bytes | str
+        The raw JSON document
+
+    Returns
+    -------
+    Any
+        The decoded document
+
+    Notes
+    -----
+    Uses ``orjson`` when it is installed and falls back to the standard
+    ``json`` module otherwise. Both accept bytes, so the response body is
+    never materialized as text first.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def iter_items(response : Any, key : str) -> Iterator[Any]:
+    """
+    Iterate over the items of a top-level array of a JSON response.
+
+    Parameters
+    ----------
+    response : requests.Response
+        The response, ideally requested with ``stream = True``
+    key : str
+        Name of the top-level array to iterate (e.g. 'value')
+
+    Yields
+    ------
+    Any
+        Each decoded item of the array
+
+    Notes
+    -----
+    When ``ijson`` is installed the array is parsed incrementally from the
+    raw stream, so a large page never needs to be fully decoded in memory.
+    Otherwise the whole body is decoded with ``loads``.
+    """
+    if ijson is not None:
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, f"{key}.item", use_float = True)
+    else:
+        items : Iterable[Any] = loads(response.content)[key]
+        yield from items
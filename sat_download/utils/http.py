@@ -0,0 +1,155 @@
+import time
+import threading
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    import requests
+
+
+class StallError(Exception):
+    """
+    Raised when a transfer stays below the minimum throughput.
+    """
+    pass
+
+
+class LatencyTracker:
+    """
+    Rolling record of request latencies used to decide when to hedge.
+
+    Parameters
+    ----------
+    size : int
+        Number of recent latencies kept
+    percentile : float
+        Percentile of the recorded latencies used as hedging delay
+    default : float
+        Delay used until enough latencies are recorded
+
+    Examples
+    --------
+    >>> tracker = LatencyTracker()
+    >>> tracker.record(0.4)
+    >>> tracker.get_delay()
+    2.0
+    """
+    def __init__(self, size : int = 100, percentile : float = 0.95, default : float = 2.0) -> None:
+        self.latencies = deque(maxlen = size)
+        self.percentile = percentile
+        self.default = default
+        self.lock = threading.Lock()
+
+    def record(self, seconds : float) -> None:
+        """
+        Record the latency of a completed request.
+
+        Parameters
+        ----------
+        seconds : float
+            Seconds until the response headers arrived
+        """
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def get_delay(self) -> float:
+        """
+        Get the delay after which a duplicate request is fired.
+
+        Returns
+        -------
+        float
+            The configured percentile of the recorded latencies, or ``default``
+            while fewer than 20 latencies are recorded
+        """
+        with self.lock:
+            if len(self.latencies) < 20:
+                return self.default
+            latencies = sorted(self.latencies)
+
+        return latencies[min(int(len(latencies) * self.percentile), len(latencies) - 1)]
+
+
+def _close_response(future : Future) -> None:
+    """
+    Release the connection of a request that lost the race or was abandoned.
+    """
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged_get(urls : List[str], tracker : LatencyTracker, hedges : int = 1, **kwargs) -> 'requests.Response':
+    """
+    Send an idempotent GET request, duplicating it when it is slower than usual.
+
+    Parameters
+    ----------
+    urls : List[str]
+        Equivalent endpoints; the first one is used first and each duplicate
+        goes to the next one, cycling through the list
+    tracker : LatencyTracker
+        Latency record deciding the hedging delay; it is updated with every response
+    hedges : int
+        Maximum number of duplicate requests
+    **kwargs
+        Arguments of ``requests.get``
+
+    Returns
+    -------
+    requests.Response
+        The first successful response. If every request fails, the last
+        response received, or the first error raised if none was received.
+
+    Notes
+    -----
+    Responses with a 5xx status count as failures, so a duplicate sent to an
+    alternate endpoint can still win. Every response that is not returned is
+    closed: failures and losers already received right away, requests still
+    in flight as soon as they arrive.
+    """
+    import requests
+
+    def timed_get(url : str) -> 'requests.Response':
+        start = time.monotonic()
+        response = requests.get(url, **kwargs)
+        tracker.record(time.monotonic() - start)
+        return response
+
+    executor = ThreadPoolExecutor(max_workers = hedges + 1)
+    pending = { executor.submit(timed_get, urls[0]) }
+    sent = 1
+    responses : List['requests.Response'] = []
+    winner, error = None, None
+
+    try:
+        while pending and winner is None:
+            done, pending = wait(pending, timeout = tracker.get_delay() if sent <= hedges else None,
+                                 return_when = FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+
+                responses.append(future.result())
+                if winner is None and future.result().status_code < 500:
+                    winner = future.result()
+
+            if winner is None and sent <= hedges and (not done or not pending):
+                pending.add(executor.submit(timed_get, urls[sent % len(urls)]))
+                sent += 1
+    finally:
+        for future in pending:
+            future.add_done_callback(_close_response)
+        executor.shutdown(wait = False)
+
+    result = winner if winner is not None else (responses[-1] if responses else None)
+    for response in responses:
+        if response is not result:
+            response.close()
+
+    if result is not None:
+        return result
+    raise error
@@ -0,0 +1,112 @@
+import os
+import time
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Inter-process lock held through an operating system lock on a lock file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the lock file
+    timeout : float
+        Seconds to wait for the lock before giving up
+
+    Raises
+    ------
+    TimeoutError
+        If the lock cannot be acquired within ``timeout`` seconds
+
+    Notes
+    -----
+    The lock is taken with ``fcntl.flock`` (``msvcrt.locking`` on Windows) on
+    a lock file that is never removed, so acquiring it is atomic and the
+    operating system releases it when its holder dies: there are no stale
+    locks to detect and no clock to compare across hosts. Since some
+    filesystems (e.g. NFS) only lock per process, threads of the same process
+    are also serialized through an in-process lock per path.
+
+    Examples
+    --------
+    >>> with FileLock('token.json.lock'):
+    ...     update_token_file()
+    """
+    _thread_locks : dict = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path : str, timeout : float = 30) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.fd : int | None = None
+
+        with self._registry_lock:
+            self.thread_lock = self._thread_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+    def __try_lock(self, fd : int) -> bool:
+        """
+        Try to take the operating system lock without blocking.
+        """
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self) -> None:
+        """
+        Block until the lock is acquired.
+        """
+        deadline = time.monotonic() + self.timeout
+        if not self.thread_lock.acquire(timeout = max(self.timeout, 0)):
+            raise TimeoutError(f"Could not acquire lock {self.path}")
+
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+        except OSError:
+            self.thread_lock.release()
+            raise
+
+        while not self.__try_lock(fd):
+            if time.monotonic() > deadline:
+                os.close(fd)
+                self.thread_lock.release()
+                raise TimeoutError(f"Could not acquire lock {self.path}")
+            time.sleep(0.05)
+
+        self.fd = fd
+
+    def release(self) -> None:
+        """
+        Release the lock.
+        """
+        if self.fd is None:
+            return
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+            self.thread_lock.release()
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
@@ -0,0 +1,376 @@
+import json
+import time
+import threading
+import tracemalloc
+
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import ContextManager, Dict, Iterable, Iterator, List
+
+
+@dataclass
+class StageStats:
+    """
+    Aggregated measurements of every run of a stage at the same call path.
+
+    Attributes
+    ----------
+    count : int
+        Number of runs
+    wall : float
+        Wall-clock seconds, children included
+    cpu : float
+        CPU seconds of the running thread, children included
+    allocated : int
+        Net bytes allocated while running (0 if tracemalloc is off)
+    children : float
+        Wall-clock seconds spent in nested stages
+    """
+    count : int = 0
+    wall : float = 0.0
+    cpu : float = 0.0
+    allocated : int = 0
+    children : float = 0.0
+
+
+@dataclass
+class ProfileRecord:
+    """
+    Measurements of a single search page or download.
+
+    Attributes
+    ----------
+    name : str
+        The stage name (``search`` or ``download``)
+    label : str
+        What was processed, e.g. the date window or the product file name
+    wall : float
+        Wall-clock seconds
+    cpu : float
+        CPU seconds of the running thread
+    allocated : int
+        Net bytes allocated while running (0 if tracemalloc is off)
+    stages : Dict[str, float]
+        Wall-clock seconds of each nested stage, keyed by its path below the record
+    """
+    name : str
+    label : str
+    wall : float
+    cpu : float
+    allocated : int
+    stages : Dict[str, float] = field(default_factory = dict)
+
+
+class Profiler:
+    """
+    Opt-in recorder of wall time, CPU time and allocations of the search and download hot paths.
+
+    Parameters
+    ----------
+    memory : bool
+        Whether to trace allocations with ``tracemalloc`` while started
+    top : int
+        Number of allocation sites listed in the report, those that grew the most during the run
+
+    Notes
+    -----
+    Stages nest per thread, so concurrent searches and downloads keep separate
+    call paths such as ``download;network``. The gap between wall and CPU time
+    of a stage is time spent waiting, mostly on the network or the disk.
+    Allocations come from the process-wide ``tracemalloc`` counters, so with
+    concurrent work they include the allocations of other threads. The top
+    allocation sites compare a snapshot taken at ``stop`` with one taken at
+    ``start``, so they list the memory each site gained during the run, not
+    everything still alive in the process.
+
+    Examples
+    --------
+    >>> profiler = Profiler()
+    >>> downloader = SatelliteImageDownloader(api, profiler = profiler)
+    >>> with profiler:
+    ...     downloader.bulk_download(downloader.bulk_search(filters), 'products')
+    >>> print(profiler.report())
+    >>> profiler.write_collapsed('profile.folded')  # flamegraph.pl profile.folded > profile.svg
+    """
+    def __init__(self, memory : bool = True, top : int = 10) -> None:
+        self.memory = memory
+        self.top = top
+        self.stats : Dict[str, StageStats] = {}
+        self.records : List[ProfileRecord] = []
+        self.allocations : List[dict] = []
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started : tuple | None = None
+        self.tracing = False
+        self.baseline : tracemalloc.Snapshot | None = None
+
+    def start(self) -> 'Profiler':
+        """
+        Start measuring the totals and, if enabled, tracing allocations.
+
+        Returns
+        -------
+        Profiler
+            The profiler itself
+        """
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing = True
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.baseline = self.__snapshot()
+        self.started = (time.perf_counter(), time.process_time())
+        return self
+
+    def __snapshot(self) -> tracemalloc.Snapshot:
+        """
+        Take a snapshot of the traced memory, leaving out the profiler itself.
+        """
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def stop(self) -> None:
+        """
+        Stop measuring and collect the allocation sites that grew the most since ``start``.
+        """
+        if self.started is not None:
+            self.wall += time.perf_counter() - self.started[0]
+            self.cpu += time.process_time() - self.started[1]
+            self.started = None
+
+        if tracemalloc.is_tracing():
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if self.baseline is not None:
+                statistics = sorted(self.__snapshot().compare_to(self.baseline, 'lineno'),
+                                    key = lambda stat: stat.size_diff, reverse = True)
+                self.allocations = [ {'site' : f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                                      'size_diff' : stat.size_diff, 'count_diff' : stat.count_diff}
+                                     for stat in statistics[:self.top] if stat.size_diff > 0 ]
+        self.baseline = None
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def __enter__(self) -> 'Profiler':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @contextmanager
+    def stage(self, name : str, label : str | None = None) -> Iterator[None]:
+        """
+        Measure a stage of work.
+
+        Parameters
+        ----------
+        name : str
+            The stage name; it is appended to the call path of the enclosing stages
+        label : str | None
+            What the stage processes. Labelled stages are kept as individual
+            records with the breakdown of their nested stages.
+        """
+        stack = self.local.__dict__.setdefault('stack', [])
+        path = f"{stack[-1]['path']};{name}" if stack else name
+        frame = {'path' : path, 'label' : label, 'children' : 0.0, 'stages' : {}}
+        stack.append(frame)
+
+        allocated = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        cpu, wall = time.thread_time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            allocated = tracemalloc.get_traced_memory()[0] - allocated if tracemalloc.is_tracing() else 0
+            stack.pop()
+
+            if stack:
+                stack[-1]['children'] += wall
+            for parent in stack:
+                if parent['label'] is not None:
+                    key = path[len(parent['path']) + 1:]
+                    parent['stages'][key] = parent['stages'].get(key, 0.0) + wall
+
+            with self.lock:
+                stats = self.stats.setdefault(path, StageStats())
+                stats.count += 1
+                stats.wall += wall
+                stats.cpu += cpu
+                stats.allocated += allocated
+                stats.children += frame['children']
+                if label is not None:
+                    self.records.append(ProfileRecord(name, label, wall, cpu, allocated, frame['stages']))
+
+    def iterate(self, iterable : Iterable, name : str) -> Iterator:
+        """
+        Measure the time spent producing each item of an iterable.
+
+        Parameters
+        ----------
+        iterable : Iterable
+            A lazy iterable, e.g. a streamed response or incremental decoder
+        name : str
+            The stage name of each ``next`` call
+
+        Returns
+        -------
+        Iterator
+            The items of the iterable
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def to_dict(self) -> dict:
+        """
+        Get the measurements as a JSON serializable dictionary.
+
+        Returns
+        -------
+        dict
+            Totals, per stage aggregates, per search page and download records
+            and the allocation sites that grew the most during the run
+        """
+        with self.lock:
+            return {
+                'wall' : self.wall, 'cpu' : self.cpu, 'peak_memory' : self.peak,
+                'stages' : { path : asdict(stats) for path, stats in self.stats.items() },
+                'records' : [ asdict(record) for record in self.records ],
+                'allocations' : list(self.allocations),
+            }
+
+    def report(self, records : int = 10) -> str:
+        """
+        Format the measurements as a text report.
+
+        Parameters
+        ----------
+        records : int
+            Number of slowest search pages and downloads listed
+
+        Returns
+        -------
+        str
+            The report
+        """
+        MB = (1024 * 1024)
+        profile = self.to_dict()
+
+        lines = [ f"Profile: {profile['wall']:.2f} s wall, {profile['cpu']:.2f} s CPU, "
+                  f"{profile['peak_memory'] / MB:.1f} MB peak traced memory", "",
+                  f"{'stage':<40} {'calls':>8} {'wall s':>10} {'self s':>10} {'cpu s':>10} {'wait s':>10} {'alloc MB':>10}" ]
+        for path, stats in sorted(profile['stages'].items()):
+            lines.append(f"{path:<40} {stats['count']:>8} {stats['wall']:>10.3f} {stats['wall'] - stats['children']:>10.3f} "
+                         f"{stats['cpu']:>10.3f} {max(stats['wall'] - stats['cpu'], 0):>10.3f} {stats['allocated'] / MB:>10.2f}")
+
+        slowest = sorted(profile['records'], key = lambda record: record['wall'], reverse = True)[:records]
+        if slowest:
+            lines += [ "", "Slowest search pages and downloads" ]
+            for record in slowest:
+                stages = ', '.join(f"{key} {seconds:.2f} s" for key, seconds in record['stages'].items())
+                lines.append(f"  {record['name']} {record['label']}: {record['wall']:.2f} s wall, "
+                             f"{record['cpu']:.2f} s CPU ({stages})")
+
+        if profile['allocations']:
+            lines += [ "", "Top allocation sites (growth since start)" ]
+            for allocation in profile['allocations']:
+                lines.append(f"  {allocation['site']}: {allocation['size_diff'] / MB:+.2f} MB in {allocation['count_diff']:+d} blocks")
+
+        return '\n'.join(lines)
+
+    def write_report(self, path : str) -> str:
+        """
+        Write the measurements as JSON, e.g. to attach them to a performance ticket.
+
+        Parameters
+        ----------
+        path : str
+            The output path
+
+        Returns
+        -------
+        str
+            The output path
+        """
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent = 2)
+        return path
+
+    def write_collapsed(self, path : str) -> str:
+        """
+        Write the self wall time of each call path in the collapsed stack format.
+
+        Parameters
+        ----------
+        path : str
+            The output path
+
+        Returns
+        -------
+        str
+            The output path
+
+        Notes
+        -----
+        Each line holds a ``;`` separated call path and its self time in
+        microseconds, the input format of ``flamegraph.pl``, speedscope and
+        similar flame graph tools.
+        """
+        with self.lock:
+            lines = [ f"{stage} {max(round((stats.wall - stats.children) * 1e6), 0)}" for stage, stats in self.stats.items() ]
+
+        with open(path, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        return path
+
+
+def profile(profiler : Profiler | None, name : str, label : str | None = None) -> ContextManager:
+    """
+    Measure a stage when profiling is enabled.
+
+    Parameters
+    ----------
+    profiler : Profiler | None
+        The profiler, or None when profiling is disabled
+    name : str
+        The stage name
+    label : str | None
+        What the stage processes; see ``Profiler.stage``
+
+    Returns
+    -------
+    ContextManager
+        The stage context, or a no-op context if ``profiler`` is None
+    """
+    return profiler.stage(name, label) if profiler is not None else nullcontext()
+
+
+def profile_iter(profiler : Profiler | None, iterable : Iterable, name : str) -> Iterable:
+    """
+    Measure the production of each item of an iterable when profiling is enabled.
+
+    Parameters
+    ----------
+    profiler : Profiler | None
+        The profiler, or None when profiling is disabled
+    iterable : Iterable
+        The iterable to measure
+    name : str
+        The stage name
+
+    Returns
+    -------
+    Iterable
+        The measured iterable, or ``iterable`` itself if ``profiler`` is None
+    """
+    return profiler.iterate(iterable, name) if profiler is not None else iterable
@@ -5,6 +5,12 @@ requirements = [
     'requests',
 ]
 
+extras = {
+    'fast': ['orjson', 'ijson'],
+    'fsspec': ['fsspec'],
+    'test': ['pytest', 'fsspec'],
+}
+
 setup(
     name="sat_download",
     version="1.0.0",
@@ -21,4 +27,8 @@ setup(
     ],
     python_requires=">=3.11",
     install_requires=requirements,
+    extras_require=extras,
+    entry_points={
+        'console_scripts': ['sat-download=sat_download.cli:main'],
+    },
 )
\ No newline at end of file
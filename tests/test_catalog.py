@@ -0,0 +1,82 @@
+import pytest
+
+from sat_download.api.catalog import CatalogAPI
+from sat_download.data_types import SatelliteImage, SearchFilters
+
+
+def make_image(name : str, day : str) -> SatelliteImage:
+    return SatelliteImage(uuid = name, date = day.replace('-', ''), sensor = 'Sentinel-2', brother = 'A',
+                          identifier = 'Sentinel-2A', filename = f"{name}.zip", tile = '30TVK')
+
+
+class StubLive:
+    """
+    Live API whose ``bulk_search`` stops at a given day, as a truncated paging would.
+    """
+    username = password = None
+
+    def __init__(self, products : dict, page_size : int | None, oldest_fetched : str = '0000-00-00') -> None:
+        self.products = products
+        self.SEARCH_PAGE_SIZE = page_size
+        self.oldest_fetched = oldest_fetched
+        self.searches = []
+
+    def __window(self, filters : SearchFilters) -> dict:
+        return { name : image for name, image in self.products.items()
+                 if filters.start_date.replace('-', '') <= image.date <= filters.end_date.replace('-', '') }
+
+    def search(self, filters : SearchFilters) -> dict:
+        self.searches.append((filters.start_date, filters.end_date))
+        newest = sorted(self.__window(filters).items(), key = lambda item: item[1].date, reverse = True)
+        return dict(newest[:self.SEARCH_PAGE_SIZE or 2])
+
+    def bulk_search(self, filters : SearchFilters) -> dict:
+        return { name : image for name, image in self.__window(filters).items()
+                 if image.date >= self.oldest_fetched.replace('-', '') }
+
+
+FILTERS = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+
+def test_gaps_skip_covered_ranges(tmp_path):
+    catalog = CatalogAPI(str(tmp_path / 'catalog.db'), stable_days = 0)
+
+    catalog.ingest(SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-05', end_date = '2024-01-10'), {})
+    catalog.ingest(SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-08', end_date = '2024-01-20'), {})
+    catalog.ingest(SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-25', end_date = '2024-01-25'), {})
+
+    assert catalog.get_gaps(FILTERS) == [ ('2024-01-01', '2024-01-04'), ('2024-01-21', '2024-01-24'),
+                                          ('2024-01-26', '2024-01-31') ]
+    assert catalog.get_gaps(SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31',
+                                          tile_id = '30TVK')) == [ ('2024-01-01', '2024-01-31') ]
+
+
+def test_complete_searches_cover_the_window(tmp_path):
+    products = { name : make_image(name, day) for name, day in [ ('a', '2024-01-10'), ('b', '2024-01-20') ] }
+    live = StubLive(products, page_size = 20)
+    catalog = CatalogAPI(str(tmp_path / 'catalog.db'), live, stable_days = 0)
+
+    assert sorted(catalog.search(FILTERS)) == [ 'a', 'b' ]
+    assert catalog.get_gaps(FILTERS) == []
+    assert live.searches == [ ('2024-01-10', '2024-01-10') ]
+
+
+@pytest.mark.parametrize('page_size', [ 2, None ])
+def test_truncated_searches_only_cover_fetched_days(tmp_path, page_size):
+    products = { name : make_image(name, day) for name, day in
+                 [ ('a', '2024-01-05'), ('b', '2024-01-10'), ('c', '2024-01-10'), ('d', '2024-01-20') ] }
+    catalog = CatalogAPI(str(tmp_path / 'catalog.db'), StubLive(products, page_size, '2024-01-10'), stable_days = 0)
+
+    assert sorted(catalog.search(FILTERS)) == [ 'b', 'c', 'd' ]
+    assert catalog.get_gaps(FILTERS) == [ ('2024-01-01', '2024-01-10') ]
+
+    catalog.live.oldest_fetched = '2024-01-01'
+    assert sorted(catalog.search(FILTERS)) == [ 'a', 'b', 'c', 'd' ]
+    assert catalog.get_gaps(FILTERS) == ([] if page_size else [ ('2024-01-05', '2024-01-05') ])
+
+
+def test_offline_catalog_answers_from_the_mirror(tmp_path):
+    catalog = CatalogAPI(str(tmp_path / 'catalog.db'), stable_days = 0)
+    catalog.ingest(FILTERS, {'a' : make_image('a', '2024-01-10'), 'b' : make_image('b', '2024-02-10')})
+
+    assert list(catalog.search(FILTERS)) == [ 'a' ]
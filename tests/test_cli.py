@@ -0,0 +1,61 @@
+import json
+import subprocess
+import sys
+import threading
+
+from sat_download import cli
+from sat_download.api.base import SatelliteAPI
+from sat_download.data_types import SatelliteImage
+from sat_download.sinks import FileSink
+
+
+class StubAPI(SatelliteAPI):
+    def __init__(self, downloaded : threading.Event) -> None:
+        super().__init__('user', 'password')
+        self.downloaded = downloaded
+
+    def search(self, filters):
+        return {}
+
+    def bulk_search(self, filters):
+        if filters.start_date == '2024-02-01':
+            self.downloaded.wait(5)
+            return {}
+        return {'a' : SatelliteImage(uuid = 'a', date = '20240101', sensor = 'Sentinel-2', brother = 'A',
+                                     identifier = 'Sentinel-2A', filename = 'a.zip', tile = '30TVK', size = 1)}
+
+    def download(self, image_id, outname, verbose, sink = None):
+        print(f"Downloaded {image_id}")
+        sink = sink or FileSink()
+        with sink.open(outname) as file:
+            file.write(image_id.encode())
+        return sink.locate(outname)
+
+
+def test_json_run_reports_downloads_while_searching(tmp_path, monkeypatch, capsys):
+    downloaded = threading.Event()
+
+    class Reporter(cli.Reporter):
+        def emit(self, event, message, **fields):
+            super().emit(event, message, **fields)
+            if event == 'download':
+                downloaded.set()
+
+    monkeypatch.setattr(cli, 'Reporter', Reporter)
+    monkeypatch.setattr(cli, 'get_api', lambda collection, spec, apis: StubAPI(downloaded))
+    spec = {'outdir' : str(tmp_path), 'jobs' : [ {'collection' : 'SENTINEL-2',
+                                                  'windows' : [ ('2024-01-01', '2024-02-01'), ('2024-02-01', '2024-03-01') ]} ]}
+
+    assert cli.run(spec, workers = 1, json_output = True) == 0
+
+    output = capsys.readouterr()
+    events = [ json.loads(line)['event'] for line in output.out.splitlines() ]
+    assert events == [ 'search', 'download', 'search', 'summary' ]
+    assert 'Downloaded a' in output.err
+
+
+def test_heavy_dependencies_are_imported_lazily():
+    code = ("import sys, sat_download.cli, sat_download.sinks; "
+            "print(sorted(name for name in ('requests', 'tqdm', 'fsspec') if name in sys.modules))")
+
+    assert subprocess.run([ sys.executable, '-c', code ], capture_output = True, text = True, check = True).stdout.strip() == '[]'
@@ -0,0 +1,41 @@
+import io
+import json
+
+import pytest
+
+from sat_download.utils import decoding
+
+
+PAGE = {'@odata.context' : '$metadata#Products', 'value' : [ {'Id' : 'a', 'ContentLength' : 1.5}, {'Id' : 'b'} ]}
+
+
+class StubResponse:
+    def __init__(self, document : dict) -> None:
+        self.content = json.dumps(document).encode()
+        self.raw = io.BytesIO(self.content)
+
+
+@pytest.mark.parametrize('fast', [ True, False ])
+def test_loads_decodes_bytes(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(decoding, 'orjson', None)
+
+    assert decoding.loads(json.dumps(PAGE).encode()) == PAGE
+    assert decoding.loads(json.dumps(PAGE)) == PAGE
+
+
+def test_iter_items_without_ijson(monkeypatch):
+    monkeypatch.setattr(decoding, 'ijson', None)
+
+    assert list(decoding.iter_items(StubResponse(PAGE), 'value')) == PAGE['value']
+
+
+def test_iter_items_streams_with_ijson(monkeypatch):
+    monkeypatch.setattr(decoding, 'ijson', pytest.importorskip('ijson'))
+    response = StubResponse(PAGE)
+    response.content = None
+
+    items = decoding.iter_items(response, 'value')
+
+    assert next(items) == PAGE['value'][0]
+    assert list(items) == PAGE['value'][1:]
@@ -0,0 +1,52 @@
+import pytest
+
+from sat_download.enums import COLLECTIONS, DEDUP_POLICIES
+from sat_download.factories.search import get_satellite_image
+from sat_download.services.dedup import deduplicate
+
+
+def s2(sensing : str, baseline : str, generated : str, orbit : str = 'R051', level : str = 'MSIL2A',
+       tile : str = 'T30TVK', published : str | None = None):
+    name = f"S2A_{level}_{sensing}_{baseline}_{orbit}_{tile}_{generated}.SAFE"
+    return get_satellite_image(COLLECTIONS.SENTINEL_2, {'Name' : name, 'PublicationDate' : published})
+
+
+VARIANTS = {
+    'old' : s2('20240101T105441', 'N0509', '20240101T124502'),
+    'reprocessed' : s2('20240101T105441', 'N0510', '20240301T090000'),
+    'regenerated' : s2('20240101T105441', 'N0509', '20240401T090000'),
+}
+
+
+def test_only_reprocessings_of_an_acquisition_collapse():
+    images = {
+        **VARIANTS,
+        'other_pass' : s2('20240101T115441', 'N0509', '20240101T134502', orbit = 'R052'),
+        'other_level' : s2('20240101T105441', 'N0509', '20240101T124502', level = 'MSIL1C'),
+        'other_tile' : s2('20240101T105441', 'N0509', '20240101T124502', tile = 'T30TWK'),
+    }
+
+    assert list(deduplicate(images)) == [ 'regenerated', 'other_pass', 'other_level', 'other_tile' ]
+
+
+@pytest.mark.parametrize('policy, baseline, kept', [
+    (DEDUP_POLICIES.NEWEST, None, 'regenerated'),
+    (DEDUP_POLICIES.HIGHEST_BASELINE, None, 'reprocessed'),
+    (DEDUP_POLICIES.PREFERRED_BASELINE, 'N0509', 'regenerated'),
+    (DEDUP_POLICIES.PREFERRED_BASELINE, 'N0510', 'reprocessed'),
+    (DEDUP_POLICIES.PREFERRED_BASELINE, 'N0400', 'regenerated'),
+])
+def test_keep_policies(policy, baseline, kept):
+    assert list(deduplicate(VARIANTS, policy, baseline)) == [ kept ]
+
+
+def test_ties_are_broken_by_publication_date():
+    images = {'first' : s2('20240101T105441', 'N0509', '20240101T124502', published = '2024-01-01T13:00:00Z'),
+              'second' : s2('20240101T105441', 'N0509', '20240101T124502', published = '2024-01-02T13:00:00Z')}
+
+    assert list(deduplicate(images)) == [ 'second' ]
+
+
+def test_preferred_baseline_needs_a_baseline():
+    with pytest.raises(Exception, match = 'baseline'):
+        deduplicate(VARIANTS, DEDUP_POLICIES.PREFERRED_BASELINE)
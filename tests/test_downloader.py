@@ -0,0 +1,97 @@
+import os
+
+from sat_download.api.base import SatelliteAPI
+from sat_download.data_types import DiskSearchResults, SatelliteImage, SearchFilters
+from sat_download.services.downloader import SatelliteImageDownloader
+from sat_download.sinks import MemorySink
+
+
+class StubAPI(SatelliteAPI):
+    def __init__(self, failing = ()) -> None:
+        super().__init__('user', 'password')
+        self.failing = set(failing)
+        self.downloaded = []
+
+    def search(self, filters):
+        return {}
+
+    def download(self, image_id, outname, verbose, sink = None):
+        if image_id in self.failing:
+            raise Exception(f"Error en la descarga: {image_id}")
+        self.downloaded.append(image_id)
+        with sink.open(outname) as file:
+            file.write(image_id.encode())
+        return sink.locate(outname)
+
+
+def make_results(sizes : dict) -> dict:
+    return { download_id : SatelliteImage(uuid = download_id, date = '20240101', sensor = 'Sentinel-2', brother = 'A',
+                                          identifier = 'Sentinel-2A', filename = f"{download_id}.zip", tile = '30TVK',
+                                          size = size)
+             for download_id, size in sizes.items() }
+
+
+def test_bulk_download_returns_paths_in_input_order():
+    api, sink = StubAPI(failing = [ 'b' ]), MemorySink()
+    images = make_results({'a' : 10, 'b' : 30, 'c' : 20})
+
+    paths = SatelliteImageDownloader(api).bulk_download(images, 'out', sink = sink)
+
+    assert paths == [ os.path.join('out', 'a.zip'), None, os.path.join('out', 'c.zip') ]
+    assert api.downloaded == [ 'c', 'a' ]
+    assert sink.buffers == {os.path.join('out', 'c.zip') : b'c', os.path.join('out', 'a.zip') : b'a'}
+
+
+def test_bulk_download_from_disk_results():
+    api, sink = StubAPI(), MemorySink()
+    with DiskSearchResults() as results:
+        results.update(make_results({ f"id{index}" : index for index in range(20) }))
+
+        paths = SatelliteImageDownloader(api).bulk_download(results, 'out', workers = 4, sink = sink)
+
+    assert paths == [ os.path.join('out', f"id{index}.zip") for index in range(20) ]
+    assert len(sink.buffers) == 20
+
+
+class TrackedResults(dict):
+    """
+    Search results counting the products read by the downloader.
+    """
+    reads = 0
+
+    def __getitem__(self, key):
+        self.reads += 1
+        return super().__getitem__(key)
+
+
+def test_bulk_download_reads_products_through_a_bounded_window():
+    images = TrackedResults(make_results({ f"id{index}" : index for index in range(50) }))
+    ahead = []
+
+    class WindowAPI(StubAPI):
+        def download(self, image_id, outname, verbose, sink = None):
+            ahead.append(images.reads - len(self.downloaded))
+            return super().download(image_id, outname, verbose, sink)
+
+    paths = SatelliteImageDownloader(WindowAPI()).bulk_download(images, 'out', workers = 2, sink = MemorySink())
+
+    assert all(path is not None for path in paths)
+    assert max(ahead) <= 4
+
+
+class TileAPI(StubAPI):
+    def latest(self, filters):
+        if filters.tile_id == 'broken':
+            raise Exception("Error en la solicitud: 500")
+        image = make_results({filters.tile_id : 1})[filters.tile_id]
+        image.tile = filters.tile_id
+        return {filters.tile_id : image}
+
+
+def test_latest_per_tile_skips_failing_tiles(capsys):
+    filters = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-02-01')
+
+    results = TileAPI().latest_per_tile(filters, [ '30TVK', 'broken', '31UDQ' ])
+
+    assert sorted(results) == [ '30TVK', '31UDQ' ]
+    assert 'broken' in capsys.readouterr().out
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from sat_download.data_types import SatelliteImage, SearchFilters
+from sat_download.enums import COLLECTIONS
+from sat_download.services.federated import FederatedSearcher
+
+
+def make_image(name : str) -> SatelliteImage:
+    return SatelliteImage(uuid = name, date = '20240101', sensor = 'Sentinel-2', brother = 'A', identifier = 'Sentinel-2A',
+                          filename = f"{name}.zip", tile = '30TVK')
+
+
+class StubAPI:
+    """
+    Provider API serving scripted results per collection and recording its downloads.
+    """
+    def __init__(self, results : dict, barrier : threading.Barrier | None = None) -> None:
+        self.results = results
+        self.barrier = barrier
+        self.downloads = []
+
+    def bulk_search(self, filters : SearchFilters) -> dict:
+        if isinstance(self.results[filters.collection], Exception):
+            raise self.results[filters.collection]
+        return { f"{filters.collection}/{name}" : make_image(name) for name in self.results[filters.collection] }
+
+    def download(self, image_id : str, outname : str, verbose : int, sink = None) -> str:
+        if self.barrier is not None:
+            self.barrier.wait(timeout = 5)
+        if image_id.endswith('broken'):
+            raise Exception('boom')
+        self.downloads.append(image_id)
+        return outname
+
+
+FILTERS = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+
+def test_results_are_merged_tagged_and_routed_back(tmp_path):
+    odata = StubAPI({'SENTINEL-2' : [ 'a' ], 'SENTINEL-3' : [ 'b' ]})
+    usgs = StubAPI({'landsat_ot_c2_l1' : [ 'c' ]})
+    searcher = FederatedSearcher({COLLECTIONS.SENTINEL_2 : odata, COLLECTIONS.SENTINEL_3 : odata, COLLECTIONS.LANDSAT_8 : usgs})
+
+    results = searcher.search([ COLLECTIONS.SENTINEL_2, COLLECTIONS.SENTINEL_3, COLLECTIONS.LANDSAT_8 ], FILTERS)
+
+    assert { image_id : image.collection for image_id, image in results.items() } == \
+        {'SENTINEL-2/a' : 'SENTINEL-2', 'SENTINEL-3/b' : 'SENTINEL-3', 'landsat_ot_c2_l1/c' : 'landsat_ot_c2_l1'}
+    assert searcher.bulk_download(results, str(tmp_path)) == [ str(tmp_path / name) for name in ('a.zip', 'b.zip', 'c.zip') ]
+    assert odata.downloads == [ 'SENTINEL-2/a', 'SENTINEL-3/b' ]
+    assert usgs.downloads == [ 'landsat_ot_c2_l1/c' ]
+
+
+def test_failing_collections_are_recorded():
+    searcher = FederatedSearcher({COLLECTIONS.SENTINEL_2 : StubAPI({'SENTINEL-2' : [ 'a' ]}),
+                                  COLLECTIONS.SENTINEL_3 : StubAPI({'SENTINEL-3' : Exception('down')})})
+
+    results = searcher.search([ COLLECTIONS.SENTINEL_2, COLLECTIONS.SENTINEL_3 ], FILTERS)
+
+    assert list(results) == [ 'SENTINEL-2/a' ]
+    assert list(searcher.search_failures) == [ COLLECTIONS.SENTINEL_3 ]
+    with pytest.raises(Exception, match = 'No API configured'):
+        searcher.search([ COLLECTIONS.LANDSAT_8 ], FILTERS)
+
+
+def test_providers_download_concurrently_and_report_failures(tmp_path):
+    barrier = threading.Barrier(2)
+    odata = StubAPI({'SENTINEL-2' : [ 'a', 'broken' ]}, barrier)
+    usgs = StubAPI({'landsat_ot_c2_l1' : [ 'c', 'd' ]}, barrier)
+    searcher = FederatedSearcher({COLLECTIONS.SENTINEL_2 : odata, COLLECTIONS.LANDSAT_8 : usgs})
+    results = searcher.search([ COLLECTIONS.SENTINEL_2, COLLECTIONS.LANDSAT_8 ], FILTERS)
+
+    paths = searcher.bulk_download(results, str(tmp_path))
+
+    assert paths == [ str(tmp_path / 'a.zip'), None, str(tmp_path / 'c.zip'), str(tmp_path / 'd.zip') ]
+    assert { collection : list(failures) for collection, failures in searcher.download_failures.items() } == \
+        {COLLECTIONS.SENTINEL_2 : [ 'SENTINEL-2/broken' ]}
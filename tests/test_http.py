@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from sat_download.utils.http import LatencyTracker, hedged_get
+
+
+class StubResponse:
+    def __init__(self, url : str, status_code : int) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.closed = threading.Event()
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class StubServer:
+    """
+    Endpoints answering after a scripted delay with a scripted status, recording when each request was sent.
+    """
+    def __init__(self, endpoints : dict) -> None:
+        self.endpoints = endpoints
+        self.sent = []
+        self.responses = []
+
+    def get(self, url : str, **kwargs) -> StubResponse:
+        self.sent.append((url, time.monotonic()))
+        delay, status_code = self.endpoints[url]
+        time.sleep(delay)
+        response = StubResponse(url, status_code)
+        self.responses.append(response)
+        return response
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = StubServer({})
+    monkeypatch.setattr(requests, 'get', server.get)
+    return server
+
+
+def test_delay_is_the_percentile_of_recent_latencies():
+    tracker = LatencyTracker(size = 100, percentile = 0.95, default = 2.0)
+    for latency in range(19):
+        tracker.record(latency / 100)
+    assert tracker.get_delay() == 2.0
+
+    for latency in range(19, 100):
+        tracker.record(latency / 100)
+    assert tracker.get_delay() == 0.95
+
+
+def test_hedge_fires_after_the_delay_and_the_loser_is_closed(server):
+    server.endpoints = {'primary' : (0.5, 200), 'alternate' : (0, 200)}
+    start = time.monotonic()
+
+    response = hedged_get([ 'primary', 'alternate' ], LatencyTracker(default = 0.1))
+
+    assert response.url == 'alternate'
+    assert [ url for url, _ in server.sent ] == [ 'primary', 'alternate' ]
+    assert server.sent[1][1] - start >= 0.1
+    time.sleep(0.6)
+    assert [ response.url for response in server.responses if response.closed.is_set() ] == [ 'primary' ]
+
+
+def test_server_errors_fail_over_without_waiting(server):
+    server.endpoints = {'primary' : (0, 503), 'alternate' : (0, 200)}
+    start = time.monotonic()
+
+    response = hedged_get([ 'primary', 'alternate' ], LatencyTracker(default = 10))
+
+    assert response.url == 'alternate'
+    assert time.monotonic() - start < 1
+    assert [ (response.url, response.closed.is_set()) for response in server.responses ] == \
+        [ ('primary', True), ('alternate', False) ]
+
+
+def test_last_failure_is_returned_when_every_endpoint_fails(server):
+    server.endpoints = {'primary' : (0, 503), 'alternate' : (0, 502)}
+
+    response = hedged_get([ 'primary', 'alternate' ], LatencyTracker(default = 10))
+
+    assert (response.status_code, response.closed.is_set()) == (502, False)
+    assert server.responses[0].closed.is_set()
@@ -0,0 +1,95 @@
+from sat_download.data_types import SatelliteImage
+from sat_download.services.ledger import CooperativeDownloader, WorkLedger
+
+
+def make_results(count : int) -> dict:
+    return { f"id{index}" : SatelliteImage(uuid = f"u{index}", date = '20240101', sensor = 'Sentinel-2', brother = 'A',
+                                           identifier = 'Sentinel-2A', filename = f"p{index}.zip", tile = '30TVK')
+             for index in range(count) }
+
+
+def test_jobs_are_claimed_once(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'))
+    assert ledger.add(make_results(3)) == 3
+    assert ledger.add(make_results(3)) == 0
+
+    claimed = [ ledger.claim('a'), ledger.claim('b'), ledger.claim('a') ]
+
+    assert sorted(download_id for download_id, _ in claimed) == [ 'id0', 'id1', 'id2' ]
+    assert claimed[0][1].filename == 'p0.zip'
+    assert ledger.claim('b') is None
+    assert ledger.get_status() == {'leased' : 3}
+
+
+def test_release_records_the_outcome(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'), max_attempts = 2)
+    ledger.add(make_results(2))
+
+    ledger.release(ledger.claim('a')[0], 'a', '/products/p0.zip')
+    failed, _ = ledger.claim('a')
+    ledger.release(failed, 'a', None)
+
+    assert ledger.get_status() == {'done' : 1, 'pending' : 1}
+    assert ledger.claim('b')[0] == failed
+    ledger.release(failed, 'b', None)
+    assert ledger.get_status() == {'done' : 1, 'failed' : 1}
+
+
+def test_expired_leases_are_reclaimed(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'), lease = 0)
+    ledger.add(make_results(1))
+
+    assert ledger.claim('dead')[0] == 'id0'
+    assert ledger.claim('alive') is None
+    assert ledger.claim('alive')[0] == 'id0'
+
+
+def test_renewed_leases_are_not_reclaimed(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'), lease = 0)
+    ledger.add(make_results(1))
+
+    ledger.claim('busy')
+    assert ledger.claim('other') is None
+    assert ledger.renew('busy') == 1
+    assert ledger.claim('other') is None
+
+
+def test_expired_leases_give_up_after_max_attempts(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'), lease = 0, max_attempts = 1)
+    ledger.add(make_results(1))
+
+    ledger.claim('dead')
+    assert ledger.claim('alive') is None
+    assert ledger.claim('alive') is None
+    assert ledger.get_status() == {'failed' : 1}
+    assert not ledger.has_leases()
+
+
+def test_release_is_ignored_after_losing_the_lease(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'), lease = 0)
+    ledger.add(make_results(1))
+
+    ledger.claim('slow')
+    ledger.claim('fast')
+    ledger.claim('fast')
+    ledger.release('id0', 'slow', '/products/p0.zip')
+    assert ledger.get_status() == {'leased' : 1}
+
+    ledger.release('id0', 'fast', '/products/p0.zip')
+    assert ledger.get_status() == {'done' : 1}
+
+
+class StubDownloader:
+    def download(self, download_id : str, outdir : str, filename : str, checksum : str | None = None) -> str:
+        return f"{outdir}/{filename}"
+
+
+def test_workers_pick_up_jobs_of_dead_workers(tmp_path):
+    ledger = WorkLedger(str(tmp_path / 'ledger.sqlite'), lease = 0.2)
+    ledger.add(make_results(2))
+    ledger.claim('dead')
+
+    paths = CooperativeDownloader(StubDownloader(), ledger, workers = 2, owner = 'alive').run('/products')
+
+    assert paths == {'id0' : '/products/p0.zip', 'id1' : '/products/p1.zip'}
+    assert ledger.get_status() == {'done' : 2}
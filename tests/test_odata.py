@@ -0,0 +1,213 @@
+import re
+
+import pytest
+
+from sat_download.api import odata
+from sat_download.api.odata import ODataAPI
+from sat_download.data_types import SearchFilters
+from sat_download.enums import COLLECTIONS
+from sat_download.factories.search import get_satellite_image
+from sat_download.sinks import MemorySink
+
+
+class StubResponse:
+    def __init__(self, content : bytes, broken : bool = False) -> None:
+        self.content = content
+        self.broken = broken
+        self.status_code = 200
+        self.headers = {'Content-Length' : str(len(content))}
+
+    def iter_content(self, chunk_size : int):
+        yield self.content
+        if self.broken:
+            raise odata.requests.exceptions.ConnectionError("connection reset")
+
+    def close(self) -> None:
+        pass
+
+
+class StubSession:
+    def __init__(self) -> None:
+        self.headers = {}
+
+    def get(self, url : str, **kwargs) -> StubResponse:
+        response = StubResponse(url.encode(), broken = 'broken' in url)
+        if url.endswith('.jpg'):
+            response.content = self.headers.get('Authorization', '').encode()
+            response.status_code = 200 if self.headers.get('Authorization') == 'Bearer token-2' else 401
+        return response
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(odata.requests, 'Session', StubSession)
+    api = ODataAPI('user', 'password')
+    monkeypatch.setattr(api, '_ODataAPI__get_token', lambda: 'token')
+    return api
+
+
+def stub_nodes(monkeypatch, api, nodes):
+    monkeypatch.setattr(api, '_ODataAPI__walk_nodes', lambda session, image_id, patterns: nodes)
+
+
+def test_download_nodes_keeps_the_product_layout(api, monkeypatch, tmp_path):
+    stub_nodes(monkeypatch, api, [ ('P.SAFE/MTD_MSIL2A.xml', 'node-a'), ('P.SAFE/GRANULE/B04.jp2', 'node-b') ])
+
+    paths = api.download_nodes('id', str(tmp_path), [ '*' ])
+
+    assert paths == [ str(tmp_path / 'P.SAFE' / 'MTD_MSIL2A.xml'), str(tmp_path / 'P.SAFE' / 'GRANULE' / 'B04.jp2') ]
+    assert (tmp_path / 'P.SAFE' / 'GRANULE' / 'B04.jp2').read_bytes() == b'node-b/$value'
+
+
+@pytest.mark.parametrize('path', [ '../outside.xml', 'P.SAFE/../../outside.xml', '/etc/outside.xml' ])
+def test_download_nodes_rejects_paths_outside_outdir(api, monkeypatch, tmp_path, path):
+    stub_nodes(monkeypatch, api, [ (path, 'node') ])
+
+    with pytest.raises(Exception, match = "outside"):
+        api.download_nodes('id', str(tmp_path / 'out'), [ '*' ])
+    assert not (tmp_path / 'outside.xml').exists()
+
+
+def test_download_nodes_leaves_no_partial_file(api, monkeypatch, tmp_path):
+    stub_nodes(monkeypatch, api, [ ('P.SAFE/broken.jp2', 'broken') ])
+
+    with pytest.raises(Exception):
+        api.download_nodes('id', str(tmp_path), [ '*' ])
+    assert list((tmp_path / 'P.SAFE').iterdir()) == []
+
+
+def test_download_nodes_into_a_sink(api, monkeypatch, tmp_path):
+    stub_nodes(monkeypatch, api, [ ('P.SAFE/MTD_MSIL2A.xml', 'node-a') ])
+    sink = MemorySink()
+
+    api.download_nodes('id', 'products', [ '*' ], sink = sink)
+
+    assert list(sink.buffers.values()) == [ b'node-a/$value' ]
+
+
+def test_assets_are_only_expanded_on_demand(api):
+    filters = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    assert '$expand' not in api._ODataAPI__prepare_query(filters)
+    api.quicklooks = True
+    assert api._ODataAPI__prepare_query(filters)['$expand'] == 'Assets'
+
+
+def test_quicklooks_are_downloaded_with_a_renewed_token(api, monkeypatch, tmp_path):
+    tokens = iter([ 'token-1', 'token-2' ])
+    monkeypatch.setattr(api, '_ODataAPI__get_token', lambda: next(tokens))
+    image = get_satellite_image(COLLECTIONS.SENTINEL_2, {'Name' : 'S2A_MSIL2A_20240101T105441_N0510_R051_T30TVK_20240101T124502.SAFE',
+                                                         'Quicklook' : 'https://catalogue/quicklook.jpg'})
+    session = StubSession()
+
+    outname = api.download_quicklook(image, str(tmp_path / 'preview.jpg'), session)
+
+    assert open(outname, 'rb').read() == b'Bearer token-2'
+    assert api.download_quicklook(image, str(tmp_path / 'again.jpg'), session) == str(tmp_path / 'again.jpg')
+
+
+def test_checksums_are_parsed():
+    image = get_satellite_image(COLLECTIONS.SENTINEL_2, {
+        'Name' : 'S2A_MSIL1C_20240101T105441_N0510_R051_T30TVK_20240101T124502.SAFE',
+        'Checksum' : [ {'Algorithm' : 'BLAKE3', 'Value' : 'ab'}, {'Algorithm' : 'MD5', 'Value' : 'CD12'} ],
+    })
+
+    assert image.checksum == 'md5:cd12'
+
+
+def s2_entity(index : int, tile : str, date : str) -> dict:
+    return {'Id' : f"{tile}-{index}", 'Name' : f"S2A_MSIL1C_{date}T105441_N0510_R{index:03d}_T{tile}_{date}T124502.SAFE"}
+
+
+def stub_catalogue(monkeypatch, api, entities : list) -> list:
+    """
+    Serve a catalogue sorted by date, honouring the end date, $top and $skip of each query.
+    """
+    queries = []
+
+    def request(query):
+        queries.append(dict(query))
+        end = re.search(r"ContentDate/End lt (\d{4})-(\d{2})-(\d{2})", query['$filter']).groups()
+        matching = [ entity for entity in entities if entity['Name'].split('_')[2][:8] <= ''.join(end) ]
+        return iter(matching[query['$skip']:query['$skip'] + query['$top']])
+
+    monkeypatch.setattr(api, '_ODataAPI__request', request)
+    return queries
+
+
+def test_batch_search_demultiplexes_by_parsed_tile(api, monkeypatch):
+    stub_catalogue(monkeypatch, api, [ s2_entity(1, '30TVK', '20240102'), s2_entity(2, '30TWK', '20240101'),
+                                       s2_entity(3, '31TBE', '20240101') ])
+    filters = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    results = api.batch_search(filters, [ '30TVK', '30TWK' ])
+
+    assert { tile : sorted(products) for tile, products in results.items() } == {'30TVK' : [ '30TVK-1' ], '30TWK' : [ '30TWK-2' ]}
+
+
+def test_batch_search_narrows_the_window_instead_of_skipping_forever(api, monkeypatch):
+    monkeypatch.setattr(api, 'PAGE_SIZE', 2)
+    monkeypatch.setattr(api, 'MAX_SKIP', 4)
+    entities = [ s2_entity(index, '30TVK', f"202401{31 - index // 2:02d}") for index in range(12) ]
+    queries = stub_catalogue(monkeypatch, api, entities)
+    filters = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    results = api.batch_search(filters, [ '30TVK' ])
+
+    assert sorted(results['30TVK']) == sorted(entity['Id'] for entity in entities)
+    assert max(query['$skip'] for query in queries) < api.MAX_SKIP
+
+
+def test_batch_search_refuses_days_beyond_the_skip_cap(api, monkeypatch):
+    monkeypatch.setattr(api, 'PAGE_SIZE', 2)
+    monkeypatch.setattr(api, 'MAX_SKIP', 4)
+    stub_catalogue(monkeypatch, api, [ s2_entity(index, '30TVK', '20240131') for index in range(6) ])
+    filters = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    with pytest.raises(Exception, match = 'more than 4 products'):
+        api.batch_search(filters, [ '30TVK' ])
+
+
+def test_attribute_filters_are_built_per_type(api):
+    filters = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31', tile_id = '30TVK',
+                            cloud_cover = 20, product_type = 'S2MSI2A', orbit_direction = 'descending', relative_orbit = 51)
+
+    clauses = api._ODataAPI__prepare_query(filters)['$filter'].split(' and Attributes/')
+
+    assert "OData.CSC.StringAttribute/any(att:att/Name eq 'tileId' and att/OData.CSC.StringAttribute/Value eq '30TVK')" in clauses
+    assert "OData.CSC.DoubleAttribute/any(att:att/Name eq 'cloudCover' and att/OData.CSC.DoubleAttribute/Value le 20.00)" in clauses
+    assert "OData.CSC.StringAttribute/any(att:att/Name eq 'productType' and att/OData.CSC.StringAttribute/Value eq 'S2MSI2A')" in clauses
+    assert ("OData.CSC.StringAttribute/any(att:att/Name eq 'orbitDirection' "
+            "and att/OData.CSC.StringAttribute/Value eq 'DESCENDING')") in clauses
+    assert ("OData.CSC.IntegerAttribute/any(att:att/Name eq 'relativeOrbitNumber' "
+            "and att/OData.CSC.IntegerAttribute/Value eq 51)") in clauses
+
+
+def test_unset_attribute_filters_are_left_out(api):
+    query = api._ODataAPI__prepare_query(SearchFilters(collection = 'SENTINEL-3', start_date = '2024-01-01',
+                                                       end_date = '2024-01-31', tile_id = '0153'))
+
+    assert 'Attributes/' not in query['$filter']
+    assert "contains(Name,'0153')" in query['$filter']
+
+
+@pytest.mark.parametrize('failure', [ 503, 'connection refused' ])
+def test_download_fails_over_to_alternate_endpoints(monkeypatch, tmp_path, failure):
+    class FailingSession(StubSession):
+        def get(self, url : str, **kwargs) -> StubResponse:
+            if url.startswith(ODataAPI.DOWNLOAD_URL):
+                if isinstance(failure, str):
+                    raise odata.requests.exceptions.ConnectionError(failure)
+                response = StubResponse(b'')
+                response.status_code = failure
+                return response
+            return super().get(url, **kwargs)
+
+    monkeypatch.setattr(odata.requests, 'Session', FailingSession)
+    api = ODataAPI('user', 'password', alternate_download_urls = [ 'https://mirror/Products' ])
+    monkeypatch.setattr(api, '_ODataAPI__get_token', lambda: 'token')
+    sink = MemorySink()
+
+    api.download('abc', 'product.zip', 0, sink)
+
+    assert sink.buffers['product.zip'] == b'https://mirror/Products(abc)/$value'
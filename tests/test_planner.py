@@ -0,0 +1,33 @@
+import collections
+import shutil
+
+import pytest
+
+from sat_download.data_types import SatelliteImage
+from sat_download.services.planner import plan_downloads
+
+
+def make_image(name : str, size : int | None) -> SatelliteImage:
+    return SatelliteImage(uuid = name, date = '20240101', sensor = 'Sentinel-2', brother = 'A', identifier = 'Sentinel-2A',
+                          filename = f"{name}.zip", tile = '30TVK', size = size)
+
+
+IMAGES = { name : make_image(name, size) for name, size in [ ('small', 10), ('unknown', None), ('large', 1000), ('medium', 100) ] }
+
+
+def test_largest_products_are_submitted_first():
+    plan = plan_downloads(IMAGES)
+
+    assert plan.order == [ 'large', 'medium', 'small', 'unknown' ]
+    assert plan.total_size == 1110
+    assert plan.unknown == 1
+
+
+def test_disk_space_is_checked_against_known_sizes(tmp_path, monkeypatch):
+    usage = collections.namedtuple('usage', 'total used free')
+    monkeypatch.setattr(shutil, 'disk_usage', lambda path: usage(2000, 1000, 1110))
+    assert plan_downloads(IMAGES, str(tmp_path / 'out')).total_size == 1110
+
+    monkeypatch.setattr(shutil, 'disk_usage', lambda path: usage(2000, 1000, 1109))
+    with pytest.raises(Exception, match = 'Not enough disk space'):
+        plan_downloads(IMAGES, str(tmp_path / 'out'))
@@ -0,0 +1,27 @@
+import linecache
+import tracemalloc
+
+from sat_download.utils.profiling import Profiler
+
+
+def source(site : str) -> str:
+    filename, lineno = site.rsplit(':', 1)
+    return linecache.getline(filename, int(lineno))
+
+
+def test_allocation_sites_only_report_growth_during_the_run():
+    tracemalloc.start()
+    try:
+        before = [ bytes(1024) for _ in range(1000) ]
+        with Profiler() as profiler:
+            during = [ bytearray(1024) for _ in range(1000) ]
+    finally:
+        tracemalloc.stop()
+
+    allocations = profiler.to_dict()['allocations']
+    lines = [ source(allocation['site']) for allocation in allocations ]
+    assert 'bytearray(1024)' in lines[0]
+    assert allocations[0]['size_diff'] >= 1024 * 1000
+    assert not any('bytes(1024)' in line for line in lines)
+    assert 'growth since start' in profiler.report()
+    assert len(before) == len(during)
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from sat_download.api.base import SatelliteAPI
+from sat_download.data_types import SatelliteImage
+from sat_download.services.downloader import SatelliteImageDownloader
+from sat_download.services.quicklook import QuicklookScreener
+
+
+class StubAPI(SatelliteAPI):
+    def __init__(self) -> None:
+        super().__init__('user', 'password')
+        self.calls = 0
+
+    def search(self, filters):
+        return {}
+
+    def download(self, image_id, outname, verbose, sink = None):
+        return None
+
+    def download_quicklook(self, image, outname, session = None):
+        self.calls += 1
+        with open(outname, 'wb') as file:
+            file.write(b'partial')
+            if image.uuid == 'broken':
+                raise Exception("Error en la descarga: connection reset")
+            file.write(b' preview')
+        return outname
+
+
+def make_image(uuid : str) -> SatelliteImage:
+    return SatelliteImage(uuid = uuid, date = '20240101', sensor = 'Sentinel-2', brother = 'A', identifier = 'Sentinel-2A',
+                          filename = f"{uuid}.zip", tile = '30TVK', quicklook = f"https://example.com/{uuid}.jpg")
+
+
+def test_screener_requires_quicklooks_to_be_enabled(tmp_path):
+    api = StubAPI()
+
+    with pytest.raises(Exception, match = 'quicklooks'):
+        QuicklookScreener(SatelliteImageDownloader(api), str(tmp_path))
+    assert not api.quicklooks
+
+
+def test_previews_are_cached_once_complete(tmp_path):
+    api = StubAPI()
+    api.quicklooks = True
+    screener = QuicklookScreener(SatelliteImageDownloader(api), str(tmp_path))
+    images = {'a' : make_image('a'), 'b' : make_image('broken')}
+
+    paths = screener.fetch(images)
+    screener.fetch(images)
+
+    assert paths == {'a' : str(tmp_path / 'a.jpg'), 'b' : None}
+    assert (tmp_path / 'a.jpg').read_bytes() == b'partial preview'
+    assert os.listdir(tmp_path) == [ 'a.jpg' ]
+    assert api.calls == 3
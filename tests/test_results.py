@@ -0,0 +1,37 @@
+from sat_download.data_types import DiskSearchResults, SatelliteImage
+
+
+def make_image(name : str) -> SatelliteImage:
+    return SatelliteImage(uuid = name, date = '20240101', sensor = 'Sentinel-2', brother = 'A',
+                          identifier = 'Sentinel-2A', filename = f"{name}.zip", tile = '30TVK')
+
+
+def test_iteration_follows_insertion_order(tmp_path):
+    names = [ 'c', 'a', 'e', 'b', 'd' ]
+    with DiskSearchResults(str(tmp_path / 'results.sqlite'), batch_size = 2) as results:
+        for name in names:
+            results[name] = make_image(name)
+
+        assert list(results) == names
+        assert [ image.uuid for image in results.values() ] == names
+        assert [ key for key, _ in results.items() ] == names
+
+
+def test_updates_keep_the_original_position():
+    with DiskSearchResults() as results:
+        results.update({ name : make_image(name) for name in 'abc' })
+        results['a'] = make_image('z')
+
+        assert list(results) == [ 'a', 'b', 'c' ]
+        assert results['a'].uuid == 'z'
+        assert len(results) == 3
+
+
+def test_behaves_like_a_dict():
+    with DiskSearchResults() as results:
+        results['a'] = make_image('a')
+        del results['a']
+
+        assert 'a' not in results
+        assert results.get('a') is None
+        assert dict(results) == {}
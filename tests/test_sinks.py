@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+from sat_download.sinks import CallbackSink, FileSink, FSSpecSink, MemorySink, PipeSink
+
+
+def write(sink, outname, chunks):
+    with sink.open(outname) as file:
+        for chunk in chunks:
+            file.write(chunk)
+    return sink.locate(outname)
+
+
+def test_file_sink_creates_directories(tmp_path):
+    outname = str(tmp_path / 'nested' / 'dir' / 'product.zip')
+
+    assert write(FileSink(), outname, [b'ab', b'cd']) == outname
+    assert (tmp_path / 'nested' / 'dir' / 'product.zip').read_bytes() == b'abcd'
+
+
+def test_memory_sink_keeps_each_product():
+    sink = MemorySink()
+    write(sink, 'a.zip', [b'12', b'34'])
+    write(sink, 'b.zip', [b'5'])
+
+    assert sink.buffers == {'a.zip' : b'1234', 'b.zip' : b'5'}
+
+
+def test_callback_sink_receives_chunks_in_order():
+    received = []
+    write(CallbackSink(lambda name, chunk: received.append((name, chunk))), 'a.zip', [b'1', b'2'])
+
+    assert received == [('a.zip', b'1'), ('a.zip', b'2')]
+
+
+def test_pipe_sink_never_closes_the_stream():
+    stream = io.BytesIO()
+    sink = PipeSink(stream)
+    write(sink, 'a.zip', [b'1'])
+    write(sink, 'b.zip', [b'2'])
+
+    assert not stream.closed
+    assert stream.getvalue() == b'12'
+
+
+def test_fsspec_sink_writes_to_memory_filesystem():
+    fsspec = pytest.importorskip('fsspec')
+    sink = FSSpecSink('memory', root = 'bucket/sentinel-2')
+
+    location = write(sink, 'tiles/product.zip', [b'ab', b'cd'])
+
+    assert location == 'bucket/sentinel-2/tiles/product.zip'
+    assert fsspec.filesystem('memory').cat_file(location) == b'abcd'
+
+
+def write_failing(sink, outname, chunks):
+    with pytest.raises(ConnectionError):
+        with sink.open(outname) as file:
+            for chunk in chunks:
+                file.write(chunk)
+            raise ConnectionError('connection reset')
+
+
+def test_file_sink_discards_interrupted_products(tmp_path):
+    outname = str(tmp_path / 'product.zip')
+
+    write_failing(FileSink(), outname, [b'ab'])
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_memory_sink_discards_interrupted_products():
+    sink = MemorySink()
+
+    write_failing(sink, 'a.zip', [b'12'])
+
+    assert sink.buffers == {}
+
+
+def test_fsspec_sink_discards_interrupted_products():
+    fsspec = pytest.importorskip('fsspec')
+    sink = FSSpecSink('memory', root = 'bucket/interrupted')
+
+    write_failing(sink, 'product.zip', [b'ab'])
+
+    assert fsspec.filesystem('memory').ls('bucket/interrupted') == []
@@ -0,0 +1,72 @@
+import hashlib
+import os
+
+import pytest
+
+from sat_download.api.base import SatelliteAPI
+from sat_download.services.store import ProductStore
+
+
+class StubAPI(SatelliteAPI):
+    def __init__(self, contents : dict) -> None:
+        super().__init__('user', 'password')
+        self.contents = contents
+        self.downloaded = []
+
+    def search(self, filters):
+        return {}
+
+    def download(self, image_id, outname, verbose, sink = None):
+        self.downloaded.append(image_id)
+        with open(outname, 'wb') as file:
+            file.write(self.contents[image_id])
+        return outname
+
+
+def md5(content : bytes) -> str:
+    return f"md5:{hashlib.md5(content).hexdigest()}"
+
+
+def test_products_are_downloaded_once(tmp_path):
+    api, store = StubAPI({'a' : b'content'}), ProductStore(str(tmp_path / 'store'))
+
+    store.fetch(api, 'a', str(tmp_path / 'one' / 'p.zip'))
+    store.fetch(api, 'a', str(tmp_path / 'two' / 'p.zip'))
+
+    assert api.downloaded == [ 'a' ]
+    assert (tmp_path / 'two' / 'p.zip').read_bytes() == b'content'
+
+
+def test_content_removed_during_lookup_is_downloaded_again(tmp_path):
+    api, store = StubAPI({'a' : b'content'}), ProductStore(str(tmp_path / 'store'))
+    store.fetch(api, 'a', str(tmp_path / 'one' / 'p.zip'))
+    for root, _, files in os.walk(tmp_path / 'store' / 'objects'):
+        for name in files:
+            os.remove(os.path.join(root, name))
+
+    assert store.fetch(api, 'a', str(tmp_path / 'two' / 'p.zip')) == str(tmp_path / 'two' / 'p.zip')
+    assert api.downloaded == [ 'a', 'a' ]
+
+
+def test_products_are_keyed_by_checksum(tmp_path):
+    api = StubAPI({'old' : b'old', 'new' : b'reprocessed'})
+    store = ProductStore(str(tmp_path / 'store'))
+
+    store.fetch(api, 'old', str(tmp_path / 'one' / 'p.zip'), checksum = md5(b'old'))
+    store.fetch(api, 'new', str(tmp_path / 'two' / 'p.zip'), checksum = md5(b'reprocessed'))
+    store.fetch(api, 'new', str(tmp_path / 'three' / 'renamed.zip'), checksum = md5(b'reprocessed'))
+
+    assert api.downloaded == [ 'old', 'new' ]
+    assert (tmp_path / 'two' / 'p.zip').read_bytes() == b'reprocessed'
+    assert (tmp_path / 'three' / 'renamed.zip').read_bytes() == b'reprocessed'
+
+
+def test_downloads_not_matching_their_checksum_are_rejected(tmp_path):
+    api, store = StubAPI({'a' : b'corrupt'}), ProductStore(str(tmp_path / 'store'))
+
+    with pytest.raises(Exception, match = 'checksum'):
+        store.fetch(api, 'a', str(tmp_path / 'one' / 'p.zip'), checksum = md5(b'content'))
+
+    assert not (tmp_path / 'one' / 'p.zip').exists()
+    assert os.listdir(tmp_path / 'store' / 'tmp') == []
+
@@ -0,0 +1,93 @@
+import pytest
+import requests
+
+from sat_download.api.base import SatelliteAPI
+from sat_download.sinks import MemorySink
+
+
+CONTENT = bytes(range(256)) * 40
+
+
+class StubAPI(SatelliteAPI):
+    def search(self, filters):
+        return {}
+
+    def download(self, image_id, outname, verbose, sink = None):
+        return None
+
+
+class StubResponse:
+    """
+    Streamed response serving ``content`` in small chunks, optionally breaking after ``fail_after`` bytes.
+    """
+    def __init__(self, content : bytes, status_code : int = 200, fail_after : int | None = None) -> None:
+        self.content = content
+        self.status_code = status_code
+        self.fail_after = fail_after
+        self.headers = {'Content-Length' : str(len(content))}
+        self.closed = False
+
+    def iter_content(self, chunk_size : int):
+        sent = 0
+        for start in range(0, len(self.content), 1000):
+            if self.fail_after is not None and sent >= self.fail_after:
+                raise requests.exceptions.ConnectionError("connection reset")
+            chunk = self.content[start:start + 1000]
+            sent += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_write_stream_without_interruption():
+    sink = MemorySink()
+
+    assert StubAPI('u', 'p')._write_stream(StubResponse(CONTENT), 'a.zip', sink) == 'a.zip'
+    assert sink.buffers['a.zip'] == CONTENT
+
+
+def test_write_stream_resumes_from_offset_with_range():
+    sink, offsets = MemorySink(), []
+
+    def reopen(offset, attempt):
+        offsets.append(offset)
+        return StubResponse(CONTENT[offset:], status_code = 206)
+
+    StubAPI('u', 'p')._write_stream(StubResponse(CONTENT, fail_after = 3000), 'a.zip', sink, reopen = reopen)
+
+    assert offsets == [3000]
+    assert sink.buffers['a.zip'] == CONTENT
+
+
+def test_write_stream_skips_written_bytes_when_range_is_ignored():
+    sink, attempts = MemorySink(), []
+
+    def reopen(offset, attempt):
+        attempts.append(attempt)
+        return StubResponse(CONTENT, status_code = 200, fail_after = 5000 if attempt == 1 else None)
+
+    StubAPI('u', 'p')._write_stream(StubResponse(CONTENT, fail_after = 2000), 'a.zip', sink, reopen = reopen)
+
+    assert attempts == [1, 2]
+    assert sink.buffers['a.zip'] == CONTENT
+
+
+def test_write_stream_gives_up_after_retries():
+    def reopen(offset, attempt):
+        return StubResponse(CONTENT[offset:], status_code = 206, fail_after = 0)
+
+    with pytest.raises(Exception, match = "Error en la descarga"):
+        StubAPI('u', 'p')._write_stream(StubResponse(CONTENT, fail_after = 1000), 'a.zip', MemorySink(), reopen = reopen)
+
+
+def test_write_stream_leaves_no_truncated_product(tmp_path):
+    outname = str(tmp_path / 'a.zip')
+    sink = MemorySink()
+
+    for destination in (sink, None):
+        with pytest.raises(Exception, match = "Error en la descarga"):
+            StubAPI('u', 'p')._write_stream(StubResponse(CONTENT, fail_after = 1000), outname, destination)
+
+    assert sink.buffers == {}
+    assert list(tmp_path.iterdir()) == []
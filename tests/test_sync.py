@@ -0,0 +1,58 @@
+import os
+
+from sat_download.data_types import SatelliteImage, SearchFilters
+from sat_download.services.sync import DeltaSync
+
+
+def make_image(name : str, published : str) -> SatelliteImage:
+    return SatelliteImage(uuid = name, date = '20240101', sensor = 'Sentinel-2', brother = 'A', identifier = 'Sentinel-2A',
+                          filename = f"{name}.zip", tile = '30TVK', published = published)
+
+
+class StubDownloader:
+    def __init__(self, results : dict, failing = ()) -> None:
+        self.results = results
+        self.failing = set(failing)
+        self.searches = []
+
+    def bulk_search(self, filters):
+        self.searches.append(filters)
+        return dict(self.results)
+
+    def bulk_download(self, images, outdir):
+        return [ None if image_id in self.failing else f"{outdir}/{image.filename}" for image_id, image in images.items() ]
+
+
+FILTERS = SearchFilters(collection = 'SENTINEL-2', start_date = '2024-01-01', end_date = '2024-01-31')
+
+
+def test_checkpoints_compare_timestamps_of_mixed_precision(tmp_path):
+    results = {'old' : make_image('old', '2024-01-01T10:00:00Z'), 'new' : make_image('new', '2024-01-01T10:00:00.600Z')}
+    sync = DeltaSync(StubDownloader(results), str(tmp_path / 'checkpoints.json'))
+
+    sync.commit(FILTERS, {'mid' : make_image('mid', '2024-01-01T10:00:00.500Z')}, [ 'mid.zip' ])
+
+    assert list(sync.poll(FILTERS)) == [ 'new' ]
+    assert sync.commit(FILTERS, results, [ 'old.zip', 'new.zip' ]) == '2024-01-01T10:00:00.600Z'
+    assert sync.commit(FILTERS, {'old' : results['old']}, [ 'old.zip' ]) == '2024-01-01T10:00:00.600Z'
+
+
+def test_checkpoints_stop_before_failed_downloads(tmp_path):
+    results = {'a' : make_image('a', '2024-01-01T10:00:00Z'), 'b' : make_image('b', '2024-01-02T10:00:00Z'),
+               'c' : make_image('c', '2024-01-03T10:00:00Z')}
+    downloader = StubDownloader(results, failing = [ 'b' ])
+    sync = DeltaSync(downloader, str(tmp_path / 'checkpoints.json'))
+
+    sync.run(FILTERS, 'out')
+
+    assert sync.get_checkpoint(FILTERS) == '2024-01-01T10:00:00Z'
+    sync.run(FILTERS, 'out')
+    assert downloader.searches[-1].published_after == '2024-01-01T10:00:00Z'
+
+
+def test_checkpoints_are_saved_without_leftover_files(tmp_path):
+    sync = DeltaSync(StubDownloader({}), str(tmp_path / 'checkpoints.json'))
+
+    sync.commit(FILTERS, {'a' : make_image('a', '2024-01-01T10:00:00Z')}, [ 'a.zip' ])
+
+    assert sorted(os.listdir(tmp_path)) == [ 'checkpoints.json', 'checkpoints.json.lock' ]
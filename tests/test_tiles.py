@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from sat_download.enums import COLLECTIONS
+from sat_download.factories.tiles import get_tile_index
+from sat_download.services.tiles import FootprintIndex, MGRSIndex
+
+
+def test_resolves_points_to_their_tile():
+    index = MGRSIndex()
+
+    assert index.resolve('POINT(-3.7 40.4)') == [ '30TVK' ]
+    assert index.resolve('POINT(2.35 48.86)') == [ '31UDQ' ]
+
+
+def test_resolves_polygons_to_every_intersecting_tile():
+    tiles = MGRSIndex().resolve('POLYGON((-3.8 40.3, -2.5 40.3, -2.5 40.5, -3.8 40.5, -3.8 40.3))')
+
+    assert tiles == [ '30TVK', '30TWK' ]
+
+
+def test_resolves_tiles_across_utm_zones():
+    assert MGRSIndex().resolve('POINT(-0.05 40.0)') == [ '30TYK', '31TBE' ]
+
+
+def test_resolves_both_latitude_bands_at_a_band_edge():
+    index = MGRSIndex()
+
+    assert index.resolve('POLYGON((-3.8 39.95, -3.6 39.95, -3.6 40.05, -3.8 40.05, -3.8 39.95))') == [ '30SVK', '30TVK' ]
+    assert index.resolve('POINT(-3.7 39.99)') == [ '30SVK' ]
+    assert index.resolve('POINT(-3.7 40.01)') == [ '30TVK' ]
+
+
+def test_wrs2_needs_a_footprint_file():
+    with pytest.raises(Exception, match = 'footprint file'):
+        get_tile_index(COLLECTIONS.LANDSAT_8)
+
+
+def test_wrs2_resolves_through_a_footprint_file(tmp_path):
+    path = tmp_path / 'wrs2.geojson'
+    path.write_text(json.dumps({'type' : 'FeatureCollection', 'features' : [
+        {'type' : 'Feature', 'properties' : {'tile_id' : '201032'},
+         'geometry' : {'type' : 'Polygon', 'coordinates' : [ [ [-4.5, 39.5], [-2.5, 39.5], [-2.5, 41], [-4.5, 41], [-4.5, 39.5] ] ]}},
+        {'type' : 'Feature', 'properties' : {'tile_id' : '201033'},
+         'geometry' : {'type' : 'Polygon', 'coordinates' : [ [ [-4.5, 38], [-2.5, 38], [-2.5, 39.6], [-4.5, 39.6], [-4.5, 38] ] ]}},
+    ]}))
+
+    index = get_tile_index(COLLECTIONS.LANDSAT_8, str(path))
+
+    assert isinstance(index, FootprintIndex)
+    assert index.resolve('POINT(-3.7 40.4)') == [ '201032' ]
+    assert index.resolve('POINT(-3.7 39.55)') == [ '201032', '201033' ]
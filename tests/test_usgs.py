@@ -0,0 +1,203 @@
+import json
+import os
+import types
+
+from dataclasses import replace
+
+import pytest
+
+from sat_download.api import usgs
+from sat_download.api.usgs import USGSAPI
+from sat_download.data_types import SearchFilters
+from sat_download.services.orders import OrderPipeline
+
+
+def scene(entity_id : str, tile : str) -> dict:
+    return {'entityId' : entity_id, 'displayId' : f"LC08_L1TP_{tile}_20240101_20240110_02_T1"}
+
+
+class StubM2M:
+    """
+    Scripted M2M endpoints recording every request.
+    """
+    def __init__(self, scenes : list, page_size : int) -> None:
+        self.scenes = scenes
+        self.page_size = page_size
+        self.requests = []
+        self.ready = {}
+
+    def post(self, endpoint : str, payload : str) -> dict:
+        payload = json.loads(payload)
+        self.requests.append((endpoint, payload))
+
+        if endpoint == USGSAPI.SEARCH_ENDPOINT:
+            start = payload['startingNumber'] - 1
+            page = self.scenes[start:start + self.page_size]
+            return {'errorCode' : None, 'data' : {'results' : page, 'recordsReturned' : len(page),
+                                                  'nextRecord' : start + len(page) + 1 if page else None}}
+        if endpoint == USGSAPI.DOWNLOAD_OPTIONS_ENDPOINT:
+            return {'errorCode' : None, 'data' : [ {'entityId' : entity_id, 'id' : f"p-{entity_id}", 'available' : True,
+                                                    'productName' : 'Landsat Product Bundle', 'filesize' : 1}
+                                                   for entity_id in payload['entityIds'] ]}
+        if endpoint == USGSAPI.DOWNLOAD_REQUEST_ENDPOINT:
+            return {'errorCode' : None, 'data' : {'availableDownloads' : [ {'entityId' : download['entityId'],
+                                                                             'url' : f"https://m2m/{download['entityId']}"}
+                                                                            for download in payload['downloads'] ],
+                                                  'preparingDownloads' : []}}
+        if endpoint == USGSAPI.DOWNLOAD_RETRIEVE_ENDPOINT:
+            ready = self.ready.get(payload['label'], [])
+            return {'errorCode' : None, 'data' : {'available' : [ {'entityId' : entity_id, 'url' : f"https://m2m/{entity_id}"}
+                                                                  for entity_id in ready ]}}
+        raise AssertionError(f"Unexpected endpoint {endpoint}")
+
+
+class StubServer:
+    """
+    Scripted M2M login and search endpoints issuing numbered session tokens.
+    """
+    def __init__(self) -> None:
+        self.valid = set()
+        self.logins = 0
+
+    def post(self, url : str, payload : str | None = None, headers : dict | None = None):
+        if url.endswith(USGSAPI.LOGIN_ENDPOINT):
+            self.logins += 1
+            token = f"token-{self.logins}"
+            self.valid.add(token)
+            response = {'errorCode' : None, 'data' : token}
+        elif (headers or {}).get('X-Auth-Token') not in self.valid:
+            response = {'errorCode' : 'AUTH_EXPIRED', 'data' : None}
+        else:
+            response = {'errorCode' : None, 'data' : headers['X-Auth-Token']}
+        return types.SimpleNamespace(content = json.dumps(response).encode())
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = StubServer()
+    monkeypatch.setattr(usgs.requests, 'post', server.post)
+    return server
+
+
+@pytest.fixture
+def m2m():
+    return StubM2M([], page_size = 2)
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path, m2m):
+    monkeypatch.setattr(USGSAPI, '_USGSAPI__login', lambda self: None)
+    api = USGSAPI('user', 'token', token_cache = str(tmp_path / 'token.json'))
+    monkeypatch.setattr(api, '_USGSAPI__post', m2m.post)
+    api.wrs_filter_ids['landsat_ot_c2_l1'] = ('path-field', 'row-field')
+    return api
+
+
+def test_batch_search_demultiplexes_by_parsed_path_row(api, m2m, monkeypatch):
+    monkeypatch.setattr(api, 'PAGE_SIZE', 2)
+    m2m.scenes = [ scene('a', '201032'), scene('b', '201033'), scene('c', '202032') ]
+    filters = SearchFilters(collection = 'landsat_ot_c2_l1', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    results = api.batch_search(filters, [ '201032', '201033' ])
+
+    assert { tile : list(products) for tile, products in results.items() } == \
+        {'201032' : [ 'https://m2m/a' ], '201033' : [ 'https://m2m/b' ]}
+    searches = [ payload for endpoint, payload in m2m.requests if endpoint == USGSAPI.SEARCH_ENDPOINT ]
+    assert [ payload['startingNumber'] for payload in searches ] == [ 1, 3 ]
+    assert len(searches[0]['sceneFilter']['metadataFilter']['childFilters']) == 2
+
+
+def test_token_cache_is_shared_and_private(server, tmp_path):
+    cache = str(tmp_path / 'token.json')
+
+    first, second = USGSAPI('user', 'token', token_cache = cache), USGSAPI('user', 'token', token_cache = cache)
+
+    assert server.logins == 1
+    assert first.api_key == second.api_key == {'X-Auth-Token' : 'token-1'}
+    assert os.stat(cache).st_mode & 0o777 == 0o600
+
+
+def test_rejected_tokens_are_renewed_once(server, tmp_path):
+    cache = str(tmp_path / 'token.json')
+    first, second = USGSAPI('user', 'token', token_cache = cache), USGSAPI('user', 'token', token_cache = cache)
+    server.valid.clear()
+
+    assert first._USGSAPI__post(USGSAPI.SEARCH_ENDPOINT, '{}')['data'] == 'token-2'
+    assert second._USGSAPI__post(USGSAPI.SEARCH_ENDPOINT, '{}')['data'] == 'token-2'
+    assert server.logins == 2
+
+
+def test_rejected_tokens_without_cache_log_in_again(server):
+    api = USGSAPI('user', 'token')
+    server.valid.clear()
+
+    assert api._USGSAPI__post(USGSAPI.SEARCH_ENDPOINT, '{}')['data'] == 'token-2'
+    api.close()
+
+
+def test_searches_share_one_order(api, m2m):
+    m2m.scenes = [ scene('a', '201032'), scene('b', '201032'), scene('c', '201032') ]
+    filters = SearchFilters(collection = 'landsat_ot_c2_l1', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    api.search(filters)
+    api.latest(replace(filters, tile_id = '201032'))
+
+    labels = { payload['label'] for endpoint, payload in m2m.requests if endpoint == USGSAPI.DOWNLOAD_REQUEST_ENDPOINT }
+    assert labels == { api.search_label }
+
+
+def test_orders_page_through_every_scene_and_retrieve_ready_urls(api, m2m, monkeypatch):
+    monkeypatch.setattr(api, 'PAGE_SIZE', 2)
+    m2m.scenes = [ scene('a', '201032'), scene('b', '201032'), scene('c', '201032') ]
+    filters = SearchFilters(collection = 'landsat_ot_c2_l1', start_date = '2024-01-01', end_date = '2024-01-31')
+
+    label, images = api.order(filters)
+
+    assert sorted(images) == [ 'a', 'b', 'c' ]
+    assert label != api.search_label
+    m2m.ready[label] = [ 'b' ]
+    assert api.retrieve(label) == {'b' : 'https://m2m/b'}
+
+
+def test_pipeline_polls_until_ready_and_records_failed_orders(api, m2m, monkeypatch):
+    m2m.scenes = [ scene('a', '201032'), scene('b', '201032') ]
+    good = SearchFilters(collection = 'landsat_ot_c2_l1', start_date = '2024-01-01', end_date = '2024-01-31')
+    broken = replace(good, tile_id = '999999')
+    orders = {}
+
+    def order(filters):
+        if filters.tile_id == '999999':
+            raise Exception('DOWNLOAD_ERROR')
+        label, images = USGSAPI.order(api, filters)
+        orders[label] = iter([ [], [ 'a' ], [ 'a', 'b' ] ])
+        return label, images
+
+    def retrieve(label):
+        m2m.ready[label] = next(orders[label])
+        return USGSAPI.retrieve(api, label)
+
+    monkeypatch.setattr(api, 'order', order)
+    monkeypatch.setattr(api, 'retrieve', retrieve)
+    downloader = types.SimpleNamespace(api = api, download = lambda url, outdir, filename: f"{outdir}/{filename}")
+    pipeline = OrderPipeline(downloader, poll_interval = 0)
+
+    paths = pipeline.run([ good, broken ], 'out')
+
+    assert sorted(entity_id for _, entity_id in paths) == [ 'a', 'b' ]
+    assert all(path.startswith('out/LC08') for path in paths.values())
+    assert [ filters for filters, _ in pipeline.failed ] == [ broken ]
+
+
+@pytest.mark.parametrize('geometry, spatial_filter', [
+    ('POINT(-3.7 40.4)', {'filterType' : 'mbr', 'lowerLeft' : {'latitude' : 40.4, 'longitude' : -3.7},
+                          'upperRight' : {'latitude' : 40.4, 'longitude' : -3.7}}),
+    ('POLYGON((-4 40, -3 40, -3 41, -4 40))', {'filterType' : 'geojson', 'geoJson' : {'type' : 'Polygon',
+                                               'coordinates' : [ [ [-4, 40], [-3, 40], [-3, 41], [-4, 40] ] ]}}),
+    ('MULTIPOLYGON(((-4 40, -3 40, -3 41, -4 40)), ((1 2, 2 2, 2 3, 1 2)))',
+     {'filterType' : 'mbr', 'lowerLeft' : {'latitude' : 2, 'longitude' : -4}, 'upperRight' : {'latitude' : 41, 'longitude' : 2}}),
+])
+def test_geometries_become_spatial_filters(api, m2m, geometry, spatial_filter):
+    api.search(SearchFilters(collection = 'landsat_ot_c2_l1', start_date = '2024-01-01', end_date = '2024-01-31',
+                             geometry = geometry))
+
+    assert m2m.requests[0][1]['sceneFilter']['spatialFilter'] == spatial_filter